@@ -0,0 +1,92 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Benchmark marshmallow schemas against the compiled serializers
+
+Runs the API collection and export serializations over a loaded database,
+checks the output is byte-for-byte identical and reports the speedup
+
+python -m benchmarks.bench_serializers -d data/miiflask.db
+"""
+import argparse
+import os
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from miiflask.flask import model
+from miiflask.utils.schema_compiler import compile_schema
+
+# name, model, schema, dumps arguments
+CASES = [
+    ("api/measurands", model.MeasurandTaxon, model.MeasurandTaxonSchema,
+     dict(sort_keys=True, separators=(",", ":"))),
+    ("api/aspects", model.Aspect, model.AspectSchema,
+     dict(sort_keys=True, separators=(",", ":"))),
+    ("api/scales", model.Scale, model.ScaleSchema,
+     dict(sort_keys=True, separators=(",", ":"))),
+    ("api/units", model.Unit, model.UnitSchema,
+     dict(sort_keys=True, separators=(",", ":"))),
+    ("kcdbcmcs/export", model.KcdbCmc, model.KcdbCmcSchema,
+     dict(indent=4)),
+]
+
+
+def timeit(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main(database, repeat):
+    engine = create_engine("sqlite:///" + os.path.abspath(database))
+    print(f"{'':<24}{'serialize only':^34}{'query + serialize':^34}")
+    print(f"{'case':<18}{'rows':>6}"
+          f"{'marshmallow':>13}{'compiled':>11}{'speedup':>10}"
+          f"{'marshmallow':>13}{'compiled':>11}{'speedup':>10}  identical")
+    for name, model_, schema_, kwargs in CASES:
+        schema = schema_(many=True)
+        fast = compile_schema(schema_(many=True))
+        with Session(engine) as session:
+            objs = session.query(model_).all()
+            # Warm the identity map, compare serialization only
+            schema.dump(objs)
+            t_mm, out_mm = timeit(lambda: schema.dumps(objs, **kwargs), repeat)
+            t_fast, out_fast = timeit(lambda: fast.dumps(objs, **kwargs), repeat)
+
+        # End to end, query and lazy loads included
+        def marshmallow_query():
+            with Session(engine) as session:
+                return schema.dumps(session.query(model_).all(), **kwargs)
+
+        def compiled_query():
+            with Session(engine) as session:
+                query = session.query(model_).options(*fast.load_options(model_))
+                return fast.dumps(query.all(), **kwargs)
+
+        t_mm_q, _ = timeit(marshmallow_query, repeat)
+        t_fast_q, out_fast_q = timeit(compiled_query, repeat)
+        identical = out_mm == out_fast == out_fast_q
+        print(f"{name:<18}{len(objs):>6}"
+              f"{t_mm * 1e3:>11.1f}ms{t_fast * 1e3:>9.1f}ms{t_mm / t_fast:>9.1f}x"
+              f"{t_mm_q * 1e3:>11.1f}ms{t_fast_q * 1e3:>9.1f}ms{t_mm_q / t_fast_q:>9.1f}x"
+              f"  {identical}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--database", default="data/miiflask.db",
+                        help="sqlite database built with dbinit.py")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.database, args.repeat)
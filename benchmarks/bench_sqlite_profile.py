@@ -0,0 +1,175 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Benchmark the SQLite defaults against the pragmas of the app
+
+Reads are served from the published database in rollback journal mode,
+the queries of the read endpoints run on a copy of it with the defaults
+and with config.SQLITE_CACHE, the pragmas of the serving configs.
+With --load the dbinit loading stage runs into a new database with the
+defaults and with config.SQLITE_PERFORMANCE, WAL is only used by the load
+
+python -m benchmarks.bench_sqlite_profile -d data/miiflask.db
+python -m benchmarks.bench_sqlite_profile --load \\
+    --mlayer resources/m-layer/accessed_on/2025-11-04 \\
+    --measurands resources/measurand-taxonomy/commit/e23dc84/MeasurandTaxonomyCatalog.xml \\
+    --cmc-data kcdb_cmc_canada.json
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from miiflask.flask import exports, model
+from miiflask.flask.config import SQLITE_CACHE, SQLITE_PERFORMANCE
+from miiflask.flask.db import apply_sqlite_pragmas, bind_engine
+from miiflask.utils.schema_compiler import compile_schema
+
+READ_PROFILES = {
+    "default": None,
+    "serving": SQLITE_CACHE,
+}
+
+LOAD_PROFILES = {
+    "default": None,
+    "loading": SQLITE_PERFORMANCE,
+}
+
+
+def timeit(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def copy_database(source, target):
+    # Consistent copy of a database in WAL mode too, published as publish_database does
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+        dst.execute("PRAGMA journal_mode=DELETE")
+    src.close()
+    dst.close()
+
+
+def engine_for(path, pragmas):
+    engine = create_engine("sqlite:///" + path)
+    apply_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+def read_cases(engine):
+    aspect_schema = compile_schema(model.AspectSchema())
+
+    def collection(name):
+        with Session(engine) as session:
+            exports.api_collection_json(session, name)
+
+    def cmcs():
+        with Session(engine) as session:
+            exports.cmcs_json(session)
+
+    def aspect_pages():
+        # /api/aspect/<id>/ of every aspect, one session per request
+        with Session(engine) as session:
+            ids = session.scalars(select(model.Aspect.id)).all()
+        for id_ in ids:
+            with Session(engine) as session:
+                aspect_schema.dumps(session.get(model.Aspect, id_))
+
+    for name in exports.api_collections:
+        yield f"api/{name}", lambda name=name: collection(name)
+    yield "kcdbcmcs/export", cmcs
+    yield "api/aspect/<id> x all", aspect_pages
+
+
+def load(path, pragmas, parms):
+    """
+    Seconds to run the dbinit mappers into a new database at path
+    """
+    from miiflask.mappers.mlayer_mapper import MlayerMapper
+    from miiflask.mappers.taxonomy_mapper_v2 import TaxonomyMapper
+    from miiflask.mappers.kcdb_mapper import KcdbMapper
+
+    start = time.perf_counter()
+    engine = engine_for(path, pragmas)
+    bind_engine(engine)
+    with Session(engine) as session:
+        mapper = MlayerMapper(session, parms)
+        mapper.getCollections()
+        mapper.getScaleAspectAssociations()
+        miimapper = TaxonomyMapper(session, parms)
+        miimapper.extractTaxonomy_v2()
+        miimapper.loadTaxonomy()
+        kcdbmapper = KcdbMapper(session, parms)
+        kcdbmapper.loadServices()
+        session.commit()
+    engine.dispose()
+    return time.perf_counter() - start
+
+
+def header(profiles):
+    print(f"{'case':<26}" + "".join(f"{name:>14}" for name in profiles) + f"{'speedup':>9}")
+
+
+def report(name, times):
+    # Speedup of the app profile over the defaults
+    *_, tuned = times.values()
+    print(f"{name:<26}" + "".join(f"{t * 1e3:>12.1f}ms" for t in times.values())
+          + f"{times['default'] / tuned:>9.2f}x")
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        header(READ_PROFILES)
+        results = {}
+        for profile, pragmas in READ_PROFILES.items():
+            path = os.path.join(tmp, f"{profile}.db")
+            copy_database(os.path.abspath(args.database), path)
+            engine = engine_for(path, pragmas)
+            for name, func in read_cases(engine):
+                func()
+                results.setdefault(name, {})[profile] = timeit(func, args.repeat)
+            engine.dispose()
+        for name, times in results.items():
+            report(name, times)
+
+        if args.load:
+            parms = {"mlayer": args.mlayer, "measurands": args.measurands,
+                     "kcdb": args.kcdb, "kcdb_cmc_data": args.cmc_data,
+                     "kcdb_cmc_api_countries": ["CA"], "api_mlayer": "https://api.mlayer.org",
+                     "use_api": False, "use_cmc_api": False, "update_resources": False}
+            header(LOAD_PROFILES)
+            times = {}
+            for profile, pragmas in LOAD_PROFILES.items():
+                path = os.path.join(tmp, f"{profile}-load.db")
+                times[profile] = load(path, pragmas, parms)
+            report("dbinit load", times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-d", "--database", default="data/miiflask.db",
+                        help="sqlite database built with dbinit.py")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--load", action="store_true",
+                        help="also time the dbinit loading stage")
+    parser.add_argument("--mlayer", default="resources/repo/m-layer/source/json")
+    parser.add_argument("--measurands",
+                        default="resources/repo/measurand-taxonomy/MeasurandTaxonomyCatalog.xml")
+    parser.add_argument("--kcdb", default="resources/kcdb")
+    parser.add_argument("--cmc-data", default="kcdb_cmc_physics_em_taxons_workshop_2024_demo.json")
+    main(parser.parse_args())
@@ -17,10 +17,13 @@ from pathlib import Path
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
-from miiflask.flask.db import bind_engine
+from miiflask.flask.config import SQLITE_PERFORMANCE
+from miiflask.flask.db import apply_sqlite_pragmas, bind_engine, publish_database
 from miiflask.mappers.mlayer_mapper import MlayerMapper
 from miiflask.mappers.taxonomy_mapper_v2 import TaxonomyMapper
 from miiflask.mappers.kcdb_mapper import KcdbMapper
+from miiflask.utils.artifacts import ArtifactBuilder
+from miiflask.utils.graph_store import GraphStoreBuilder
 
 
 def main():
@@ -28,6 +31,8 @@ def main():
     parms = {
         "path": "data/",
         "database": "data/miiflask.db",
+        "artifacts": "data/artifacts",
+        "graphs": "data/graphs",
         "usertables": "/tmp/miiflask/tables_",
         "measurands": "resources/repo/measurand-taxonomy/MeasurandTaxonomyCatalog.xml",
         "mlayer": "resources/repo/m-layer/source/json",
@@ -53,13 +58,23 @@ def main():
         kcdbmapper = KcdbMapper(session, parms)
         kcdbmapper.loadServices()
         session.commit()
+
+        artifacts = ArtifactBuilder(session, parms)
+        artifacts.build()
+
+        graphs = GraphStoreBuilder(session, parms)
+        graphs.build()
         session.close()
 
+    # Single file database for config.ReadOnlyConfig
+    publish_database(engine)
+
 
 if __name__ == "__main__":
     engine = create_engine(
         "sqlite:///" + os.path.abspath("data/miiflask.db")
     )
 
+    apply_sqlite_pragmas(engine, SQLITE_PERFORMANCE)
     bind_engine(engine)
     main()
@@ -7,5 +7,16 @@ if [ ! -f data/miiflask.db ]; then
   python dbinit.py 
 fi
 
-echo "Starting Gunicorn..."
-gunicorn --bind 0.0.0.0:8000 -w 1 wsgi
+# readonly serves the database published by dbinit.py immutably, without file
+# locks, from one worker per core. MIIFLASK_CONFIG=memory serves it from a copy in
+# memory per worker. MIIFLASK_CONFIG=production enables admin edits.
+# --preload builds the app once, the forked workers open their own connections
+export MIIFLASK_CONFIG=${MIIFLASK_CONFIG:-readonly}
+if [ "$MIIFLASK_CONFIG" = "readonly" ] || [ "$MIIFLASK_CONFIG" = "memory" ]; then
+  WORKERS=${WORKERS:-$(nproc)}
+else
+  WORKERS=${WORKERS:-1}
+fi
+
+echo "Starting Gunicorn ($MIIFLASK_CONFIG, $WORKERS workers)..."
+gunicorn --bind 0.0.0.0:8000 -w "$WORKERS" --preload wsgi
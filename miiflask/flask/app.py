@@ -7,28 +7,45 @@
 # Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
 
 """
+Application factory
 
+    app = create_app(ProductionConfig)
+    app = create_app("readonly")
+    app = create_app("memory")  # a copy of the database in memory per worker
+    app = create_app()  # MIIFLASK_CONFIG, production by default
+
+gunicorn --preload creates the app once before forking the workers,
+the forked workers start with new database connections and render threads
 """
+import os
+import weakref
 from os import environ
-import argparse
 
 from flask import Flask
 from flask import url_for
-from flask_sqlalchemy import SQLAlchemy
 from flask_admin import Admin
 from flask_admin.menu import MenuLink
+from flask_admin.model import BaseModelView
 from flask_admin.contrib.sqla import ModelView
 from flask_admin.base import Bootstrap4Theme
-
-# This is vanilla SQLAlchemy declarative base
-
-from miiflask.flask.db import Base, bind_engine
-
-from miiflask.flask.config import (
-        TestingConfig, 
-        DevelopmentConfig,
-        DemoConfig,
-        ProductionConfig
+from sqlalchemy.pool import QueuePool
+
+from miiflask.flask.db import MemorySnapshot, apply_sqlite_pragmas
+from miiflask.flask.config import configs
+from miiflask.flask.extensions import db
+from miiflask.flask import views
+from miiflask.flask.views import (
+        MeasurandTaxonView,
+        ParameterView,
+        CMCView,
+        MyModelView,
+        KcdbServiceView,
+        AspectView,
+        ScaleView,
+        CastConversionView,
+        DimensionView,
+        KcdbBranchView,
+        read_only_view
         )
 
 from miiflask.flask.model import (
@@ -57,74 +74,120 @@ from miiflask.flask.model import (
     System,
     Prefix
 )
-app = None
-print('Creating app ', __name__)
+
+# Apps of this process, reset in forked children
+_apps = weakref.WeakSet()
 
 
 class MainIndexLink(MenuLink):
     def get_url(self):
-        return url_for('index')
-
-
-def create_app(config):
+        return url_for('main.index')
+
+
+class ReadOnlyAdmin(Admin):
+    """
+    Admin whose model views only list and show details, see views.read_only_view
+    """
+    def add_view(self, view):
+        if isinstance(view, BaseModelView):
+            view = read_only_view(view)
+        super().add_view(view)
+
+
+def init_admin(app):
+    """
+    Model views of app under /admin, list and details only in READ_ONLY mode
+    """
+    admin_class = ReadOnlyAdmin if app.config.get("READ_ONLY") else Admin
+    admin = admin_class(app, name="mii", theme=Bootstrap4Theme(swatch="cerulean"))
+    admin.add_view(ModelView(Domain, db.session))
+    admin.add_view(AspectView(Aspect, db.session, category="Mlayer"))
+    admin.add_view(ScaleView(Scale, db.session, category="Mlayer"))
+    admin.add_view(MyModelView(Unit, db.session, category="Mlayer"))
+    admin.add_view(MyModelView(Prefix, db.session, category="Mlayer"))
+    admin.add_view(CastConversionView(Conversion, db.session, category="Mlayer"))
+    admin.add_view(CastConversionView(Cast, db.session, category="Mlayer"))
+    admin.add_view(MyModelView(Transform, db.session, category="Mlayer"))
+    admin.add_view(DimensionView(Dimension, db.session, category="Mlayer"))
+    admin.add_view(MyModelView(System, db.session, category="Mlayer"))
+    admin.add_view(ParameterView(Parameter, db.session, category="Measurand"))
+    # admin.add_view(MeasurandView(Measurand, db.session, category="Measurand"))
+    admin.add_view(MeasurandTaxonView(MeasurandTaxon, db.session, category="Measurand"))
+    admin.add_view(KcdbServiceView(KcdbServiceClass, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbQuantity, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbArea, db.session, category="KCDB"))
+    admin.add_view(KcdbBranchView(KcdbBranch, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbService, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbSubservice, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbIndividualService, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbInstrument, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbInstrumentMethod, db.session, category="KCDB"))
+    admin.add_view(MyModelView(KcdbParameter, db.session, category="KCDB"))
+    admin.add_view(CMCView(KcdbCmc, db.session, category="KCDB"))
+    admin.add_link(MainIndexLink(name='Homepage'))
+    return admin
+
+
+def init_hydration(app):
+    """
+    Serve app from :memory: copies of HYDRATE_FROM, call before db.init_app
+    Each pooled connection is a copy of its own, used by one thread at a time,
+    a forked worker or a replaced file makes the next connections copy the file again
+    """
+    snapshot = MemorySnapshot(app.config["HYDRATE_FROM"], app.config.get("HYDRATE_INTERVAL", 5.0))
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    # The creator replaces opening the database URL, a file URL keeps Flask-SQLAlchemy
+    # from choosing StaticPool, the one connection shared by all threads of :memory:
+    options["creator"] = snapshot.connect
+    options["poolclass"] = QueuePool
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    @app.before_request
+    def rehydrate():
+        if snapshot.changed():
+            snapshot.reload()
+            # Connections in use keep their copies until they are returned
+            db.engine.dispose(close=False)
+
+    return snapshot
+
+
+def create_app(config=None):
+    """
+    App of a config class or of a name in config.configs,
+    MIIFLASK_CONFIG (production by default) when None
+    """
+    if config is None:
+        config = environ.get("MIIFLASK_CONFIG", "production")
+    if isinstance(config, str):
+        config = configs[config]
     app = Flask(__name__)
     app.config.from_object(config)
 
+    if app.config.get("HYDRATE_FROM"):
+        init_hydration(app)
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config.get("SQLITE_PRAGMAS"))
+        if not app.config.get("READ_ONLY"):
+            # Tables, columns, indexes and search table missing from an older database,
+            # read-only databases are upgraded by dbinit.py before they are published
+            db.create_all()
+        views.init_app(app)
+        init_admin(app)
+        views.warm_diagrams()
+    _apps.add(app)
     return app
 
-if __name__ == "miiflask.flask.app":
-
-    app = create_app(ProductionConfig)
-
-    print("Running the App and using views")
-
-    with app.app_context():
-        db = SQLAlchemy(app, model_class=Base)
-        
-        # App needs to be configured before importing views
-
-        from miiflask.flask.views import (
-                MeasurandView,
-                TaxonView,
-                MeasurandTaxonView,
-                ParameterView,
-                CMCView,
-                MyModelView,
-                KcdbServiceView,
-                AspectView,
-                ScaleView,
-                CastConversionView,
-                DimensionView,
-                KcdbBranchView
-                )
-
-        admin = Admin(app, name="mii", theme=Bootstrap4Theme(swatch="cerulean"))
-        admin.add_view(ModelView(Domain, db.session))
-        admin.add_view(AspectView(Aspect, db.session, category="Mlayer"))
-        admin.add_view(ScaleView(Scale, db.session, category="Mlayer"))
-        admin.add_view(MyModelView(Unit, db.session, category="Mlayer"))
-        admin.add_view(MyModelView(Prefix, db.session, category="Mlayer"))
-        admin.add_view(CastConversionView(Conversion, db.session, category="Mlayer"))
-        admin.add_view(CastConversionView(Cast, db.session, category="Mlayer"))
-        admin.add_view(MyModelView(Transform, db.session, category="Mlayer"))
-        admin.add_view(DimensionView(Dimension, db.session, category="Mlayer"))
-        admin.add_view(MyModelView(System, db.session, category="Mlayer"))
-        admin.add_view(ParameterView(Parameter, db.session, category="Measurand"))
-        # admin.add_view(MeasurandView(Measurand, db.session, category="Measurand"))
-        admin.add_view(MeasurandTaxonView(MeasurandTaxon, db.session, category="Measurand"))
-        admin.add_view(KcdbServiceView(KcdbServiceClass, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbQuantity, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbArea, db.session, category="KCDB"))
-        admin.add_view(KcdbBranchView(KcdbBranch, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbService, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbSubservice, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbIndividualService, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbInstrument, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbInstrumentMethod, db.session, category="KCDB"))
-        admin.add_view(MyModelView(KcdbParameter, db.session, category="KCDB"))
-        admin.add_view(CMCView(KcdbCmc, db.session, category="KCDB"))
-            
-        admin.add_link(MainIndexLink(name='Homepage'))
 
+def _after_fork_in_child():
+    # Connections of the parent must not be used by the forked worker,
+    # dispose(close=False) drops them without closing the parent's
+    for app in list(_apps):
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+        app.extensions["miiflask"].start_render_pool()
 
 
+os.register_at_fork(after_in_child=_after_fork_in_child)
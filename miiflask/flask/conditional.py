@@ -0,0 +1,164 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Conditional GET support for API and export routes
+
+ETag and Last-Modified are derived from the DataVersion generation,
+so an unchanged catalog is answered with 304 Not Modified
+before any ORM query or serialization of the payload
+"""
+import gzip
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, request, g, send_file
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from miiflask.flask.model import DataVersion
+from miiflask.utils.artifacts import ENCODINGS, artifact_path
+
+
+def get_data_version(session):
+    """
+    Return (generation, updated) of the catalog or None
+    None when the database predates the dataversion table
+    """
+    try:
+        row = session.execute(
+                select(DataVersion.generation, DataVersion.updated)
+                .where(DataVersion.id == 1)
+                ).first()
+    except OperationalError:
+        session.rollback()
+        return None
+    if row is None:
+        return None
+    updated = row.updated.replace(tzinfo=timezone.utc) if row.updated else None
+    return row.generation, updated
+
+
+def make_etag(version, key):
+    # Strong validator, one per representation (path and query string)
+    # A recreated database restarts at generation 1, updated tells them apart
+    generation, updated = version
+    stamp = updated.isoformat() if updated else ''
+    digest = hashlib.sha1(f'{stamp} {key}'.encode('utf-8')).hexdigest()[:16]
+    return f'{generation}-{digest}'
+
+
+def negotiated_encoding():
+    """
+    First content coding of ENCODINGS the client accepts or None
+    The representation a conditional view sends is selected by it alone
+    """
+    for encoding in ENCODINGS:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def matching_etag(etag):
+    """
+    ETag of If-None-Match naming etag in a content coding the client accepts or None
+    Compressed representations carry the content coding as suffix
+    """
+    for encoding in ('', *ENCODINGS):
+        if encoding and not request.accept_encodings[encoding]:
+            continue
+        candidate = f'{etag}-{encoding}' if encoding else etag
+        if request.if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def _not_modified(etag, updated):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    if updated:
+        response.last_modified = updated
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def conditional(view):
+    """
+    Decorate a GET view with ETag/Last-Modified validation
+    Only 2xx responses are validated and carry the validators
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(*args, **kwargs)
+        session = current_app.extensions['sqlalchemy'].session
+        version = get_data_version(session)
+        if version is None:
+            return view(*args, **kwargs)
+        g.data_version = version
+        generation, updated = version
+        etag = make_etag(version, request.full_path)
+        encoding = negotiated_encoding()
+        representation = f'{etag}-{encoding}' if encoding else etag
+        # If-None-Match takes precedence over If-Modified-Since, RFC 9110
+        if request.if_none_match:
+            matched = matching_etag(etag)
+            if matched:
+                return _not_modified(matched, updated)
+        elif request.if_modified_since and updated and updated <= request.if_modified_since:
+            return _not_modified(representation, updated)
+        response = current_app.make_response(view(*args, **kwargs))
+        if not 200 <= response.status_code < 300:
+            return response
+        response.set_etag(representation)
+        if updated:
+            response.last_modified = updated
+        return response
+    return wrapper
+
+
+def send_artifact(name, mimetype, download_name=None):
+    """
+    Serve a prebuilt artifact for the current data version
+    Returns None when no artifact matches, the caller serializes instead
+    """
+    root = current_app.config.get('ARTIFACTS_PATH')
+    version = g.get('data_version')
+    if root is None or version is None:
+        return None
+    encoding = negotiated_encoding()
+    path = artifact_path(root, version, name, encoding) if encoding else None
+    if path is None:
+        encoding = None
+        path = artifact_path(root, version, name)
+    if path is None:
+        return None
+    # Validators are set by the conditional decorator
+    response = send_file(path, mimetype=mimetype,
+                         as_attachment=download_name is not None,
+                         download_name=download_name,
+                         conditional=False, etag=False, last_modified=None)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def send_gzipped(data, mimetype):
+    """
+    Response of gzip compressed data
+    Decompressed for the clients not accepting gzip
+    """
+    if request.accept_encodings['gzip']:
+        response = current_app.response_class(data, mimetype=mimetype)
+        response.content_encoding = 'gzip'
+    else:
+        response = current_app.response_class(gzip.decompress(data), mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
@@ -11,6 +11,36 @@
 """
 import os
 
+# SQLite PRAGMAs of every connection, see miiflask.flask.db.apply_sqlite_pragmas
+# 64 MiB page cache (negative is KiB), 256 MiB memory mapped reads
+# journal_mode is left to the database, dbinit.py publishes it in DELETE mode
+SQLITE_CACHE = {
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+
+# Loading by dbinit.py only, publish_database leaves WAL mode afterwards
+# WAL lets readers run during a write, NORMAL only syncs at checkpoints in WAL mode
+SQLITE_PERFORMANCE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    **SQLITE_CACHE,
+}
+
+# Published database served without writes, see ReadOnlyConfig
+SQLITE_READ_ONLY = {
+    "query_only": "ON",
+    **SQLITE_CACHE,
+}
+
+# Private copy of the published database in memory, see InMemoryConfig
+SQLITE_IN_MEMORY = {
+    "query_only": "ON",
+    "temp_store": "MEMORY",
+}
+
+
 class Config:
     DEBUG = False
     TESTING = False
@@ -18,6 +48,22 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     FLASK_ADMIN_SWATCH = "cerulean"
     SECRET_KEY = "secret"
+    # Prebuilt export artifacts, see miiflask.utils.artifacts
+    ARTIFACTS_PATH = None
+    # Rendered graphs, see miiflask.utils.graph_cache
+    GRAPHS_PATH = None
+    # Instance graph render threads and seconds a request waits for one,
+    # 0 answers a graph not rendered yet with 503 Retry-After, the pages retry it
+    GRAPH_WORKERS = 2
+    GRAPH_WAIT = 0
+    # None keeps the SQLite defaults
+    SQLITE_PRAGMAS = None
+    # Admin create/edit/delete, CMC measurand changes and /initialize disabled
+    READ_ONLY = False
+    # Database file copied into a private :memory: database of each worker
+    HYDRATE_FROM = None
+    # Seconds between checks of HYDRATE_FROM for a newer database
+    HYDRATE_INTERVAL = 5.0
 
 
 class TestingConfig(Config):
@@ -28,6 +74,9 @@ class TestingConfig(Config):
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = "sqlite:////tmp/miiflask/miiflask.db"
+    ARTIFACTS_PATH = "/tmp/miiflask/artifacts"
+    GRAPHS_PATH = "/tmp/miiflask/graphs"
+    SQLITE_PRAGMAS = SQLITE_CACHE
 
 
 class DemoConfig(Config):
@@ -37,4 +86,41 @@ class DemoConfig(Config):
 class ProductionConfig(Config):
     PRODUCTION = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.abspath("data/miiflask.db")
+    ARTIFACTS_PATH = os.path.abspath("data/artifacts")
+    GRAPHS_PATH = os.path.abspath("data/graphs")
+    SQLITE_PRAGMAS = SQLITE_CACHE
+
+
+class ReadOnlyConfig(ProductionConfig):
+    """
+    Serves data/miiflask.db as published by dbinit.py, any number of workers
+    immutable=1 skips file locking and change detection, the file must not be
+    modified while the app runs: publish a new database by replacing the file
+    and restarting the workers
+    """
+    READ_ONLY = True
+    SQLALCHEMY_DATABASE_URI = "sqlite:///file:" + os.path.abspath("data/miiflask.db") \
+        + "?mode=ro&immutable=1&uri=true"
+    SQLITE_PRAGMAS = SQLITE_READ_ONLY
+
+
+class InMemoryConfig(ReadOnlyConfig):
+    """
+    Each worker copies data/miiflask.db into its own :memory: database and serves
+    every read from it, see miiflask.flask.db.MemorySnapshot
+    A worker copies the file again once it is replaced by a newer database
+    The database URL stays the file, connections are made by init_hydration
+    """
+    HYDRATE_FROM = os.path.abspath("data/miiflask.db")
+    SQLITE_PRAGMAS = SQLITE_IN_MEMORY
+
 
+# MIIFLASK_CONFIG names
+configs = {
+    "testing": TestingConfig,
+    "development": DevelopmentConfig,
+    "demo": DemoConfig,
+    "production": ProductionConfig,
+    "readonly": ReadOnlyConfig,
+    "memory": InMemoryConfig,
+}
@@ -10,14 +10,145 @@
 Define the SQLAlchemy base
 Stackoverflow 51106264
 """
-from sqlalchemy import MetaData
+import os
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import MetaData, event, inspect
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.schema import CreateColumn
 
 metadata_obj = MetaData()
 Base = declarative_base(metadata=metadata_obj)
 Session = sessionmaker()
 
+
+@event.listens_for(metadata_obj, "after_create")
+def add_missing_columns(target, connection, **kw):
+    """
+    create_all skips existing tables,
+    nullable columns declared after a database was built are added here
+    """
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in target.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}")
+
+
+@event.listens_for(metadata_obj, "after_create")
+def create_missing_indexes(target, connection, **kw):
+    """
+    create_all skips existing tables,
+    indexes declared after a database was built are added here
+    """
+    for table in target.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """
+    Set the PRAGMAs {name: value} on every new connection of a SQLite engine
+    e.g. config.SQLITE_CACHE, None or empty keeps the SQLite defaults
+    """
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def publish_database(engine):
+    """
+    Checkpoint the WAL into the database file and leave WAL mode,
+    the file is then complete on its own, immutable=1 readers ignore the -wal file
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    # Leaving WAL mode needs the only connection to the database
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    engine.dispose()
+
+
+class MemorySnapshot:
+    """
+    Private :memory: copies of a published SQLite database, made with the backup API
+    The file is read once per process into a master copy, connect is the creator of
+    an engine and copies the master for each new connection, no two threads share one
+    changed tells when the file was replaced since it was read, reload reads it again
+    """
+
+    def __init__(self, path, interval=5.0):
+        self.path = path
+        # Seconds between two looks at the file
+        self.interval = interval
+        self.signature = None
+        self.checked = time.monotonic()
+        self._master = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _load(self):
+        # Stat before copying, a file replaced during the copy is seen by the next check
+        self.signature = self._stat()
+        source = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        master = sqlite3.connect(":memory:", check_same_thread=False)
+        try:
+            source.backup(master)
+        finally:
+            source.close()
+        self._master, self._pid = master, os.getpid()
+
+    def connect(self):
+        with self._lock:
+            # A forked worker reads the file again, the parent's copy is not its own
+            if self._master is None or self._pid != os.getpid():
+                self._load()
+            memory = sqlite3.connect(":memory:", check_same_thread=False)
+            self._master.backup(memory)
+        return memory
+
+    def reload(self):
+        """
+        Read the file again for the next connections
+        """
+        with self._lock:
+            self._master = None
+
+    def changed(self):
+        """
+        True when the file differs from the last copy, at most once per interval
+        a missing file is not a change, the last copy is kept
+        """
+        now = time.monotonic()
+        if now - self.checked < self.interval:
+            return False
+        self.checked = now
+        signature = self._stat()
+        return signature is not None and signature != self.signature
+
+
 def bind_engine(engine):
     Base.metadata.bind = engine
     Session.configure(bind=engine)
@@ -0,0 +1,102 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Serialized representations of the catalog
+
+Shared by the Flask routes and the artifact builder,
+so a prebuilt artifact is byte-identical to the dynamic response
+
+Schemas are compiled with miiflask.utils.schema_compiler,
+output is identical to the marshmallow schemas in model.py
+"""
+from miiflask.flask.model import (
+    MeasurandTaxon,
+    Aspect,
+    Scale,
+    Unit,
+    KcdbCmc,
+    AspectSchema,
+    ScaleSchema,
+    UnitSchema,
+    MeasurandTaxonSchema,
+    KcdbCmcSchema
+)
+from miiflask.mappers.taxonomy_mapper_v2 import TaxonomyMapper
+from miiflask.utils.schema_compiler import compile_schema
+
+m_schema = compile_schema(MeasurandTaxonSchema())
+cmc_schema = compile_schema(KcdbCmcSchema())
+
+# Collections served under /api/<name>/
+api_collections = {
+    'measurands': (MeasurandTaxon, compile_schema(MeasurandTaxonSchema(many=True))),
+    'aspects': (Aspect, compile_schema(AspectSchema(many=True))),
+    'scales': (Scale, compile_schema(ScaleSchema(many=True))),
+    'units': (Unit, compile_schema(UnitSchema(many=True))),
+}
+
+
+def api_collection_json(session, name):
+    model_, schema = api_collections[name]
+    objs = session.query(model_).options(*schema.load_options(model_)).all()
+    # Same encoding as the Flask default JSON provider (non-debug)
+    return schema.dumps(objs, sort_keys=True, separators=(",", ":")) + "\n"
+
+
+# Upper bound of ids per entity type in one batch request
+BATCH_MAX_IDS = 1000
+
+
+def api_batch(session, ids):
+    """
+    Resolve lists of ids per collection, one IN query per collection
+    {'aspects': ['AS1', ...]} -> {'aspects': {'AS1': {...}}, 'missing': {'aspects': []}}
+    """
+    result = {'missing': {}}
+    for name, wanted in ids.items():
+        model_, schema = api_collections[name]
+        wanted = list(dict.fromkeys(str(id_) for id_ in wanted))
+        objs = session.query(model_) \
+            .filter(model_.id.in_(wanted)) \
+            .options(*schema.load_options(model_)).all()
+        found = {obj.id: item for obj, item in zip(objs, schema.dump(objs))}
+        result[name] = found
+        result['missing'][name] = [id_ for id_ in wanted if id_ not in found]
+    return result
+
+
+def taxonomy_xml(session):
+    taxons = []
+    query = session.query(MeasurandTaxon) \
+        .options(*m_schema.load_options(MeasurandTaxon))
+    for obj in query.all():
+        try:
+            taxons.append(TaxonomyMapper._getTaxonDict(obj, m_schema))
+        except Exception as e:
+            print(obj)
+            raise e
+    return TaxonomyMapper._dicttoxml_taxonomy(taxons)
+
+
+def measurand_xml(obj):
+    taxon = TaxonomyMapper._getTaxonDict(obj, m_schema)
+    return TaxonomyMapper._dicttoxml_taxon(taxon)
+
+
+def measurand_json(obj):
+    return m_schema.dumps(obj, indent=2)
+
+
+def cmcs_json(session):
+    query = session.query(KcdbCmc).options(*cmc_schema.load_options(KcdbCmc))
+    return cmc_schema.dumps(query.all(), many=True, indent=4)
+
+
+def cmc_json(obj):
+    return cmc_schema.dumps(obj, indent=2)
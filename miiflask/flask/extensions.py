@@ -0,0 +1,16 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Flask extensions, bound to each app by miiflask.flask.app.create_app
+"""
+from flask_sqlalchemy import SQLAlchemy
+
+from miiflask.flask.db import Base
+
+db = SQLAlchemy(model_class=Base)
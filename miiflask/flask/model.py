@@ -9,7 +9,11 @@
 """
 SQLAlchemy Data Model
 """
+from datetime import datetime, timezone
+
 from miiflask.flask.db import Base
+from miiflask.flask.reverse_index import create_reverse_index
+from miiflask.flask.search import create_search_index
 from sqlalchemy import (ForeignKey,
                         Column,
                         Integer,
@@ -19,8 +23,13 @@ from sqlalchemy import (ForeignKey,
                         UnicodeText,
                         Boolean,
                         Float,
+                        Index,
+                        DateTime,
+                        event,
+                        inspect,
                         )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.orm import Session as _Session
 
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from marshmallow_sqlalchemy.fields import Nested
@@ -47,6 +56,63 @@ class Administrative(Base):
     id: Mapped[str] = mapped_column(String(10), primary_key=True)
     mii_comment: Mapped[Optional[str]] = mapped_column(UnicodeText)
 
+
+# Data version
+# Single row generation counter for the catalog contents
+# Bumped once per committed transaction that wrote other objects
+# (dbinit, admin edits), used to validate HTTP caches and generated artifacts
+
+class DataVersion(Base):
+    __tablename__ = "dataversion"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, default=0)
+    updated: Mapped[datetime] = mapped_column(DateTime)
+
+    def __str__(self):
+        return f'{self.generation}'
+
+
+def _has_data_changes(session):
+    changed = (session.new, session.dirty, session.deleted)
+    return any(not isinstance(obj, DataVersion)
+               for objs in changed for obj in objs)
+
+
+@event.listens_for(_Session, "before_flush")
+def _mark_data_changed(session, flush_context, instances):
+    if _has_data_changes(session):
+        session.info['data_changed'] = True
+
+
+@event.listens_for(_Session, "before_commit")
+def _bump_data_version(session):
+    if not (session.info.get('data_changed') or _has_data_changes(session)):
+        return
+    if not inspect(session.connection()).has_table(DataVersion.__tablename__):
+        # Database built before the data version, its writes are not versioned
+        return
+    version = session.get(DataVersion, 1)
+    if version is None:
+        version = DataVersion(id=1, generation=0)
+        session.add(version)
+    version.generation = (version.generation or 0) + 1
+    # SQLite stores naive datetimes, keep everything in UTC
+    version.updated = datetime.now(timezone.utc).replace(tzinfo=None,
+                                                         microsecond=0)
+
+
+@event.listens_for(_Session, "after_commit")
+@event.listens_for(_Session, "after_rollback")
+def _reset_data_changed(session):
+    session.info.pop('data_changed', None)
+
+
+# FTS5 search table and triggers, see miiflask.flask.search
+event.listen(Base.metadata, "after_create", create_search_index)
+# Aspect reverse index triggers, see miiflask.flask.reverse_index
+event.listen(Base.metadata, "after_create", create_reverse_index)
+
+
 # M-Layer Model
 scaleaspect_table = Table(
     "scaleaspect_table",
@@ -167,7 +233,7 @@ class Aspect(Base):
     # Do not keep relationship to other tables
     __tablename__ = "aspect"
     id: Mapped[str] = mapped_column(String(10), primary_key=True)
-    name: Mapped[str] = mapped_column(String(50))
+    name: Mapped[str] = mapped_column(String(50), index=True)
     ml_name: Mapped[str] = mapped_column(String(50))
     symbol: Mapped[Optional[str]] = mapped_column(String(50))
     reference: Mapped[Optional[str]] = mapped_column(String(200))
@@ -297,7 +363,7 @@ class MeasurandTaxon(Base):
     __tablename__ = "measurandtaxon"
     id: Mapped[str] = mapped_column(UnicodeText, primary_key=True)
     
-    name: Mapped[str] = mapped_column(String(50))
+    name: Mapped[str] = mapped_column(String(50), index=True)
 
     definition: Mapped[Optional[str]] = mapped_column(UnicodeText)
     
@@ -406,6 +472,9 @@ class Reference(Base):
     measurandtaxon_id: Mapped[Optional[int]] = mapped_column(ForeignKey("measurandtaxon.id"))
     measurandtaxon: Mapped['MeasurandTaxon'] = relationship(back_populates="external_references")
 
+    def __str__(self):
+        return f'{self.reference_name}'
+
 
 class Taxon(Base):
     __tablename__ = "taxon"
@@ -527,49 +596,73 @@ kcdb_measurand_map = Table(
         "measurandtaxon_id",
         ForeignKey("measurandtaxon.id"),
         primary_key=True,
+        # CMCs of a measurand, the primary key starts with kcdbcmc_id
+        index=True,
     ),
 )
 
+# Reverse indexes of the aspects, maintained by triggers
+# See miiflask.flask.reverse_index
+aspect_dependent_table = Table(
+    "aspect_dependent",
+    Base.metadata,
+    Column("aspect_id", String(10), primary_key=True),
+    Column("entity", String(20), primary_key=True),
+    Column("key", UnicodeText, primary_key=True),
+    Column("relation", String(20), primary_key=True),
+    Index("ix_aspect_dependent_entity_key", "entity", "key"),
+)
+
+aspect_kcdbcmc_table = Table(
+    "aspect_kcdbcmc",
+    Base.metadata,
+    Column("aspect_id", String(10), primary_key=True),
+    Column("kcdbcmc_id", Integer, primary_key=True),
+    Column("measurandtaxon_id", UnicodeText, primary_key=True),
+    Column("relation", String(20), primary_key=True),
+    Index("ix_aspect_kcdbcmc_measurand", "measurandtaxon_id", "kcdbcmc_id"),
+)
+
 # MRA SIM Calibration and Measurement Capabilities entries in the KCDB
 class KcdbCmc(Base):
     __tablename__ = "kcdbcmc"
     id: Mapped[int] = mapped_column(primary_key=True)
-    kcdbCode: Mapped[str] = mapped_column(String(50))
+    kcdbCode: Mapped[str] = mapped_column(String(50), index=True)
     baseUnit: Mapped[str] = mapped_column(UnicodeText)
     uncertaintyBaseUnit: Mapped[str] = mapped_column(UnicodeText)
     internationalStandard: Mapped[Optional[str]] = mapped_column(UnicodeText)
     comments: Mapped[str] = mapped_column(UnicodeText)
 
     area_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbarea.id"))
+        mapped_column(ForeignKey("kcdbarea.id"), index=True)
     area: Mapped['KcdbArea'] = relationship()
 
     branch_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbbranch.id"))
+        mapped_column(ForeignKey("kcdbbranch.id"), index=True)
     branch: Mapped['KcdbBranch'] = relationship()
 
     service_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbservice.id"))
+        mapped_column(ForeignKey("kcdbservice.id"), index=True)
     service: Mapped['KcdbService'] = relationship()
 
     subservice_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbsubservice.id"))
+        mapped_column(ForeignKey("kcdbsubservice.id"), index=True)
     subservice: Mapped['KcdbSubservice'] = relationship()
 
     individualservice_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbindividualservice.id"))
+        mapped_column(ForeignKey("kcdbindividualservice.id"), index=True)
     individualservice: Mapped['KcdbIndividualService'] = relationship()
 
     quantity_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbquantity.id"))
+        mapped_column(ForeignKey("kcdbquantity.id"), index=True)
     quantity: Mapped['KcdbQuantity'] = relationship()
 
     instrument_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbinstrument.id"))
+        mapped_column(ForeignKey("kcdbinstrument.id"), index=True)
     instrument: Mapped["KcdbInstrument"] = relationship()
 
     instrumentmethod_id: Mapped[Optional[int]] = \
-        mapped_column(ForeignKey("kcdbinstrumentmethod.id"))
+        mapped_column(ForeignKey("kcdbinstrumentmethod.id"), index=True)
     instrumentmethod: Mapped["KcdbInstrumentMethod"] = relationship()
 
     parameters: Mapped[list['KcdbParameter']] = \
@@ -594,12 +687,35 @@ class KcdbParameter(Base):
     name = Column(UnicodeText)
     value = Column(UnicodeText)
     kcdbcmc = relationship('KcdbCmc', back_populates='parameters')
-    kcdbcmc_id = Column(Integer, ForeignKey('kcdbcmc.id'))
+    kcdbcmc_id = Column(Integer, ForeignKey('kcdbcmc.id'), index=True)
+    # Parsed value normalized to a root m-layer scale,
+    # see miiflask.utils.parameter_parser
+    scale_id = Column(String(10), ForeignKey('scale.id'), index=True)
+    scale = relationship('Scale')
+    ranges = relationship('KcdbParameterRange', back_populates='parameter',
+                          cascade='all, delete-orphan')
 
     def __str__(self):
         return f'name: {self.name} value: {self.value}'
 
 
+class KcdbParameterRange(Base):
+    """
+    Inclusive interval of a parameter value, lower == upper for a discrete value
+    Open ends are stored as -inf/inf
+    """
+    __tablename__ = "kcdbparameterrange"
+    id = Column(Integer, primary_key=True)
+    parameter_id = Column(Integer, ForeignKey('kcdbparameter.id'), index=True)
+    parameter = relationship('KcdbParameter', back_populates='ranges')
+    scale_id = Column(String(10), ForeignKey('scale.id'))
+    lower = Column(Float)
+    upper = Column(Float)
+
+    def __str__(self):
+        return f'{self.lower} to {self.upper}'
+
+
 class KcdbInstrument(Base):
     __tablename__ = "kcdbinstrument"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -633,7 +749,7 @@ class KcdbQuantity(Base):
 class KcdbArea(Base):
     __tablename__ = "kcdbarea"
     id: Mapped[int] = mapped_column(primary_key=True)
-    label: Mapped[str] = mapped_column(String(200))
+    label: Mapped[str] = mapped_column(String(200), index=True)
     value: Mapped[str] = mapped_column(UnicodeText)
 
     def __str__(self):
@@ -741,6 +857,8 @@ class KcdbParameterSchema(SQLAlchemyAutoSchema):
         include_relationships = True
         load_instance = True
         ordered = True
+        # Parsed ranges are derived from value
+        exclude = ('scale', 'ranges')
 
 
 class KcdbInstrumentSchema(SQLAlchemyAutoSchema):
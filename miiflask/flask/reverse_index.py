@@ -0,0 +1,160 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Materialized reverse indexes of the aspects
+
+    aspect_dependent  aspect -> measurands (aspect, result aspect)
+                      and parameters (aspect) using it
+    aspect_kcdbcmc    aspect -> CMCs linked to a measurand using it,
+                      through the measurand aspects or its parameters
+
+The tables are declared in model.py, SQLite triggers keep them in sync with
+measurandtaxon, parameter and kcdb_measurand_map while loading and on
+admin edits. Dependents of an aspect are read with the primary key index
+"""
+from sqlalchemy import text
+
+DEPENDENT_TABLE = "aspect_dependent"
+CMC_TABLE = "aspect_kcdbcmc"
+
+# entity: (source table, aspect column, relation)
+DEPENDENTS = {
+    'measurand': (('measurandtaxon', 'aspect_id', 'aspect'),
+                  ('measurandtaxon', 'result_aspect_id', 'result_aspect')),
+    'parameter': (('parameter', 'aspect_id', 'aspect'),),
+}
+
+
+def _insert_dependents(entity, where):
+    return [
+        f"INSERT OR IGNORE INTO {DEPENDENT_TABLE} (aspect_id, entity, key, relation) "
+        f"SELECT src.{column}, '{entity}', src.id, '{relation}' FROM {table} AS src "
+        f"WHERE src.{column} IS NOT NULL AND {where};"
+        for table, column, relation in DEPENDENTS[entity]]
+
+
+def _delete_dependents(entity, key):
+    return f"DELETE FROM {DEPENDENT_TABLE} WHERE entity = '{entity}' AND key = {key};"
+
+
+def _insert_cmcs(taxon=None, where='1'):
+    # Aspects of the measurand taxon (all when None) joined to its CMCs
+    if taxon is None:
+        id_, taxon_id = '1', '1'
+    else:
+        id_, taxon_id = f'id = {taxon}', f'measurandtaxon_id = {taxon}'
+    return (f"INSERT OR IGNORE INTO {CMC_TABLE} "
+            "(aspect_id, kcdbcmc_id, measurandtaxon_id, relation) "
+            "SELECT a.aspect_id, m.kcdbcmc_id, m.measurandtaxon_id, a.relation "
+            "FROM kcdb_measurand_map AS m JOIN ("
+            f"SELECT id AS taxon_id, aspect_id, 'aspect' AS relation FROM measurandtaxon WHERE {id_} "
+            f"UNION ALL SELECT id, result_aspect_id, 'result_aspect' FROM measurandtaxon WHERE {id_} "
+            f"UNION ALL SELECT measurandtaxon_id, aspect_id, 'parameter' FROM parameter WHERE {taxon_id}"
+            ") AS a ON a.taxon_id = m.measurandtaxon_id "
+            f"WHERE a.aspect_id IS NOT NULL AND {where};")
+
+
+def _delete_cmcs(taxon):
+    return f"DELETE FROM {CMC_TABLE} WHERE measurandtaxon_id = {taxon};"
+
+
+def _trigger(name, event, table, *statements):
+    return (f"CREATE TRIGGER IF NOT EXISTS {DEPENDENT_TABLE}_{name} "
+            f"AFTER {event} ON {table} BEGIN {' '.join(statements)} END")
+
+
+def _ddl():
+    yield _trigger('measurandtaxon_ai', 'INSERT', 'measurandtaxon',
+                   *_insert_dependents('measurand', 'src.id = new.id'),
+                   _insert_cmcs('new.id'))
+    yield _trigger('measurandtaxon_ad', 'DELETE', 'measurandtaxon',
+                   _delete_dependents('measurand', 'old.id'),
+                   _delete_cmcs('old.id'))
+    yield _trigger('measurandtaxon_au', 'UPDATE OF id, aspect_id, result_aspect_id',
+                   'measurandtaxon',
+                   _delete_dependents('measurand', 'old.id'),
+                   *_insert_dependents('measurand', 'src.id = new.id'),
+                   _delete_cmcs('old.id'),
+                   _insert_cmcs('new.id'))
+    yield _trigger('parameter_ai', 'INSERT', 'parameter',
+                   *_insert_dependents('parameter', 'src.id = new.id'),
+                   _delete_cmcs('new.measurandtaxon_id'),
+                   _insert_cmcs('new.measurandtaxon_id'))
+    yield _trigger('parameter_ad', 'DELETE', 'parameter',
+                   _delete_dependents('parameter', 'old.id'),
+                   _delete_cmcs('old.measurandtaxon_id'),
+                   _insert_cmcs('old.measurandtaxon_id'))
+    yield _trigger('parameter_au', 'UPDATE OF id, aspect_id, measurandtaxon_id', 'parameter',
+                   _delete_dependents('parameter', 'old.id'),
+                   *_insert_dependents('parameter', 'src.id = new.id'),
+                   _delete_cmcs('old.measurandtaxon_id'),
+                   _insert_cmcs('old.measurandtaxon_id'),
+                   _delete_cmcs('new.measurandtaxon_id'),
+                   _insert_cmcs('new.measurandtaxon_id'))
+    # One CMC linked or unlinked
+    link = 'm.kcdbcmc_id = new.kcdbcmc_id'
+    unlink = (f"DELETE FROM {CMC_TABLE} WHERE measurandtaxon_id = old.measurandtaxon_id "
+              f"AND kcdbcmc_id = old.kcdbcmc_id;")
+    yield _trigger('kcdb_measurand_map_ai', 'INSERT', 'kcdb_measurand_map',
+                   _insert_cmcs('new.measurandtaxon_id', link))
+    yield _trigger('kcdb_measurand_map_ad', 'DELETE', 'kcdb_measurand_map', unlink)
+    yield _trigger('kcdb_measurand_map_au', 'UPDATE', 'kcdb_measurand_map',
+                   unlink, _insert_cmcs('new.measurandtaxon_id', link))
+
+
+def rebuild_reverse_index(connection):
+    """
+    Rewrite both tables from the source tables
+    """
+    connection.execute(text(f"DELETE FROM {DEPENDENT_TABLE}"))
+    connection.execute(text(f"DELETE FROM {CMC_TABLE}"))
+    for entity in DEPENDENTS:
+        for statement in _insert_dependents(entity, '1'):
+            connection.execute(text(statement))
+    connection.execute(text(_insert_cmcs()))
+
+
+def create_reverse_index(target, connection, **kw):
+    """
+    MetaData after_create listener, SQLite only
+    Tables added to an existing database are populated once
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    for statement in _ddl():
+        connection.execute(text(statement))
+    empty = connection.execute(text(f"SELECT 1 FROM {DEPENDENT_TABLE} LIMIT 1")).first() is None
+    loaded = connection.execute(text("SELECT 1 FROM measurandtaxon LIMIT 1")).first() is not None
+    if empty and loaded:
+        rebuild_reverse_index(connection)
+
+
+def aspect_dependents(session, aspect_id):
+    """
+    {'measurands': [...], 'parameters': [...], 'kcdbcmcs': [...]} of an aspect
+    """
+    params = {'aspect_id': aspect_id}
+    measurands = session.execute(text(
+        f"SELECT t.id, t.name, d.relation FROM {DEPENDENT_TABLE} AS d "
+        "JOIN measurandtaxon AS t ON t.id = d.key "
+        "WHERE d.aspect_id = :aspect_id AND d.entity = 'measurand' "
+        "ORDER BY t.name, d.relation"), params)
+    parameters = session.execute(text(
+        f"SELECT p.id, p.name, p.measurandtaxon_id, d.relation FROM {DEPENDENT_TABLE} AS d "
+        "JOIN parameter AS p ON p.id = CAST(d.key AS INTEGER) "
+        "WHERE d.aspect_id = :aspect_id AND d.entity = 'parameter' "
+        "ORDER BY p.measurandtaxon_id, p.name"), params)
+    cmcs = session.execute(text(
+        f"SELECT c.id, c.kcdbCode, d.measurandtaxon_id, d.relation FROM {CMC_TABLE} AS d "
+        "JOIN kcdbcmc AS c ON c.id = d.kcdbcmc_id "
+        "WHERE d.aspect_id = :aspect_id "
+        "ORDER BY c.kcdbCode, d.measurandtaxon_id, d.relation"), params)
+    return {'measurands': [dict(row._mapping) for row in measurands],
+            'parameters': [dict(row._mapping) for row in parameters],
+            'kcdbcmcs': [dict(row._mapping) for row in cmcs]}
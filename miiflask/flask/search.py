@@ -0,0 +1,148 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Full-text search over the taxonomy, m-layer and KCDB
+
+One SQLite FTS5 table holds a (title, body) document per searchable row,
+so BM25 scores are comparable across entity types.
+The table and its triggers are created with the schema (metadata create_all),
+also when a writable app starts on a database built before them,
+rows are written by the triggers while loading and kept in sync afterwards
+"""
+import re
+
+from sqlalchemy import text
+
+SEARCH_TABLE = "search_fts"
+
+# entity: (table, title, body, columns the document depends on)
+# Expressions are evaluated on the source row aliased src
+SOURCES = {
+    'measurand': ('measurandtaxon', "src.name", "src.definition",
+                  ('name', 'definition')),
+    'parameter': ('parameter', "src.name", "src.definition",
+                  ('name', 'definition')),
+    'aspect': ('aspect', "src.name", "''", ('name',)),
+    'scale': ('scale', "src.ml_name", "''", ('ml_name',)),
+    'unit': ('unit', "src.name", "src.symbol", ('name', 'symbol')),
+    'kcdbcmc': ('kcdbcmc',
+                "(SELECT value FROM kcdbquantity WHERE id = src.quantity_id)",
+                "coalesce((SELECT value FROM kcdbinstrument"
+                " WHERE id = src.instrument_id), '')"
+                " || ' ' || coalesce(src.comments, '')",
+                ('quantity_id', 'instrument_id', 'comments')),
+}
+
+# Lookup tables denormalized into the CMC documents, table: cmc column
+CMC_LOOKUPS = {
+    'kcdbquantity': 'quantity_id',
+    'kcdbinstrument': 'instrument_id',
+}
+
+# Title matches rank above body matches, entity and key are not indexed
+WEIGHTS = (0.0, 0.0, 10.0, 1.0)
+
+
+def _insert(entity, where):
+    table, title, body, _ = SOURCES[entity]
+    return (f"INSERT INTO {SEARCH_TABLE} (entity, key, title, body) "
+            f"SELECT '{entity}', src.id, {title}, {body} "
+            f"FROM {table} AS src WHERE {where};")
+
+
+def _delete(entity, where):
+    return f"DELETE FROM {SEARCH_TABLE} WHERE entity = '{entity}' AND key {where};"
+
+
+def _ddl():
+    yield (f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+           "entity UNINDEXED, key UNINDEXED, title, body, "
+           "tokenize = 'unicode61 remove_diacritics 2')")
+    for entity, (table, _, _, columns) in SOURCES.items():
+        yield (f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{entity}_ai "
+               f"AFTER INSERT ON {table} BEGIN "
+               f"{_insert(entity, 'src.id = new.id')} END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{entity}_ad "
+               f"AFTER DELETE ON {table} BEGIN "
+               f"{_delete(entity, '= old.id')} END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{entity}_au "
+               f"AFTER UPDATE OF id, {', '.join(columns)} ON {table} BEGIN "
+               f"{_delete(entity, '= old.id')} "
+               f"{_insert(entity, 'src.id = new.id')} END")
+    for table, column in CMC_LOOKUPS.items():
+        yield (f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_{table}_au "
+               f"AFTER UPDATE OF value ON {table} BEGIN "
+               f"{_delete('kcdbcmc', f'IN (SELECT id FROM kcdbcmc WHERE {column} = new.id)')} "
+               f"{_insert('kcdbcmc', f'src.{column} = new.id')} END")
+
+
+def rebuild_search_index(connection):
+    """
+    Rewrite all documents from the source tables
+    """
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    for entity in SOURCES:
+        connection.execute(text(_insert(entity, '1')))
+    connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+
+
+def create_search_index(target, connection, **kw):
+    """
+    MetaData after_create listener, SQLite only
+    A table created on an existing database is populated once
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': SEARCH_TABLE}).first()
+    for statement in _ddl():
+        connection.execute(text(statement))
+    if not exists:
+        rebuild_search_index(connection)
+
+
+def match_expression(q):
+    """
+    FTS5 query of the words in q, all required, the last one as prefix
+    None when q has no words
+    """
+    words = re.findall(r'\w+', q)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search(session, q, limit=20, entities=None):
+    """
+    BM25 ranked documents matching q, best first
+    """
+    expression = match_expression(q)
+    if expression is None:
+        return []
+    params = {'q': expression, 'limit': limit}
+    where = ''
+    if entities:
+        names = [f':entity_{i}' for i in range(len(entities))]
+        params.update({f'entity_{i}': e for i, e in enumerate(entities)})
+        where = f"AND entity IN ({', '.join(names)})"
+    weights = ', '.join(str(w) for w in WEIGHTS)
+    rows = session.execute(text(
+        f"SELECT entity, key, title, "
+        f"snippet({SEARCH_TABLE}, -1, '', '', '...', 16) AS snippet, "
+        f"bm25({SEARCH_TABLE}, {weights}) AS score "
+        f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :q {where} "
+        f"ORDER BY score LIMIT :limit"), params)
+    return [{'entity': row.entity,
+             'id': row.key,
+             'title': row.title,
+             'snippet': row.snippet,
+             'score': row.score} for row in rows]
@@ -10,13 +10,23 @@
 
 """
 import logging
+import math
+import os
+from concurrent.futures import TimeoutError as RenderTimeout
+from functools import partial
 
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from sqlalchemy.orm.base import instance_state
-from flask import (render_template,
+from flask import (Blueprint,
+                   current_app,
+                   render_template,
+                   abort,
                    redirect,
                    request,
                    url_for,
-                   flash
+                   flash,
+                   g
                    )
 
 from flask_admin.contrib.sqla import ModelView
@@ -49,38 +59,138 @@ from miiflask.flask.model import (
     Reference,
     KcdbCmc,
     KcdbBranch,
+    KcdbService,
     KcdbParameter,
     KcdbArea
 )
 from miiflask.flask.model import AspectSchema, MeasurandTaxonSchema, KcdbCmcSchema, UnitSchema, ScaleSchema
 
-from miiflask.flask.app import app
-from miiflask.flask.app import db
+from miiflask.flask.extensions import db
+from miiflask.flask.conditional import (
+        conditional,
+        send_artifact,
+        send_gzipped,
+        get_data_version,
+        matching_etag
+        )
+from miiflask.flask import exports
+from miiflask.flask import search
+from miiflask.flask.reverse_index import aspect_dependents
+from miiflask.utils.artifacts import NETWORK_LAYOUT, ArtifactBuilder, artifact_path
+from miiflask.utils.schema_compiler import compile_schema
+from miiflask.utils.autocomplete import Autocomplete
+from miiflask.utils.cmc_suggestions import CmcSuggestions
+from miiflask.utils.facets import FACETS, CmcFacets
+from miiflask.utils.graph_cache import DiagramCache, PoolBusy, RenderPool
+from miiflask.utils.graph_data import load_graph_data
+from miiflask.utils.graph_store import GRAPH_ENTITIES, graph_path
+from miiflask.utils.interval_index import IntervalIndex
+from miiflask.utils.network_layout import NetworkTiles, network_layout
+from miiflask.utils.parameter_parser import UnitResolver, parse_value
+from miiflask.utils.relationship_graph import ENTITIES, RelationshipGraph, node_key
 #from miiflask.mappers.taxonomy_mapper import dicttoxml_taxonomy, getTaxonDict
 from miiflask.mappers.mlayer_mapper import MlayerMapper
 from miiflask.mappers.taxonomy_mapper_v2 import TaxonomyMapper
 from miiflask.mappers.kcdb_mapper import KcdbMapper
-from miiflask.utils.model_visualizer import (
-    generate_data_model_diagram,
-    visualize_model_instance
-    )
+from miiflask.utils.model_visualizer import data_model_key, render_graph_data
 
 import pprint as mpprint
 import json
 import graphviz
-import base64
 
 log = logging.getLogger("flask-admin.sqla")
 
-qk_schema = AspectSchema()
-aspects_schema = AspectSchema(many=True)
-scale_schema = ScaleSchema()
-scales_schema = ScaleSchema(many=True)
-unit_schema = UnitSchema()
-units_schema = UnitSchema(many=True)
-m_schema = MeasurandTaxonSchema()
-measurands_schema = MeasurandTaxonSchema(many=True)
-cmc_schema = KcdbCmcSchema()
+# Site pages and API, registered on each app by init_app
+bp = Blueprint("main", __name__)
+
+qk_schema = compile_schema(AspectSchema())
+scale_schema = compile_schema(ScaleSchema())
+unit_schema = compile_schema(UnitSchema())
+m_schema = exports.m_schema
+cmc_schema = exports.cmc_schema
+
+
+class ViewState:
+    """
+    Caches of the views for one app, app.extensions["miiflask"]
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # In-memory indexes of the current data version, name: (version, index)
+        self.versioned = {}
+        graphs_path = app.config.get("GRAPHS_PATH")
+        self.diagram_cache = DiagramCache(os.path.join(graphs_path, "diagrams")
+                                          if graphs_path else None)
+        self.start_render_pool()
+
+    def start_render_pool(self):
+        # Threads do not survive a fork, a forked worker starts its own pool
+        self.instance_graphs = RenderPool(partial(_render_instance_graph, self.app),
+                                          workers=self.app.config.get("GRAPH_WORKERS", 2))
+
+
+def init_app(app):
+    """
+    Register the blueprint and the caches of the views on app
+    """
+    app.extensions["miiflask"] = ViewState(app)
+    app.register_blueprint(bp)
+
+
+def view_state():
+    return current_app.extensions["miiflask"]
+
+
+def versioned(name, build):
+    """
+    Index built by build() once per data version
+    """
+    version = get_data_version(db.session)
+    cache = view_state().versioned
+    cached = cache.get(name)
+    if cached is None or cached[0] != version:
+        cached = cache[name] = (version, build())
+    return cached[1]
+
+
+def cmc_suggestions():
+    return versioned("cmc_suggestions", lambda: CmcSuggestions(db.session, k=5))
+
+
+def _load_network_layout():
+    # Prebuilt with the artifacts of the generation, computed otherwise
+    root = current_app.config.get("ARTIFACTS_PATH")
+    version = get_data_version(db.session)
+    path = artifact_path(root, version, NETWORK_LAYOUT) if root and version else None
+    if path:
+        return json.loads(path.read_bytes())
+    return network_layout(db.session)
+
+
+def network_tiles():
+    return versioned("network", lambda: NetworkTiles(_load_network_layout()))
+
+
+def capability_index():
+    """
+    (IntervalIndex, UnitResolver) of the current data version
+    """
+    return versioned("capability", lambda: (IntervalIndex.from_session(db.session),
+                                            UnitResolver(db.session)))
+
+
+def autocomplete():
+    return versioned("autocomplete", lambda: Autocomplete(db.session))
+
+
+def cmc_facets():
+    return versioned("cmc_facets", lambda: CmcFacets(db.session))
+
+
+def relationship_graph():
+    return versioned("relationship_graph", lambda: RelationshipGraph(db.session))
+
 
 def _link_formatter(view, context, model, name):
     field = getattr(model, name)
@@ -122,6 +232,24 @@ class MyEqualFilter(MyBaseFilter):
         return value
 
 
+class FacetFilter(MyEqualFilter):
+    """
+    Equality on a CMC service hierarchy column,
+    options with counts are filled per request by CMCView
+    """
+
+    def __init__(self, facet):
+        super(FacetFilter, self).__init__(getattr(KcdbCmc, f'{facet}_id'),
+                                          facet.capitalize())
+        self.facet = facet
+
+    def validate(self, value):
+        return value.isdigit()
+
+    def clean(self, value):
+        return int(value)
+
+
 class MyUniqueFilter(MyBaseFilter):
 # TBD
     def apply(self, query, value, alias=None):
@@ -142,6 +270,16 @@ class MyUniqueFilter(MyBaseFilter):
         return value
 
 
+def read_only_view(view):
+    """
+    Admin model view without create, edit, delete and the actions writing to the database
+    """
+    view.can_create = view.can_edit = view.can_delete = False
+    view.action_disallowed_list = list(view.action_disallowed_list) \
+        + list(getattr(view, 'write_actions', ()))
+    return view
+
+
 class MyModelView(ModelView):
     def __init__(self, model, *args, **kwargs):
         self.form_columns = [c.key for c in model.__table__.columns]
@@ -167,6 +305,8 @@ class ChangeForm(Form):
 
 class CMCView(MyModelView):
     list_template = 'custom_list.html' 
+    # Disabled by read_only_view
+    write_actions = ('change_measurand',)
     def _parameter_formatter(view, context, model, name):
         names = [p.name for p in model.parameters]
         return Markup((',<br/>').join(names))
@@ -194,13 +334,63 @@ class CMCView(MyModelView):
             joined_ids = ','.join(ids)
             change_form = ChangeForm()
             change_form.ids.data = joined_ids
+            self._template_args['suggestions'] = cmc_suggestions().for_cmcs(
+                    [int(id_) for id_ in ids])
             self._template_args['url'] = url
             self._template_args['change_form'] = change_form
             self._template_args['change_modal'] = True
             return self.index_view()
 
+    def _facet_selection(self, filters):
+        """
+        {facet: id} of the active filters, None if any other filter is active
+        """
+        selection = {}
+        for idx, _, value in filters or ():
+            flt = self._filters[idx]
+            if not isinstance(flt, FacetFilter):
+                return None
+            selection[flt.facet] = flt.clean(value)
+        return selection
+
+    def _get_filter_groups(self):
+        # Options with the counts within the other active facet filters
+        groups = super(CMCView, self)._get_filter_groups()
+        facets = cmc_facets()
+        selection = self._facet_selection(
+            [f for f in self._get_list_filter_args()
+             if isinstance(self._filters[f[0]], FacetFilter)])
+        for items in (groups or {}).values():
+            for item in items:
+                flt = self._filters[item['index']]
+                if isinstance(flt, FacetFilter):
+                    item['options'] = [(str(id_), f'{label} ({count})')
+                                       for id_, label, count
+                                       in facets.options(flt.facet, selection)]
+        return groups
+
+    def get_count_query(self):
+        if g.get('cmc_facet_count') is not None:
+            return None
+        return super(CMCView, self).get_count_query()
+
+    def get_list(self, page, sort_column, sort_desc, search, filters,
+                 execute=True, page_size=None):
+        # Filtered pages take the count from the facet counts
+        selection = None if search else self._facet_selection(filters)
+        g.cmc_facet_count = None if selection is None else cmc_facets().count(selection)
+        try:
+            count, query = super(CMCView, self).get_list(
+                    page, sort_column, sort_desc, search, filters,
+                    execute=execute, page_size=page_size)
+        finally:
+            facet_count = g.pop('cmc_facet_count', None)
+        return (facet_count if count is None else count), query
+
     @expose('/update/', methods=['POST'])
     def update_view(self):
+        if not self.is_action_allowed('change_measurand'):
+            abort(403)
         if request.method == 'POST':
             url = get_redirect_target() or self.get_url('.index_view')
             change_form = ChangeForm(request.form)
@@ -234,12 +424,8 @@ class CMCView(MyModelView):
     column_searchable_list = ['area.label', 
                               'quantity.value', 
                               'kcdbCode']
-    column_filters = ('area.label', 
-                      'branch.value', 
-                      'service.value',
-                      'subservice.value',
-                      'individualservice.value',
-                      MyEqualFilter(KcdbCmc.kcdbCode, 'kcdbCode'))
+    column_filters = tuple(FacetFilter(facet) for facet in FACETS) + \
+        (MyEqualFilter(KcdbCmc.kcdbCode, 'kcdbCode'),)
     column_formatters = {'parameter_names': _parameter_formatter,
             'measurands': _measurand_formatter}
     column_labels = {'parameter_names': 'Parameters'}
@@ -628,23 +814,15 @@ class AspectView(MyModelView):
                            )
 
 
-@app.route("/")
+@bp.route("/")
 def index():
-    meta = db.session.info
-    print(meta)
-    measurands = MeasurandTaxon.query.all()
-    aspects = Aspect.query.all()
-    scales = Scale.query.all()
-    return render_template(
-        "index.html",
-        measurands=measurands,
-        aspects=aspects,
-        scales=scales,
-    )
-
-
-@app.route("/initialize")
+    return render_template("index.html", entities=Autocomplete.entities)
+
+
+@bp.route("/initialize")
 def initialize():
+    if current_app.config.get("READ_ONLY"):
+        abort(403)
 
     parms = {
             "measurands": "../../resources/measurand-taxonomy/MeasurandTaxonomyCatalog.xml",
@@ -670,297 +848,639 @@ def initialize():
     kcdbmapper.loadServices()
     
     db.session.commit()
-    return redirect(url_for('index'))
+
+    if current_app.config.get("ARTIFACTS_PATH"):
+        artifacts = ArtifactBuilder(db.session,
+                                    {"artifacts": current_app.config["ARTIFACTS_PATH"]})
+        artifacts.build()
+    return redirect(url_for('main.index'))
 
 
-@app.route("/taxonomy/")
+@bp.route("/taxonomy/")
 def taxonomy():
     measurand = MeasurandTaxon()
     measurands = measurand.query.all()
     return render_template("taxonomy.html", measurands=measurands)
 
 
-@app.route("/kcdbcmcs/")
+@bp.route("/kcdbcmcs/")
 def kcdbcmcs():
-    cmc = KcdbCmc()
-    cmcs = cmc.query.all()
+    cmcs = KcdbCmc.query.options(selectinload(KcdbCmc.measurands)).all()
     return render_template("kcdbcmcs.html", cmcs=cmcs)
 
 
-@app.route("/kcdbcmcs/export/json")
+@bp.route("/kcdbcmcs/export/json")
+@conditional
 def kcdbcmcs_export_json():
-    cmc = KcdbCmc()
-    cmcs = cmc.query.all()
-    schema = cmc_schema.dumps(cmcs, many=True, indent=4)
-    response = app.make_response(schema)
+    artifact = send_artifact("kcdbcmcs/export_cmcs.json", "text/json",
+                             download_name="export_cmcs.json")
+    if artifact:
+        return artifact
+    schema = exports.cmcs_json(db.session)
+    response = current_app.make_response(schema)
     response.headers["Content-Disposition"] = "attachment; filename=export_cmcs.json"
     response.headers["Content-type"] = "text/json"
     return response 
 
 
-@app.route("/kcdbcmcs/auv/")
-def kcdbcmcs_auv():
-    cmcs = KcdbCmc.query.filter(KcdbCmc.area.has(KcdbArea.label == 'AUV')).all()
-    return render_template("kcdbcmcs.html", cmcs=cmcs)
-
-
-@app.route("/kcdbcmcs/em/")
-def kcdbcmcs_em():
-    cmcs = KcdbCmc.query.filter(KcdbCmc.area.has(KcdbArea.label == 'EM')).all()
-    return render_template("kcdbcmcs.html", cmcs=cmcs)
-
-
-@app.route("/kcdbcmcs/l/")
-def kcdbcmcs_l():
-    cmcs = KcdbCmc.query.filter(KcdbCmc.area.has(KcdbArea.label == 'L')).all()
-    return render_template("kcdbcmcs.html", cmcs=cmcs)
-
-
-@app.route("/kcdbcmcs/m/")
-def kcdbcmcs_m():
-    cmcs = KcdbCmc.query.filter(KcdbCmc.area.has(KcdbArea.label == 'M')).all()
-    return render_template("kcdbcmcs.html", cmcs=cmcs)
-
-
-@app.route("/kcdbcmcs/pr/")
-def kcdbcmcs_pr():
-    cmcs = KcdbCmc.query.filter(KcdbCmc.area.has(KcdbArea.label == 'PR')).all()
-    return render_template("kcdbcmcs.html", cmcs=cmcs)
-
-
-@app.route("/kcdbcmcs/t/")
-def kcdbcmcs_t():
-    cmcs = KcdbCmc.query.filter(KcdbCmc.area.has(KcdbArea.label == 'T')).all()
-    return render_template("kcdbcmcs.html", cmcs=cmcs)
-
-
-@app.route("/kcdbcmcs/tf/")
-def kcdbcmcs_tf():
-    cmcs = KcdbCmc.query.filter(KcdbCmc.area.has(KcdbArea.label == 'TF')).all()
-    return render_template("kcdbcmcs.html", cmcs=cmcs)
-
-
-@app.route("/kcdbcmc/<string:kcdbcmc_id>/export/json", methods=["GET", "POST"])
+# Sort keys of the area listing, column and the relationship to join
+_cmc_sorts = {
+    "kcdbCode": (KcdbCmc.kcdbCode, None),
+    "branch": (KcdbBranch.value, KcdbCmc.branch),
+    "service": (KcdbService.value, KcdbCmc.service),
+}
+
+
+@bp.route("/kcdbcmcs/<string:area>/")
+def kcdbcmcs_area(area):
+    area_ = KcdbArea.query.filter(KcdbArea.label == area.upper()).first_or_404()
+    branch = request.args.get("branch", type=int)
+    service = request.args.get("service", type=int)
+    sort = request.args.get("sort", "kcdbCode")
+    if sort not in _cmc_sorts:
+        sort = "kcdbCode"
+    order = "desc" if request.args.get("order") == "desc" else "asc"
+
+    # The area is resolved once, CMCs are filtered on the foreign key
+    query = KcdbCmc.query.filter(KcdbCmc.area_id == area_.id)
+    if branch is not None:
+        query = query.filter(KcdbCmc.branch_id == branch)
+    if service is not None:
+        query = query.filter(KcdbCmc.service_id == service)
+    column, relationship = _cmc_sorts[sort]
+    if relationship is not None:
+        query = query.outerjoin(relationship)
+    column = column.desc() if order == "desc" else column.asc()
+    # Only the columns the template shows
+    query = query.options(
+            load_only(KcdbCmc.id, KcdbCmc.kcdbCode),
+            joinedload(KcdbCmc.branch).load_only(KcdbBranch.value),
+            joinedload(KcdbCmc.service).load_only(KcdbService.value),
+            selectinload(KcdbCmc.measurands).load_only(MeasurandTaxon.id,
+                                                       MeasurandTaxon.name)
+            ).order_by(column, KcdbCmc.id)
+    pagination = query.paginate(per_page=request.args.get("per_page", 100, type=int),
+                                max_per_page=500)
+
+    # Filter choices, the branches of the area and the services of the branch
+    branches = KcdbBranch.query \
+        .join(KcdbCmc, KcdbCmc.branch_id == KcdbBranch.id) \
+        .filter(KcdbCmc.area_id == area_.id) \
+        .distinct().order_by(KcdbBranch.value).all()
+    services = KcdbService.query \
+        .join(KcdbCmc, KcdbCmc.service_id == KcdbService.id) \
+        .filter(KcdbCmc.area_id == area_.id)
+    if branch is not None:
+        services = services.filter(KcdbCmc.branch_id == branch)
+    services = services.distinct().order_by(KcdbService.value).all()
+
+    args = {"area": area, "branch": branch, "service": service,
+            "sort": sort, "order": order, "per_page": pagination.per_page}
+    return render_template("kcdbcmcs.html",
+                           cmcs=pagination.items,
+                           pagination=pagination,
+                           area=area_,
+                           branches=branches,
+                           services=services,
+                           args=args)
+
+
+@bp.route("/kcdbcmc/<string:kcdbcmc_id>/export/json", methods=["GET", "POST"])
+@conditional
 def kcdbcmc_export_json(kcdbcmc_id):
     # print("Get Meaurand ", measurand_id)
     cmc = KcdbCmc.query.get_or_404(kcdbcmc_id)
     schema = cmc_schema.dumps(cmc, indent=2)
-    response = app.make_response(schema)
+    response = current_app.make_response(schema)
     response.mimetype = "text/json"
     return response 
 
 
-@app.route("/mlayer/scales/")
+@bp.route("/mlayer/scales/")
 def scales():
     scales = Scale().query.all()
     return render_template("scales.html", scales=scales)
 
 
-@app.route("/mlayer/aspects/")
+@bp.route("/mlayer/aspects/")
 def aspects():
     aspects = Aspect().query.all()
     return render_template("aspects.html", aspects=aspects)
 
 
-@app.route("/taxonomy/export")
+@bp.route("/taxonomy/export")
+@conditional
 def taxonomy_export():
-    measurands = MeasurandTaxon.query.all()
-    c = Administrative.query.first()
-    taxons = []
-    for obj in measurands:
-        try:
-            taxons.append(TaxonomyMapper._getTaxonDict(obj, m_schema))
-        except Exception as e:
-            print(obj)
-            raise e
-    xml = TaxonomyMapper._dicttoxml_taxonomy(taxons)
-    response = app.make_response(xml)
+    artifact = send_artifact("taxonomy/export_taxonomy.xml", "text/xml",
+                             download_name="export_taxonomy.xml")
+    if artifact:
+        return artifact
+    xml = exports.taxonomy_xml(db.session)
+    response = current_app.make_response(xml)
     response.headers["Content-Disposition"] = "attachment; filename=export_taxonomy.xml"
     response.headers["Content-type"] = "text/xml"
     return response
 
 
-@app.route("/measurand/<string:measurand_id>/export/xml", methods=["GET", "POST"])
+@bp.route("/measurand/<string:measurand_id>/export/xml", methods=["GET", "POST"])
+@conditional
 def measurand_export_xml(measurand_id):
     # print("Get Meaurand ", measurand_id)
+    filename = measurand_id.replace('.','_')
+    artifact = send_artifact(f"measurand/{measurand_id}.xml", "text/xml",
+                             download_name=f"{filename}.xml")
+    if artifact:
+        return artifact
     m = MeasurandTaxon.query.get_or_404(measurand_id)
-    taxon = TaxonomyMapper._getTaxonDict(m, m_schema)
-    xml = TaxonomyMapper._dicttoxml_taxon(taxon)
-    filename = m.id.replace('.','_')
+    xml = exports.measurand_xml(m)
     content = f'attachment; filename= {filename}.xml'
-    response = app.make_response(xml)
+    response = current_app.make_response(xml)
     response.headers["Content-Disposition"] = content 
     response.headers["Content-type"] = "text/xml"
     return response 
 
 
-@app.route("/measurand/<string:measurand_id>/export/json", methods=["GET", "POST"])
+@bp.route("/measurand/<string:measurand_id>/export/json", methods=["GET", "POST"])
+@conditional
 def measurand_export_json(measurand_id):
     # print("Get Meaurand ", measurand_id)
+    artifact = send_artifact(f"measurand/{measurand_id}.json", "text/json")
+    if artifact:
+        return artifact
     m = MeasurandTaxon.query.get_or_404(measurand_id)
-    schema = m_schema.dumps(m, indent=2)
-    response = app.make_response(schema)
+    schema = exports.measurand_json(m)
+    response = current_app.make_response(schema)
     response.mimetype = "text/json"
     return response 
 
-@app.route("/measurand/<string:measurand_id>/", methods=["GET", "POST"])
+@bp.route("/measurand/<string:measurand_id>/", methods=["GET", "POST"])
 def measurand(measurand_id):
     # print("Get Meaurand ", measurand_id)
     m = MeasurandTaxon.query.get_or_404(measurand_id)
-    graph = visualize_model_instance(MeasurandTaxon, m)
+    graph = instance_graph_url("measurand", m.id)
     return render_template("measurand.html", measurand=m, graph=graph)
 
 
-@app.route("/aspect/<string:aspect_id>/", methods=["GET", "POST"])
+@bp.route("/aspect/<string:aspect_id>/", methods=["GET", "POST"])
 def aspect(aspect_id):
     # print("Get Aspect ", aspect_id)
     a = Aspect.query.get_or_404(aspect_id)
     a_schema = qk_schema.dumps(a, indent=2)
     # print(a.id)
     mpprint.pprint(a_schema)
-    graph = visualize_model_instance(Aspect, a)
-    return render_template("aspect.html", aspect=a, response=a_schema, graph=graph)
+    graph = instance_graph_url("aspect", a.id)
+    return render_template("aspect.html", aspect=a, response=a_schema, graph=graph,
+                           dependents=aspect_dependents(db.session, a.id))
 
-@app.route("/aspect/<string:aspect_id>/export/json", methods=["GET", "POST"])
+@bp.route("/aspect/<string:aspect_id>/export/json", methods=["GET", "POST"])
+@conditional
 def aspect_export_json(aspect_id):
     # print("Get Meaurand ", measurand_id)
     a = Aspect.query.get_or_404(aspect_id)
     schema = qk_schema.dumps(a, indent=2)
-    response = app.make_response(schema)
+    response = current_app.make_response(schema)
     response.mimetype = "text/json"
     return response 
 
-@app.route("/scale/<string:scale_id>/", methods=["GET", "POST"])
+@bp.route("/scale/<string:scale_id>/", methods=["GET", "POST"])
 def scale(scale_id):
     # print("Get Scale ", scale_id)
     s = Scale.query.get_or_404(scale_id)
     # print(s.id)
-    graph = visualize_model_instance(Scale, s)
+    graph = instance_graph_url("scale", s.id)
     return render_template("scale.html", scale=s, graph=graph)
 
 
-@app.route("/model/mii")
+# URL suffix: (render format, mimetype), svg is stored and sent gzip compressed
+GRAPH_FORMATS = {
+    'svg': ('svgz', 'image/svg+xml'),
+    'png': ('png', 'image/png'),
+}
+
+
+def _render_instance_graph(app, entity, entity_id, format):
+    # Worker thread, the session is the one of its own app context
+    with app.app_context():
+        data = load_graph_data(db.session, GRAPH_ENTITIES[entity], entity_id)
+        if data is None:
+            return None
+        return render_graph_data(data, format=format)
+
+
+def _instance_graph_key(entity, entity_id, format):
+    version = g.get("data_version") or get_data_version(db.session)
+    return (entity, entity_id, format, version)
+
+
+def _stored_instance_graph(key):
+    # Prerendered by dbinit, see miiflask.utils.graph_store
+    entity, entity_id, format, version = key
+    root = current_app.config.get("GRAPHS_PATH")
+    if root is None or version is None:
+        return None
+    return graph_path(root, version, entity, entity_id, format)
+
+
+def instance_graph_url(entity, entity_id, suffix="svg"):
+    """
+    URL of the graph of a page, the render starts while the page is sent
+    unless it was prerendered
+    """
+    format = GRAPH_FORMATS[suffix][0]
+    key = _instance_graph_key(entity, entity_id, format)
+    if _stored_instance_graph(key) is None:
+        try:
+            view_state().instance_graphs.submit(key, entity, entity_id, format)
+        except PoolBusy:
+            pass
+    return url_for("main.instance_graph", entity=entity, entity_id=entity_id, suffix=suffix)
+
+
+def send_graph(data, suffix):
+    format, mimetype = GRAPH_FORMATS[suffix]
+    if format == 'svgz':
+        return send_gzipped(data, mimetype)
+    return current_app.response_class(data, mimetype=mimetype)
+
+
+@bp.route("/graph/<string:entity>/<string:entity_id>.<string:suffix>")
+@conditional
+def instance_graph(entity, entity_id, suffix):
+    """
+    Relationship graph svg or png of a measurand, aspect or scale
+    503 with Retry-After while it is rendering
+    """
+    if entity not in GRAPH_ENTITIES or suffix not in GRAPH_FORMATS:
+        abort(404)
+    format = GRAPH_FORMATS[suffix][0]
+    key = _instance_graph_key(entity, entity_id, format)
+    path = _stored_instance_graph(key)
+    if path is not None:
+        return send_graph(path.read_bytes(), suffix)
+    try:
+        graph = view_state().instance_graphs.result(key, entity, entity_id, format,
+                                       timeout=current_app.config.get("GRAPH_WAIT", 0))
+    except (PoolBusy, RenderTimeout):
+        response = current_app.response_class("Rendering", status=503, mimetype="text/plain")
+        response.retry_after = 1
+        response.cache_control.no_store = True
+        return response
+    if graph is None:
+        abort(404)
+    return send_graph(graph, suffix)
+
+
+# Data model diagrams, name: (models, excludes, options)
+DIAGRAMS = {
+    'mii': ([Scale, Aspect, Conversion, Transform, MeasurandTaxon, Parameter, Discipline, KcdbCmc],
+            ['Prefix',
+             'Unit',
+             'Dimension',
+             'Taxon',
+             'ClassifierTag',
+             'Cast',
+             'Measurand',
+             'KcdbArea',
+             'KcdbBranch',
+             'KcdbService',
+             'KcdbSubservice',
+             'KcdbIndividualService',
+             'KcdbQuantity',
+             'KcdbParameter',
+             'KcdbInstrument',
+             'KcdbInstrumentMethod'],
+            {'show_attributes': False}),
+    'mlayer_scale': ([Scale, Unit, Prefix, Dimension, System],
+                     ['Aspect', 'Conversion', 'Cast'], {}),
+    'mlayer_conversion': ([Conversion, Aspect, Scale, Transform],
+                          ['Prefix', 'Unit', 'Dimension', 'Cast'], {}),
+    'mlayer_cast': ([Cast, Aspect, Scale, Transform],
+                    ['Prefix', 'Unit', 'Dimension', 'Conversion'], {}),
+    'taxonomy_measurand': ([MeasurandTaxon, Parameter, Aspect, Discipline],
+                           ['KcdbCmc', 'Prefix', 'Unit', 'Dimension', 'Conversion', 'Cast',
+                            'Measurand'], {}),
+    'relations': ([KcdbCmc, Measurand],
+                  ['Taxon', 'Aspect', 'Parameter', 'ClassifierTag'], {}),
+    'kcdb': ([KcdbCmc, MeasurandTaxon], ['ClassifierTag'], {}),
+}
+
+def warm_diagrams():
+    """
+    Render the missing data model diagrams at startup
+    """
+    diagram_cache = view_state().diagram_cache
+    for name, (models, excludes, options) in DIAGRAMS.items():
+        try:
+            diagram_cache.get(models, excludes, format='svgz', **options)
+        except graphviz.ExecutableNotFound:
+            current_app.logger.warning("Graphviz not found, data model diagrams are rendered on request")
+            return
+
+
+@bp.route("/model/<string:name>.svg")
+def diagram(name):
+    """
+    Data model diagram svg, the ETag is the hash of the mapper metadata
+    """
+    if name not in DIAGRAMS:
+        abort(404)
+    models, excludes, options = DIAGRAMS[name]
+    etag = data_model_key(models, excludes, format='svgz', **options)
+    matched = matching_etag(etag)
+    if matched:
+        etag = matched
+        response = current_app.response_class(status=304)
+        response.vary.add('Accept-Encoding')
+    else:
+        diagram = view_state().diagram_cache.get(models, excludes, format='svgz', **options)
+        response = send_graph(diagram, 'svg')
+        if response.content_encoding:
+            etag = f'{etag}-{response.content_encoding}'
+    response.set_etag(etag)
+    # Only changes with a new release of model.py
+    response.cache_control.max_age = 3600
+    return response
+
+
+@bp.route("/model/mii")
 def modelMII():
-    models = [Scale, Aspect, Conversion, Transform, MeasurandTaxon, Parameter, Discipline, KcdbCmc]
-    excludes = ['Prefix',
-                'Unit',
-                'Dimension',
-                'Taxon',
-                'ClassifierTag',
-                'Cast',
-                'Measurand',
-                'KcdbArea',
-                'KcdbBranch',
-                'KcdbService',
-                'KcdbSubservice',
-                'KcdbIndividualService',
-                'KcdbQuantity',
-                'KcdbParameter',
-                'KcdbInstrument',
-                'KcdbInstrumentMethod']
-    graph = generate_data_model_diagram(models, excludes,show_attributes=False)
-    return render_template("diagram.html", graph=graph)
-
-
-@app.route("/model/mlayer/scale")
+    return render_template("diagram.html", graph=url_for("main.diagram", name="mii"))
+
+
+@bp.route("/model/mlayer/scale")
 def modelMlayerScale():
-    models = [Scale, Unit, Prefix, Dimension, System]
-    excludes = ['Aspect', 'Conversion', 'Cast']
-    graph = generate_data_model_diagram(models, excludes)
-    return render_template("diagram.html", graph=graph)
+    return render_template("diagram.html", graph=url_for("main.diagram", name="mlayer_scale"))
 
 
-@app.route("/model/mlayer/conversion")
+@bp.route("/model/mlayer/conversion")
 def modelMlayerConversion():
-    models = [Conversion, Aspect, Scale, Transform]
-    excludes = ['Prefix', 'Unit', 'Dimension', 'Cast']
-    graph = generate_data_model_diagram(models, excludes=excludes)
-    return render_template("diagram.html", graph=graph)
+    return render_template("diagram.html", graph=url_for("main.diagram", name="mlayer_conversion"))
 
 
-@app.route("/model/mlayer/cast")
+@bp.route("/model/mlayer/cast")
 def modelMlayerCast():
-    models = [Cast, Aspect, Scale, Transform]
-    excludes = ['Prefix', 'Unit', 'Dimension', 'Conversion']
-    graph = generate_data_model_diagram(models, excludes=excludes)
-    return render_template("diagram.html", graph=graph)
+    return render_template("diagram.html", graph=url_for("main.diagram", name="mlayer_cast"))
 
 
-@app.route("/model/taxonomy/measurand")
+@bp.route("/model/taxonomy/measurand")
 def modelTaxonomyMeasurand():
-    models = [MeasurandTaxon, Parameter, Aspect, Discipline]
-    excludes = ['KcdbCmc','Prefix', 'Unit', 'Dimension', 'Conversion', 'Cast', 'Measurand']
-    graph = generate_data_model_diagram(models, excludes=excludes)
-    return render_template("diagram.html", graph=graph)
+    return render_template("diagram.html", graph=url_for("main.diagram", name="taxonomy_measurand"))
 
 
-@app.route("/model/relations")
+@bp.route("/model/relations")
 def modelRelations():
-    models = [KcdbCmc, Measurand]
-    excludes = ['Taxon', 'Aspect', 'Parameter', 'ClassifierTag']
-    graph = generate_data_model_diagram(models, excludes=excludes)
-    return render_template("diagram.html", graph=graph)
+    return render_template("diagram.html", graph=url_for("main.diagram", name="relations"))
 
 
-@app.route("/model/kcdb")
+@bp.route("/model/kcdb")
 def modelKcdb():
-    models = [KcdbCmc, MeasurandTaxon]
-    excludes = ['ClassifierTag']
-    graph = generate_data_model_diagram(models, excludes=excludes)
-    return render_template("diagram.html", graph=graph)
+    return render_template("diagram.html", graph=url_for("main.diagram", name="kcdb"))
 
 # Views for API
 
-@app.route("/api/aspect/<string:aspect_id>/", methods=["GET", "POST"])
+@bp.route("/api/aspect/<string:aspect_id>/", methods=["GET", "POST"])
+@conditional
 def api_aspect(aspect_id):
     # print("Get Aspect ", aspect_id)
     a = Aspect.query.get_or_404(aspect_id)
     return qk_schema.dump(a)
 
 
-@app.route("/api/aspects/")
+@bp.route("/api/aspect/<string:aspect_id>/dependents")
+@conditional
+def api_aspect_dependents(aspect_id):
+    """
+    Measurands, parameters and CMCs using an aspect
+    """
+    a = Aspect.query.get_or_404(aspect_id)
+    return dict(aspect_dependents(db.session, a.id), aspect=a.id)
+
+
+@bp.route("/api/aspects/")
+@conditional
 def api_aspects():
     # print("Get Aspect ", aspect_id)
-    aspects = Aspect().query.all()
-    return aspects_schema.dump(aspects)
-
-@app.route("/api/scale/<string:scale_id>/", methods=["GET", "POST"])
+    artifact = send_artifact("api/aspects.json", "application/json")
+    if artifact:
+        return artifact
+    return current_app.response_class(exports.api_collection_json(db.session, "aspects"),
+                              mimetype="application/json")
+
+@bp.route("/api/scale/<string:scale_id>/", methods=["GET", "POST"])
+@conditional
 def api_scale(scale_id):
     # print("Get Aspect ", aspect_id)
     s = Scale.query.get_or_404(scale_id)
     return scale_schema.dump(s)
 
 
-@app.route("/api/scales/")
+@bp.route("/api/scales/")
+@conditional
 def api_scales():
     # print("Get Aspect ", aspect_id)
-    scales = Scale().query.all()
-    return scales_schema.dump(scales)
+    artifact = send_artifact("api/scales.json", "application/json")
+    if artifact:
+        return artifact
+    return current_app.response_class(exports.api_collection_json(db.session, "scales"),
+                              mimetype="application/json")
 
 
-@app.route("/api/unit/<string:unit_id>/", methods=["GET", "POST"])
+@bp.route("/api/unit/<string:unit_id>/", methods=["GET", "POST"])
+@conditional
 def api_unit(unit_id):
     # print("Get Aspect ", aspect_id)
     u = Unit.query.get_or_404(unit_id)
     return unit_schema.dump(u)
 
 
-@app.route("/api/units/")
+@bp.route("/api/units/")
+@conditional
 def api_units():
     # print("Get Aspect ", aspect_id)
-    units = Unit().query.all()
-    return units_schema.dump(units)
-
-
-@app.route("/api/measurand/<string:measurand_id>/", methods=["GET", "POST"])
+    artifact = send_artifact("api/units.json", "application/json")
+    if artifact:
+        return artifact
+    return current_app.response_class(exports.api_collection_json(db.session, "units"),
+                              mimetype="application/json")
+
+
+# Pages of the search result entities
+_search_urls = {
+    "measurand": lambda id_: url_for("main.measurand", measurand_id=id_),
+    "aspect": lambda id_: url_for("main.aspect", aspect_id=id_),
+    "scale": lambda id_: url_for("main.scale", scale_id=id_),
+    "unit": lambda id_: url_for("main.api_unit", unit_id=id_),
+    "kcdbcmc": lambda id_: url_for("main.kcdbcmc_export_json", kcdbcmc_id=id_),
+}
+
+
+@bp.route("/api/search")
+@conditional
+def api_search():
+    """
+    /api/search?q=electric+current&entity=measurand&entity=aspect&limit=20
+    """
+    q = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 200)
+    entities = [e for e in request.args.getlist("entity") if e in search.SOURCES]
+    try:
+        results = search.search(db.session, q, limit, entities)
+    except OperationalError:
+        db.session.rollback()
+        abort(503, description="Search index not built")
+    for result in results:
+        url = _search_urls.get(result["entity"])
+        result["url"] = url(result["id"]) if url else None
+    return {"q": q, "results": results}
+
+
+@bp.route("/network")
+def network():
+    return render_template("network.html")
+
+
+@bp.route("/api/network/")
+@conditional
+def api_network():
+    """
+    Clusters of the m-layer network, the zoomed out level of detail
+    """
+    return network_tiles().overview()
+
+
+@bp.route("/api/network/<int:z>/<int:x>/<int:y>.json")
+@conditional
+def api_network_tile(z, x, y):
+    """
+    Clusters of the tile below the detail zoom, scales and edges from it
+    """
+    tile = network_tiles().tile(z, x, y)
+    if tile is None:
+        abort(404)
+    return tile
+
+
+@bp.route("/api/graph/<string:entity>/<string:entity_id>")
+@conditional
+def api_graph(entity, entity_id):
+    """
+    Neighborhood of an entity within depth relationships
+    /api/graph/measurand/MeasureMass?depth=3
+    """
+    if entity not in ENTITIES:
+        abort(404)
+    graph = relationship_graph()
+    if node_key(entity, entity_id) not in graph:
+        abort(404)
+    depth = min(max(request.args.get("depth", 2, type=int), 0), 5)
+    limit = min(max(request.args.get("limit", 2000, type=int), 1), 10000)
+    neighborhood = graph.neighborhood(entity, entity_id, depth, limit)
+    nodes = []
+    for key, node_depth in neighborhood["nodes"]:
+        node_entity, node_id = key.split(":", 1)
+        url = _search_urls.get(node_entity)
+        nodes.append({"key": key,
+                      "entity": node_entity,
+                      "id": node_id,
+                      "label": graph.labels.get(key),
+                      "depth": node_depth,
+                      "url": url(node_id) if url else None})
+    return {"root": node_key(entity, entity_id),
+            "depth": depth,
+            "truncated": neighborhood["truncated"],
+            "nodes": nodes,
+            "edges": [{"source": source, "relation": relation, "target": target}
+                      for source, relation, target in neighborhood["edges"]]}
+
+
+@bp.route("/api/autocomplete")
+@conditional
+def api_autocomplete():
+    """
+    /api/autocomplete?q=electric+cur&entity=aspect&limit=10
+    """
+    q = request.args.get("q", "")
+    entity = request.args.get("entity", "")
+    if entity not in Autocomplete.entities:
+        abort(400, description=f"Unknown entity type {entity}")
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+    return {"q": q,
+            "entity": entity,
+            "results": [{"id": id_, "label": label, "url": _search_urls[entity](id_)}
+                        for id_, label in autocomplete().complete(q, entity, limit)]}
+
+
+@bp.route("/api/cmcs/capability")
+@conditional
+def api_cmcs_capability():
+    """
+    CMCs with parameter ranges containing every value
+    /api/cmcs/capability?value=230 V&value=50 Hz
+    A range value, "1 kV to 10 kV", must be contained in one parameter range
+    """
+    values = request.args.getlist("value")
+    if not values:
+        abort(400, description="Expected at least one value")
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 1000)
+    index, resolver = capability_index()
+    conditions = []
+    for value in values:
+        parsed = parse_value(value, resolver)
+        if parsed is None or parsed.scale_id is None:
+            abort(400, description=f"Cannot parse value {value}")
+        for lower, upper in parsed.intervals:
+            conditions.append({"value": value, "scale": parsed.scale_id,
+                               "lower": lower, "upper": upper})
+    ids = index.covering([(c["scale"], c["lower"], c["upper"]) for c in conditions])
+    for condition in conditions:
+        # Open ends as null, JSON has no infinity
+        for bound in ("lower", "upper"):
+            if math.isinf(condition[bound]):
+                condition[bound] = None
+    page = [int(id_) for id_ in ids[:limit]]
+    cmcs = KcdbCmc.query.options(load_only(KcdbCmc.id, KcdbCmc.kcdbCode)) \
+        .filter(KcdbCmc.id.in_(page)).order_by(KcdbCmc.id).all() if page else []
+    return {"conditions": conditions,
+            "count": len(ids),
+            "cmcs": [{"id": cmc.id,
+                      "kcdbCode": cmc.kcdbCode,
+                      "url": url_for("main.kcdbcmc_export_json", kcdbcmc_id=cmc.id)}
+                     for cmc in cmcs]}
+
+
+@bp.route("/api/batch", methods=["POST"])
+def api_batch():
+    """
+    Resolve many ids in one request
+    POST {"measurands": [...], "aspects": [...], "scales": [...], "units": [...]}
+    """
+    ids = request.get_json(silent=True)
+    if not isinstance(ids, dict) or not ids:
+        abort(400, description="Expected a JSON object of id lists")
+    for name, wanted in ids.items():
+        if name not in exports.api_collections:
+            abort(400, description=f"Unknown entity type {name}")
+        if not isinstance(wanted, list):
+            abort(400, description=f"{name} must be a list of ids")
+        if len(wanted) > exports.BATCH_MAX_IDS:
+            abort(400, description=f"At most {exports.BATCH_MAX_IDS} {name} per request")
+    return exports.api_batch(db.session, ids)
+
+
+@bp.route("/api/measurand/<string:measurand_id>/", methods=["GET", "POST"])
+@conditional
 def api_measurand(measurand_id):
     # print("Get Aspect ", aspect_id)
     m = MeasurandTaxon.query.get_or_404(measurand_id)
     return m_schema.dump(m)
 
 
-@app.route("/api/measurands/")
+@bp.route("/api/measurands/")
+@conditional
 def api_measurands():
     # print("Get Aspect ", aspect_id)
-    measurands = MeasurandTaxon().query.all()
-    return measurands_schema.dump(measurands)
+    artifact = send_artifact("api/measurands.json", "application/json")
+    if artifact:
+        return artifact
+    return current_app.response_class(exports.api_collection_json(db.session, "measurands"),
+                              mimetype="application/json")
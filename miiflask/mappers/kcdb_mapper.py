@@ -11,6 +11,7 @@
 import requests
 import json
 from miiflask.flask import model
+from miiflask.utils.parameter_parser import UnitResolver, parse_parameter
 
 
 class KcdbMapper:
@@ -38,6 +39,14 @@ class KcdbMapper:
             'cmc': model.KcdbCmcSchema()
         }
         self.Session = session
+        self._unit_resolver = None
+
+    @property
+    def unit_resolver(self):
+        # Built on first use, the m-layer is loaded before the KCDB
+        if self._unit_resolver is None:
+            self._unit_resolver = UnitResolver(self.Session)
+        return self._unit_resolver
 
     def _getRefDataQuantities(self):
         print("Get Reference data quantities from KCDB API")
@@ -246,6 +255,7 @@ class KcdbMapper:
             parameter = model.KcdbParameter()
             parameter.name = parm['name']
             parameter.value = parm['value']
+            parse_parameter(parameter, self.unit_resolver)
             self.Session.add(parameter)
             cmc.parameters.append(parameter)
 
@@ -324,6 +334,7 @@ class KcdbMapper:
             parameter = model.KcdbParameter()
             parameter.name = parm['parameterName']
             parameter.value = parm['parameterValue']
+            parse_parameter(parameter, self.unit_resolver)
             self.Session.add(parameter)
             cmc.parameters.append(parameter)
 
@@ -16,6 +16,7 @@ import string
 import xmltodict, xmlschema
 from marshmallow import pprint as mpprint
 from miiflask.flask import model
+from miiflask.utils.aspect_index import AspectMatching
 
 import pandas as pd
 
@@ -162,7 +163,7 @@ def getTaxonDict(obj, schema):
     return taxon
 
 
-class TaxonomyMapper:
+class TaxonomyMapper(AspectMatching):
     """
     Parses/Unparses MII Taxonomy data
     Serializes/Deserializes Taxons with ORM Measurand model
@@ -254,43 +255,6 @@ class TaxonomyMapper:
 
     #def _transformQuantityName(self, obj):
 
-    def _associateAspect(self, obj):
-        if obj.quantitykind:
-            # Conform to UOM:Quantity name conventions for matching
-            # Leave mtc:Parameter in place 
-            # name_ = obj.quantitykind 
-            # name_ = name_.rstrip()
-            # name_ - name_.lower().replace(" ", "-")
-            try:
-                aspect = (
-                        self.Session.query(model.Aspect)
-                        .filter(model.Aspect.name == obj.quantitykind.lower()) 
-                        .first()
-                        )
-            except Exception as ex:
-                print(ex)
-                print(f"Object name:{obj.name}, Object QuantityKind:{obj.quantitykind}, Transformed QuantityKind Name:{name_}")
-                aspect = None
-            if aspect:
-                obj.aspect = aspect
-            else:
-                name_ = obj.quantitykind.lower()
-                if name_ == "ratio":
-                    aspect = None
-                #print(f"Cannot match {obj.name} try like {name_}")
-                else:
-                    aspect = (
-                            self.Session.query(model.Aspect)
-                            .filter((model.Aspect.name.like(f'%{name_}%')))
-                            .first()
-                            )
-                # Ratio quantity ignored
-                # Needs to further specified for relating to an aspect
-                if aspect:
-                    obj.aspect = aspect
-                    #print(f"Found corresponding aspect {aspect.name} for {obj.name} with quantitykind {name_}")
-
-
     def getMeasurandRelatedObjects(self, taxon, measurand, uom_qk=None):
         if uom_qk:
             measurand.quantitykind = uom_qk 
@@ -418,6 +382,7 @@ class TaxonomyMapper:
     def loadTaxonomy(self):
         for taxon in self._mii_taxons_dict:
             self.getMeasurandTaxonObject(self._mii_taxons_dict[taxon])
+        self._printAspectSummary()
 
     def extractTaxonomy(self):
         if isinstance(self._path, Path):
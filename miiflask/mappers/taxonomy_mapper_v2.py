@@ -17,6 +17,7 @@ import string
 import xmltodict, xmlschema
 import pprint as mpprint
 from miiflask.flask import model
+from miiflask.utils.aspect_index import AspectMatching
 
 
 def dicttoxml_taxonomy(taxons):
@@ -169,7 +170,7 @@ class ValidationError(Exception):
         super().__init__(self.message)
 
 
-class TaxonomyMapper:
+class TaxonomyMapper(AspectMatching):
     """
     Parses/Unparses MII Taxonomy data
     Serializes/Deserializes Taxons with ORM Measurand model
@@ -262,43 +263,6 @@ class TaxonomyMapper:
         # pprint(xmltodict.unparse(taxon))
         return taxon["mtc:Taxon"]
 
-    def _associateAspect(self, obj):
-        if obj.quantitykind:
-            # Conform to UOM:Quantity name conventions for matching
-            # Leave mtc:Parameter in place 
-            # name_ = obj.quantitykind 
-            # name_ = name_.rstrip()
-            # name_ - name_.lower().replace(" ", "-")
-            try:
-                aspect = (
-                        self.Session.query(model.Aspect)
-                        .filter(model.Aspect.name == obj.quantitykind.lower()) 
-                        .first()
-                        )
-            except Exception as ex:
-                print(ex)
-                print(f"Object name:{obj.name}, Object QuantityKind:{obj.quantitykind}, Transformed QuantityKind Name:{name_}")
-                aspect = None
-            if aspect:
-                obj.aspect = aspect
-            else:
-                name_ = obj.quantitykind.lower()
-                if name_ == "ratio":
-                    aspect = None
-                #print(f"Cannot match {obj.name} try like {name_}")
-                else:
-                    aspect = (
-                            self.Session.query(model.Aspect)
-                            .filter((model.Aspect.name.like(f'%{name_}%')))
-                            .first()
-                            )
-                # Ratio quantity ignored
-                # Needs to further specified for relating to an aspect
-                if aspect:
-                    obj.aspect = aspect
-                    #print(f"Found corresponding aspect {aspect.name} for {obj.name} with quantitykind {name_}")
-
-
     def getMeasurandRelatedObjects(self, taxon, measurand, uom_qk=None):
         if uom_qk:
             measurand.quantitykind = uom_qk 
@@ -524,6 +488,7 @@ class TaxonomyMapper:
                 print(f'{taxon} missing key {k.args[0]}')
             except Exception as e:
                 raise e
+        self._printAspectSummary()
 
     def extractTaxonomy_v2(self):
         if isinstance(self._path, Path):
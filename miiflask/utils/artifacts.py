@@ -0,0 +1,189 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Prebuilt, precompressed export artifacts
+
+Artifacts are written once per data generation after loading,
+<artifacts>/<generation>/<name>{,.gz,.br}
+and served directly by the Flask routes while the generation and the
+updated stamp of its manifest match the database
+"""
+import gzip
+import json
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import brotli
+
+from miiflask.flask import model
+from miiflask.flask import exports
+from miiflask.utils.network_layout import network_layout
+
+# Content-Encoding: file suffix, in order of preference
+ENCODINGS = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+MANIFEST = 'manifest.json'
+# Positions of the whole m-layer network, see miiflask.utils.network_layout
+NETWORK_LAYOUT = 'network/layout.json'
+
+
+def artifact_dir(root, generation):
+    return Path(root) / str(generation)
+
+
+def version_stamp(updated):
+    """
+    DataVersion.updated as written in a manifest, naive UTC isoformat
+    """
+    if updated is None:
+        return None
+    return updated.replace(tzinfo=None).isoformat()
+
+
+@lru_cache(maxsize=32)
+def _manifest_updated(path, mtime_ns):
+    return json.loads(Path(path).read_text()).get('updated')
+
+
+def manifest_matches(directory, updated):
+    """
+    True when directory was built from the database updated at updated
+    A recreated database restarts at generation 1, the generation alone does not tell
+    """
+    manifest = Path(directory) / MANIFEST
+    try:
+        mtime_ns = manifest.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return _manifest_updated(str(manifest), mtime_ns) == version_stamp(updated)
+
+
+def generation_path(root, version, name):
+    """
+    Path of a file built for version (generation, updated) or None
+    The generation directory only exists once completely written
+    """
+    generation, updated = version
+    directory = artifact_dir(root, generation)
+    if not manifest_matches(directory, updated):
+        return None
+    path = directory / name
+    if path.is_file():
+        return path
+    return None
+
+
+def artifact_path(root, version, name, encoding=None):
+    """
+    Path of a built artifact of version (generation, updated) or None
+    """
+    if encoding:
+        name = name + ENCODINGS[encoding]
+    return generation_path(root, version, name)
+
+
+class GenerationBuilder:
+    """
+    Writes the files of the current DataVersion generation to <root>/<generation>/
+    Subclasses write them in _build(staging) and return the manifest entries,
+    {name: size}, or None when nothing could be built
+    """
+
+    # Name of the files in messages and of the manifest entries
+    kind = 'files'
+
+    def __init__(self, session, root, keep=2):
+        self._root = Path(root).resolve()
+        self._keep = keep
+        self.Session = session
+
+    def _build(self, staging):
+        raise NotImplementedError
+
+    def _prune(self, current):
+        generations = sorted((int(p.name) for p in self._root.iterdir()
+                              if p.is_dir() and p.name.isdigit()),
+                             reverse=True)
+        # Later generations belong to a replaced database
+        stale = [g for g in generations if g > current]
+        kept = [g for g in generations if g <= current]
+        for generation in stale + kept[self._keep:]:
+            shutil.rmtree(artifact_dir(self._root, generation))
+
+    def build(self):
+        version = self.Session.get(model.DataVersion, 1)
+        if version is None:
+            print(f"No data version, {self.kind} not built")
+            return None
+        generation = version.generation
+        target = artifact_dir(self._root, generation)
+        if target.exists():
+            if manifest_matches(target, version.updated):
+                return target
+            # Built from a replaced database
+            shutil.rmtree(target)
+        # Write to a staging directory and rename,
+        # routes never see a partially written generation
+        staging = self._root / f'.staging-{generation}'
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+        entries = self._build(staging)
+        if entries is None:
+            shutil.rmtree(staging, ignore_errors=True)
+            return None
+        manifest = {'generation': generation,
+                    'updated': version_stamp(version.updated),
+                    self.kind: entries}
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        staging.rename(target)
+        self._prune(generation)
+        print(f"Built {len(entries)} {self.kind} in {target}")
+        return target
+
+
+class ArtifactBuilder(GenerationBuilder):
+    """
+    Serializes the catalog exports for the current DataVersion generation
+    """
+
+    kind = 'artifacts'
+
+    def __init__(self, session, parms):
+        super().__init__(session, parms["artifacts"], parms.get("artifacts_keep", 2))
+
+    def _write(self, path, content):
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        # mtime=0 keeps the gzip output reproducible
+        path.with_name(path.name + ENCODINGS['gzip']).write_bytes(
+                gzip.compress(data, compresslevel=9, mtime=0))
+        path.with_name(path.name + ENCODINGS['br']).write_bytes(
+                brotli.compress(data, quality=11))
+        return len(data)
+
+    def _artifacts(self):
+        yield 'taxonomy/export_taxonomy.xml', lambda: exports.taxonomy_xml(self.Session)
+        yield 'kcdbcmcs/export_cmcs.json', lambda: exports.cmcs_json(self.Session)
+        yield NETWORK_LAYOUT, lambda: json.dumps(network_layout(self.Session))
+        for name in exports.api_collections:
+            yield f'api/{name}.json', \
+                lambda name=name: exports.api_collection_json(self.Session, name)
+        for obj in self.Session.query(model.MeasurandTaxon).all():
+            yield f'measurand/{obj.id}.xml', lambda obj=obj: exports.measurand_xml(obj)
+            yield f'measurand/{obj.id}.json', lambda obj=obj: exports.measurand_json(obj)
+
+    def _build(self, staging):
+        return {name: self._write(staging / name, serialize())
+                for name, serialize in self._artifacts()}
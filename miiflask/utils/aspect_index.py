@@ -0,0 +1,174 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+In-memory index of m-layer aspect names for quantity kind matching
+
+Built once per load from the aspects in the session,
+quantity kinds are resolved without querying the aspect table.
+Names and ml_names are normalized to tokens (as_electric_current,
+electric-current and "Electric Current" are the same tokens)
+and a trigram index selects the candidates to rank
+
+Scores
+1.0   name equals the quantity kind
+0.9   same tokens as the name or ml_name
+0.5+  name or ml_name contains the quantity kind tokens,
+      fewer extra tokens and a matching last token rank higher
+<0.5  trigram similarity only, reported but not associated
+
+The taxonomy mappers associate measurands and parameters with
+the AspectMatching mixin
+"""
+import re
+from collections import defaultdict, namedtuple
+
+from miiflask.flask import model
+
+AspectMatch = namedtuple("AspectMatch", ["aspect", "score", "candidates"])
+
+_SPLIT = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(name):
+    """
+    Lower case tokens of a name, the m-layer as_ prefix removed
+    """
+    tokens = [t for t in _SPLIT.split(name.lower()) if t]
+    if len(tokens) > 1 and tokens[0] == 'as':
+        tokens = tokens[1:]
+    return tuple(tokens)
+
+
+def trigrams(tokens):
+    text = f"  {' '.join(tokens)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AspectIndex:
+    """
+    Ranked matching of quantity kind names to aspects
+    """
+
+    # Lowest score associated with a quantity kind
+    min_score = 0.5
+    # Best and runner-up closer than this are reported as ambiguous
+    ambiguity = 0.05
+
+    def __init__(self, aspects):
+        self._aspects = list(aspects)
+        self._names = {}
+        self._tokens = defaultdict(list)
+        self._trigrams = defaultdict(set)
+        self._keys = []
+        for i, aspect in enumerate(self._aspects):
+            keys = {normalize(n) for n in (aspect.name, aspect.ml_name) if n}
+            self._keys.append(keys)
+            if aspect.name:
+                # First loaded aspect wins on equal names
+                self._names.setdefault(aspect.name, i)
+            for key in keys:
+                self._tokens[key].append(i)
+                for trigram in trigrams(key):
+                    self._trigrams[trigram].add(i)
+        self.ambiguous = {}
+        self.unmatched = {}
+        self.matched = 0
+
+    def _score(self, i, name, query):
+        if self._aspects[i].name == name:
+            return 1.0
+        best = 0.0
+        grams = trigrams(query)
+        n = len(query)
+        for key in self._keys[i]:
+            if key == query:
+                return 0.9
+            contained = [j for j in range(len(key) - n + 1) if key[j:j + n] == query]
+            if contained:
+                # The last token is the head of the compound name,
+                # current matches electric-current before current-density
+                head = 0.1 if contained[-1] == len(key) - n else 0.0
+                best = max(best, 0.5 + 0.3 * n / len(key) + head)
+            else:
+                key_grams = trigrams(key)
+                dice = 2 * len(grams & key_grams) / (len(grams) + len(key_grams))
+                best = max(best, 0.45 * dice)
+        return best
+
+    def rank(self, name, limit=5):
+        """
+        [(aspect, score)] best first, ties in load order
+        """
+        name = name.strip().lower()
+        query = normalize(name)
+        if not query:
+            return []
+        candidates = set(self._tokens.get(query, ()))
+        if name in self._names:
+            candidates.add(self._names[name])
+        for trigram in trigrams(query):
+            candidates.update(self._trigrams.get(trigram, ()))
+        scored = sorted(((self._score(i, name, query), i) for i in candidates),
+                        key=lambda item: (-item[0], item[1]))
+        return [(self._aspects[i], score) for score, i in scored[:limit] if score > 0]
+
+    def match(self, name):
+        """
+        AspectMatch of the best aspect for a quantity kind
+        aspect is None when no candidate reaches min_score
+        """
+        ranked = self.rank(name)
+        if not ranked or ranked[0][1] < self.min_score:
+            self.unmatched[name] = ranked[:1]
+            return AspectMatch(None, ranked[0][1] if ranked else 0.0, ranked)
+        aspect, score = ranked[0]
+        self.matched += 1
+        if len(ranked) > 1 and score - ranked[1][1] < self.ambiguity:
+            self.ambiguous[name] = ranked
+        return AspectMatch(aspect, score, ranked)
+
+    def summary(self):
+        lines = [f"Aspect matching: {self.matched} matched, "
+                 f"{len(self.ambiguous)} ambiguous, {len(self.unmatched)} unmatched"]
+        for name, ranked in sorted(self.ambiguous.items()):
+            choices = ', '.join(f'{a.id} {a.name} ({s:.2f})' for a, s in ranked)
+            lines.append(f"  ambiguous {name}: {choices}")
+        for name, ranked in sorted(self.unmatched.items()):
+            nearest = ', '.join(f'{a.id} {a.name} ({s:.2f})' for a, s in ranked)
+            lines.append(f"  unmatched {name}" + (f", nearest {nearest}" if nearest else ""))
+        return '\n'.join(lines)
+
+
+class AspectMatching:
+    """
+    Mapper mixin associating quantity kinds to aspects, self.Session is the load session
+    """
+    _aspect_index = None
+
+    @property
+    def aspect_index(self):
+        # Built on first use, once the m-layer aspects are loaded
+        if self._aspect_index is None:
+            self._aspect_index = AspectIndex(self.Session.query(model.Aspect).all())
+        return self._aspect_index
+
+    def _associateAspect(self, obj):
+        if obj.quantitykind:
+            # Conform to UOM:Quantity name conventions for matching
+            # Leave mtc:Parameter in place
+            name_ = obj.quantitykind.lower()
+            match = self.aspect_index.match(name_)
+            # Ratio quantity ignored unless named exactly
+            # Needs to further specified for relating to an aspect
+            if match.aspect and (match.score == 1.0 or name_ != "ratio"):
+                obj.aspect = match.aspect
+
+    def _printAspectSummary(self):
+        if self._aspect_index is not None:
+            print(self._aspect_index.summary())
@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Prefix completion of measurand, aspect and scale names
+
+Keys are kept in sorted arrays per entity, a prefix is located with bisect
+and the completions are the contiguous run of keys starting with it.
+Whole names complete before words inside a name,
+"cur" gives "current ..." before "electric current"
+
+    completions = Autocomplete(session)
+    completions.complete("cur", "aspect", limit=10) -> [(id, label), ...]
+"""
+import re
+from bisect import bisect_left
+
+from sqlalchemy.orm import selectinload
+
+from miiflask.flask import model
+
+_SEPARATORS = re.compile(r'[\s._-]+')
+_WORD = re.compile(r'(?<= )\S')
+
+
+def fold(text):
+    """
+    Lower case, separators as one space, electric-current -> electric current
+    """
+    return _SEPARATORS.sub(' ', text.lower()).strip()
+
+
+class _Keys:
+    """
+    Sorted (key, label, id) of one entity type
+    """
+
+    def __init__(self, entries):
+        self._entries = sorted(set(entries))
+        self._keys = [key for key, _, _ in self._entries]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def startingwith(self, prefix):
+        i = bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            yield self._entries[i]
+            i += 1
+
+
+class Autocomplete:
+    """
+    Completions per entity from sorted name and word keys
+    """
+
+    entities = ('measurand', 'aspect', 'scale')
+
+    def __init__(self, session):
+        names = {entity: [] for entity in self.entities}
+        for measurand in session.query(model.MeasurandTaxon):
+            names['measurand'].append((measurand.id, measurand.name, measurand.name))
+        for aspect in session.query(model.Aspect):
+            for key in (aspect.name, aspect.ml_name):
+                names['aspect'].append((aspect.id, aspect.name, key))
+        for scale in session.query(model.Scale).options(selectinload(model.Scale.unit)):
+            keys = [scale.ml_name]
+            if scale.unit is not None:
+                keys.append(scale.unit.symbol)
+            for key in keys:
+                names['scale'].append((scale.id, scale.ml_name, key))
+
+        self._names = {}
+        self._words = {}
+        for entity, rows in names.items():
+            full, words = [], []
+            for id_, label, key in rows:
+                if not key or not label:
+                    continue
+                key = fold(key)
+                full.append((key, label, id_))
+                # Every later word start of the key, "electric current" -> "current"
+                for start in _WORD.finditer(key):
+                    words.append((key[start.start():], label, id_))
+            self._names[entity] = _Keys(full)
+            self._words[entity] = _Keys(words)
+
+    def __len__(self):
+        return sum(len(k) for k in (*self._names.values(), *self._words.values()))
+
+    def complete(self, prefix, entity, limit=10):
+        """
+        [(id, label)] of the entity keys starting with prefix, at most limit
+        """
+        prefix = fold(prefix)
+        if not prefix or entity not in self._names:
+            return []
+        seen = set()
+        completions = []
+        for keys in (self._names[entity], self._words[entity]):
+            for _, label, id_ in keys.startingwith(prefix):
+                if id_ in seen:
+                    continue
+                seen.add(id_)
+                completions.append((id_, label))
+                if len(completions) >= limit:
+                    return completions
+        return completions
@@ -0,0 +1,161 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Measurand suggestions for KCDB CMCs
+
+CMCs (quantity, instrument, service path, parameter names) and measurand
+taxons (name, definition, parameter names) are vectorized as sparse TF-IDF
+rows over one vocabulary, the cosine similarity of all pairs is a single
+sparse matrix product and the top k measurands are kept per CMC
+
+    suggestions = CmcSuggestions(session, k=5)
+    suggestions.for_cmc(cmc_id) -> [(measurand_id, score), ...]
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import selectinload
+
+from miiflask.flask import model
+
+_WORDS = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'it',
+    'of', 'on', 'or', 'the', 'to', 'with', 'without',
+    'device', 'measure', 'measured', 'measurement', 'measures', 'measuring',
+    'process', 'value', 'values',
+))
+
+
+def tokenize(*texts):
+    """
+    Lower case words, camel case and dotted names split
+    MeasureCurrentAC -> measure, current, ac
+    """
+    tokens = []
+    for text in texts:
+        if not text:
+            continue
+        tokens.extend(w.lower() for w in _WORDS.findall(text))
+    return [t for t in tokens if len(t) > 1 and t not in STOP_WORDS]
+
+
+def cmc_tokens(cmc):
+    parts = [cmc.quantity, cmc.instrument, cmc.instrumentmethod,
+             cmc.area, cmc.branch, cmc.service, cmc.subservice,
+             cmc.individualservice]
+    texts = [p.value for p in parts if p is not None]
+    texts.extend(p.name for p in cmc.parameters)
+    return tokenize(*texts)
+
+
+def measurand_tokens(measurand):
+    texts = [measurand.name, measurand.definition]
+    texts.extend(p.name for p in measurand.parameters)
+    return tokenize(*texts)
+
+
+def tfidf(documents, vocabulary, idf):
+    """
+    L2 normalized rows of sublinear tf * idf, csr
+    """
+    rows, cols, data = [], [], []
+    for i, tokens in enumerate(documents):
+        counts = defaultdict(int)
+        for token in tokens:
+            counts[token] += 1
+        for token, count in counts.items():
+            rows.append(i)
+            cols.append(vocabulary[token])
+            data.append(1.0 + np.log(count))
+    matrix = sparse.csr_matrix((data, (rows, cols)),
+                               shape=(len(documents), len(vocabulary)))
+    matrix = matrix.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+class CmcSuggestions:
+    """
+    Top k measurand suggestions for every CMC
+    """
+
+    def __init__(self, session, k=5):
+        self.k = k
+        cmcs = session.query(model.KcdbCmc).options(
+                selectinload(model.KcdbCmc.quantity),
+                selectinload(model.KcdbCmc.instrument),
+                selectinload(model.KcdbCmc.instrumentmethod),
+                selectinload(model.KcdbCmc.area),
+                selectinload(model.KcdbCmc.branch),
+                selectinload(model.KcdbCmc.service),
+                selectinload(model.KcdbCmc.subservice),
+                selectinload(model.KcdbCmc.individualservice),
+                selectinload(model.KcdbCmc.parameters)).all()
+        measurands = session.query(model.MeasurandTaxon).options(
+                selectinload(model.MeasurandTaxon.parameters)).all()
+        self.measurands = {m.id: m.name for m in measurands}
+        self._suggestions = self._score([c.id for c in cmcs],
+                                        [cmc_tokens(c) for c in cmcs],
+                                        [m.id for m in measurands],
+                                        [measurand_tokens(m) for m in measurands])
+
+    def _score(self, cmc_ids, cmc_docs, measurand_ids, measurand_docs):
+        if not cmc_docs or not measurand_docs:
+            return {}
+        vocabulary = {}
+        df = defaultdict(int)
+        for tokens in (*cmc_docs, *measurand_docs):
+            for token in set(tokens):
+                vocabulary.setdefault(token, len(vocabulary))
+                df[token] += 1
+        n = len(cmc_docs) + len(measurand_docs)
+        idf = np.ones(len(vocabulary))
+        for token, i in vocabulary.items():
+            idf[i] = np.log((1 + n) / (1 + df[token])) + 1.0
+
+        cmc_matrix = tfidf(cmc_docs, vocabulary, idf)
+        measurand_matrix = tfidf(measurand_docs, vocabulary, idf)
+        # Cosine similarity of all CMCs with all measurands
+        scores = (cmc_matrix @ measurand_matrix.T).tocsr()
+
+        suggestions = {}
+        for row, cmc_id in enumerate(cmc_ids):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            data = scores.data[start:end]
+            indices = scores.indices[start:end]
+            if len(data) > self.k:
+                top = np.argpartition(-data, self.k - 1)[:self.k]
+                data, indices = data[top], indices[top]
+            order = np.lexsort((indices, -data))
+            suggestions[cmc_id] = [(measurand_ids[indices[i]], float(data[i]))
+                                   for i in order if data[i] > 0]
+        return suggestions
+
+    def for_cmc(self, cmc_id):
+        return self._suggestions.get(cmc_id, [])
+
+    def for_cmcs(self, cmc_ids, k=None):
+        """
+        Suggestions for a selection of CMCs, scores summed
+        [(measurand_id, name, score, count)] count of CMCs suggesting it
+        """
+        totals = defaultdict(float)
+        counts = defaultdict(int)
+        for cmc_id in cmc_ids:
+            for measurand_id, score in self.for_cmc(cmc_id):
+                totals[measurand_id] += score
+                counts[measurand_id] += 1
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        return [(measurand_id, self.measurands[measurand_id], score, counts[measurand_id])
+                for measurand_id, score in ranked[:k or self.k]]
@@ -0,0 +1,73 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Facet counts of the CMCs over the KCDB service hierarchy
+
+One GROUP BY over the CMC foreign keys gives the number of CMCs per
+(area, branch, service, subservice, individualservice) cell, a few hundred
+cells for the whole KCDB. Counts of any selection are sums over the cells,
+no join or count(*) on the CMC table
+
+    facets = CmcFacets(session)
+    facets.count({'area': 1, 'branch': 3}) -> 42
+    facets.options('service', {'area': 1}) -> [(id, value, count), ...]
+"""
+from collections import defaultdict
+
+from sqlalchemy import func
+
+from miiflask.flask import model
+
+# facet: lookup model, the CMC column is <facet>_id
+FACETS = {
+    'area': model.KcdbArea,
+    'branch': model.KcdbBranch,
+    'service': model.KcdbService,
+    'subservice': model.KcdbSubservice,
+    'individualservice': model.KcdbIndividualService,
+}
+
+
+class CmcFacets:
+    """
+    CMC counts per service hierarchy cell
+    """
+
+    def __init__(self, session):
+        columns = [getattr(model.KcdbCmc, f'{facet}_id') for facet in FACETS]
+        self._cells = [(tuple(row[:-1]), row[-1])
+                       for row in session.query(*columns, func.count()).group_by(*columns)]
+        self.labels = {facet: {obj.id: str(obj) for obj in session.query(model_)}
+                       for facet, model_ in FACETS.items()}
+
+    def _matching(self, selection, skip=None):
+        positions = [(i, selection[facet]) for i, facet in enumerate(FACETS)
+                     if facet in selection and facet != skip]
+        for key, count in self._cells:
+            if all(key[i] == value for i, value in positions):
+                yield key, count
+
+    def count(self, selection):
+        """
+        Number of CMCs in the selection {facet: id}
+        """
+        return sum(count for _, count in self._matching(selection))
+
+    def options(self, facet, selection=None):
+        """
+        [(id, label, count)] of a facet within the selection on the other facets
+        """
+        i = list(FACETS).index(facet)
+        counts = defaultdict(int)
+        for key, count in self._matching(selection or {}, skip=facet):
+            if key[i] is not None:
+                counts[key[i]] += count
+        labels = self.labels[facet]
+        return sorted(((id_, labels.get(id_, str(id_)), count) for id_, count in counts.items()),
+                      key=lambda option: (option[1], option[0]))
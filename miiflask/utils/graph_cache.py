@@ -0,0 +1,145 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Caches of the rendered graphs
+
+A data model diagram only changes with model.py, it is rendered once
+per hash of the mapped models, excludes and options (data_model_key),
+kept in memory and written to <path>/<key>.<format> for the other
+workers and the next start
+
+    diagrams = DiagramCache("data/graphs/diagrams")
+    diagrams.get([Scale, Aspect], excludes=['Cast']) -> png bytes
+
+Instance graphs depend on the data, they are rendered by a bounded thread
+pool off the request, once per (entity, id, data version). Requests of a
+graph being rendered wait on the same future
+
+    pool = RenderPool(render, workers=2)
+    pool.submit(('scale', 'SC17', version), 'scale', 'SC17')
+    pool.result(('scale', 'SC17', version), 'scale', 'SC17', timeout=2)
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from miiflask.utils.model_visualizer import data_model_key, render_data_model_diagram
+
+
+class DiagramCache:
+    """
+    Rendered diagrams in memory and on disk, path None keeps memory only
+    """
+
+    def __init__(self, path=None, render=render_data_model_diagram):
+        self._path = Path(path) if path else None
+        self._render = render
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _file(self, key, format):
+        return self._path / f'{key}.{format}'
+
+    def _read(self, key, format):
+        if self._path is None:
+            return None
+        try:
+            return self._file(key, format).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key, format, data):
+        if self._path is None:
+            return
+        self._path.mkdir(parents=True, exist_ok=True)
+        path = self._file(key, format)
+        # Readers in other workers never see a partial file
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, models, excludes=(), show_attributes=True, add_labels=True, format='png'):
+        excludes = list(excludes)
+        key = data_model_key(models, excludes, show_attributes, add_labels, format)
+        data = self._memory.get(key)
+        if data is not None:
+            return data
+        with self._lock:
+            data = self._memory.get(key) or self._read(key, format)
+            if data is None:
+                data = self._render(models, excludes, show_attributes, add_labels, format)
+                self._write(key, format, data)
+            self._memory[key] = data
+        return data
+
+
+class PoolBusy(Exception):
+    """
+    Too many renders queued, retry later
+    """
+
+
+class RenderPool:
+    """
+    Bounded render pool with a result cache and coalesced requests
+
+    render(*args) runs in a worker thread, its result is kept for the key,
+    at most size results and pending renders queued
+    """
+
+    def __init__(self, render, workers=2, pending=64, size=1024):
+        self._render = render
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='graph-render')
+        self._max_pending = pending
+        self._size = size
+        self._results = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _done(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            # Failed renders are retried by the next request
+            if not future.cancelled() and future.exception() is None:
+                self._results[key] = future.result()
+                while len(self._results) > self._size:
+                    self._results.popitem(last=False)
+
+    def submit(self, key, *args):
+        """
+        Future of the result of key, raise PoolBusy when the queue is full
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                future = Future()
+                future.set_result(self._results[key])
+                return future
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            if len(self._pending) >= self._max_pending:
+                # Done callbacks run after the waiters are woken up
+                for done in [k for k, f in self._pending.items() if f.done()]:
+                    del self._pending[done]
+                if len(self._pending) >= self._max_pending:
+                    raise PoolBusy(key)
+            future = self._executor.submit(self._render, *args)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._done(key, f))
+        return future
+
+    def result(self, key, *args, timeout=None):
+        """
+        Result of key, raise concurrent.futures.TimeoutError after timeout seconds
+        """
+        return self.submit(key, *args).result(timeout)
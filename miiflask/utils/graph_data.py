@@ -0,0 +1,73 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Eager loading of the relationship graph of an instance
+
+instance_graph_data reads every relationship of the instance and the
+relations used by the descriptions (scale unit, conversion destination
+scale and unit). Lazy loaded, a scale with 50 conversions costs over a
+hundred SELECTs. LOAD_PLANS loads the whole neighborhood with one
+SELECT per relationship level, the renderer gets plain data
+
+    data = load_graph_data(session, Scale, 'SC14')
+    render_graph_data(data, format='svgz')
+"""
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from miiflask.flask import model
+from miiflask.utils.model_visualizer import instance_graph_data
+
+MeasurandTaxon, Aspect, Scale = model.MeasurandTaxon, model.Aspect, model.Scale
+
+# model: loader options of the relationships drawn and described
+LOAD_PLANS = {
+    MeasurandTaxon: (
+        joinedload(MeasurandTaxon.aspect),
+        joinedload(MeasurandTaxon.result_aspect),
+        joinedload(MeasurandTaxon.discipline),
+        selectinload(MeasurandTaxon.parameters),
+        selectinload(MeasurandTaxon.external_references),
+        selectinload(MeasurandTaxon.kcdbcmcs).load_only(model.KcdbCmc.id, model.KcdbCmc.kcdbCode),
+    ),
+    Aspect: (
+        selectinload(Aspect.scales).joinedload(Scale.unit),
+    ),
+    Scale: (
+        joinedload(Scale.root_scale).joinedload(Scale.unit),
+        joinedload(Scale.prefix),
+        joinedload(Scale.unit),
+        joinedload(Scale.system_dimensions),
+        selectinload(Scale.aspects),
+        selectinload(Scale.conversions).joinedload(model.Conversion.dst_scale)
+        .joinedload(Scale.unit),
+        selectinload(Scale.casts),
+    ),
+}
+
+
+def load_plan(model_):
+    """
+    Loader options of a model, every relationship selectin loaded by default
+    """
+    plan = LOAD_PLANS.get(model_)
+    if plan is None:
+        plan = tuple(selectinload(rel.class_attribute) for rel in inspect(model_).relationships)
+    return plan
+
+
+def load_graph_data(session, model_, id_):
+    """
+    instance_graph_data of model id or None
+    """
+    obj = session.scalars(select(model_).where(inspect(model_).primary_key[0] == id_)
+                          .options(*load_plan(model_))).unique().first()
+    if obj is None:
+        return None
+    return instance_graph_data(model_, obj)
@@ -0,0 +1,100 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Prerendered relationship graphs of the measurands, aspects and scales
+
+The graphs are rendered once per data generation after loading, by a
+process pool over all cores, each worker with its own database connection
+<graphs>/<generation>/<entity>/<id>.svgz
+and read directly by the /graph routes while the generation and the
+updated stamp of its manifest match the database
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import graphviz
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from miiflask.flask import model
+from miiflask.utils.artifacts import GenerationBuilder, generation_path
+from miiflask.utils.graph_data import load_graph_data
+from miiflask.utils.model_visualizer import render_graph_data
+
+# entity: model of the /graph/<entity>/<id> routes
+GRAPH_ENTITIES = {
+    'measurand': model.MeasurandTaxon,
+    'aspect': model.Aspect,
+    'scale': model.Scale,
+}
+
+
+def graph_path(root, version, entity, id_, format='svgz'):
+    """
+    Path of a prerendered graph of version (generation, updated) or None
+    """
+    return generation_path(root, version, f'{entity}/{id_}.{format}')
+
+
+# Engine of a worker process, see _init_worker
+_engine = None
+
+
+def _init_worker(url):
+    global _engine
+    _engine = create_engine(url)
+
+
+def _render(entity, id_, format):
+    with Session(_engine) as session:
+        data = load_graph_data(session, GRAPH_ENTITIES[entity], id_)
+    return render_graph_data(data, format=format)
+
+
+class GraphStoreBuilder(GenerationBuilder):
+    """
+    Renders the graphs of the current DataVersion generation in a process pool
+    """
+
+    kind = 'graphs'
+
+    def __init__(self, session, parms):
+        super().__init__(session, parms["graphs"], parms.get("graphs_keep", 2))
+        self._workers = parms.get("graph_workers") or os.cpu_count()
+        self._format = parms.get("graph_format", "svgz")
+
+    def _jobs(self):
+        for entity, model_ in GRAPH_ENTITIES.items():
+            for id_ in self.Session.scalars(select(model_.id).order_by(model_.id)):
+                yield entity, id_
+
+    def _build(self, staging):
+        url = self.Session.get_bind().url.render_as_string(hide_password=False)
+        jobs = list(self._jobs())
+        graphs = {}
+        with ProcessPoolExecutor(self._workers, initializer=_init_worker,
+                                 initargs=(url,)) as executor:
+            futures = [executor.submit(_render, entity, id_, self._format)
+                       for entity, id_ in jobs]
+            for (entity, id_), future in zip(jobs, futures):
+                try:
+                    data = future.result()
+                except graphviz.ExecutableNotFound:
+                    executor.shutdown(cancel_futures=True)
+                    print("Graphviz not found, graphs are rendered on request")
+                    return None
+                except Exception as error:
+                    # Rendered on request instead
+                    print(f"Graph of {entity} {id_} not rendered: {error!r}")
+                    continue
+                path = staging / entity / f'{id_}.{self._format}'
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(data)
+                graphs[f'{entity}/{id_}'] = len(data)
+        return graphs
@@ -0,0 +1,112 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+In-memory index of the CMC parameter ranges for capability queries
+
+The normalized KcdbParameterRange bounds are grouped by scale, each group
+keeps its intervals twice, sorted by lower bound and by upper bound.
+A range covering [a, b] has lower <= a, a prefix of the first order,
+and upper >= b, a suffix of the second order. Both ends are found with
+searchsorted and the smaller side is filtered on the other bound.
+Conditions are combined as boolean masks over the CMC ids
+
+    index = IntervalIndex.from_session(session)
+    index.covering([('SC17', 230.0), ('SC11', 50.0)]) -> array of CMC ids
+"""
+import numpy as np
+
+from miiflask.flask import model
+
+
+class _ScaleIntervals:
+
+    def __init__(self, lowers, uppers, cmc_ids):
+        by_lower = np.argsort(lowers, kind='stable')
+        self.lowers = lowers[by_lower]
+        self.lower_uppers = uppers[by_lower]
+        self.lower_cmcs = cmc_ids[by_lower]
+        by_upper = np.argsort(uppers, kind='stable')
+        self.uppers = uppers[by_upper]
+        self.upper_lowers = lowers[by_upper]
+        self.upper_cmcs = cmc_ids[by_upper]
+
+    def covering(self, lower, upper):
+        # Intervals with lowers[:start] <= lower and uppers[end:] >= upper
+        start = np.searchsorted(self.lowers, lower, side='right')
+        end = np.searchsorted(self.uppers, upper, side='left')
+        if start <= len(self.uppers) - end:
+            hits = self.lower_cmcs[:start][self.lower_uppers[:start] >= upper]
+        else:
+            hits = self.upper_cmcs[end:][self.upper_lowers[end:] <= lower]
+        return hits
+
+
+class IntervalIndex:
+    """
+    Ranges of the CMC parameters per scale
+    """
+
+    def __init__(self, rows):
+        """
+        rows of (scale_id, lower, upper, cmc_id), ranges without scale are skipped
+        """
+        groups = {}
+        self._size = 0
+        for scale_id, lower, upper, cmc_id in rows:
+            if scale_id is None:
+                continue
+            groups.setdefault(scale_id, []).append((lower, upper, cmc_id))
+            self._size = max(self._size, cmc_id + 1)
+        self._scales = {}
+        for scale_id, group in groups.items():
+            lowers, uppers, cmc_ids = zip(*group)
+            self._scales[scale_id] = _ScaleIntervals(np.array(lowers, dtype=float),
+                                                     np.array(uppers, dtype=float),
+                                                     np.array(cmc_ids, dtype=np.int64))
+
+    @classmethod
+    def from_session(cls, session):
+        ranges = model.KcdbParameterRange
+        rows = session.query(ranges.scale_id, ranges.lower, ranges.upper,
+                             model.KcdbParameter.kcdbcmc_id) \
+            .join(model.KcdbParameter, ranges.parameter_id == model.KcdbParameter.id) \
+            .filter(model.KcdbParameter.kcdbcmc_id.isnot(None))
+        return cls(rows)
+
+    @property
+    def scales(self):
+        return set(self._scales)
+
+    def __len__(self):
+        return sum(len(s.lowers) for s in self._scales.values())
+
+    def _mask(self, scale_id, lower, upper=None):
+        # CMC ids as a dense boolean mask, a CMC may have several hits
+        mask = np.zeros(self._size, dtype=bool)
+        intervals = self._scales.get(scale_id)
+        if intervals is not None:
+            mask[intervals.covering(lower, lower if upper is None else upper)] = True
+        return mask
+
+    def covering_range(self, scale_id, lower, upper=None):
+        """
+        Sorted ids of the CMCs with a range on scale_id containing [lower, upper]
+        """
+        return np.flatnonzero(self._mask(scale_id, lower, upper))
+
+    def covering(self, conditions):
+        """
+        Sorted ids of the CMCs satisfying every condition
+        conditions are (scale_id, value) or (scale_id, lower, upper)
+        """
+        mask = None
+        for condition in conditions:
+            hits = self._mask(*condition)
+            mask = hits if mask is None else mask & hits
+        return np.empty(0, dtype=np.int64) if mask is None else np.flatnonzero(mask)
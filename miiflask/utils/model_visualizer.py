@@ -19,7 +19,8 @@ from sqlalchemy import inspect
 import graphviz
 import os
 import re
-import base64
+import gzip
+import hashlib
 import json
 
 from miiflask.utils.unicode_mapper import greek_alphabet_unicode, superscript_integers_unicode
@@ -27,7 +28,41 @@ from miiflask.utils.unicode_mapper import greek_alphabet_unicode, superscript_in
 Base = declarative_base()
 
 
-def generate_data_model_diagram(models, excludes=[], show_attributes=True, add_labels=True, view_diagram=True):
+def data_model_key(models, excludes=[], show_attributes=True, add_labels=True, format='png'):
+    """
+    Hash of everything a data model diagram depends on,
+    the mapped columns and relationships of the models, the excludes and options
+    """
+    parts = [format, str(show_attributes), str(add_labels), ','.join(excludes)]
+    for model in models:
+        insp = inspect(model)
+        parts.append(insp.class_.__name__)
+        parts.extend(f'{c.name}:{c.type}:{c.primary_key}:{c.unique}:{c.index}'
+                     for c in insp.columns)
+        parts.extend(f'{rel.key}->{rel.mapper.class_.__name__}'
+                     for rel in insp.relationships)
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def pipe(dot, format='png'):
+    """
+    Rendered bytes of a graph, svgz is the svg output gzip compressed
+    """
+    if format == 'svgz':
+        # mtime=0 keeps the output reproducible
+        return gzip.compress(dot.pipe(format='svg'), mtime=0)
+    return dot.pipe(format=format)
+
+
+def render_data_model_diagram(models, excludes=[], show_attributes=True, add_labels=True, format='png'):
+    """
+    Rendered diagram bytes in format
+    """
+    dot = data_model_digraph(models, excludes, show_attributes, add_labels)
+    return pipe(dot, format)
+
+
+def data_model_digraph(models, excludes=[], show_attributes=True, add_labels=True):
     # Initialize graph with more advanced visual settings
     dot = graphviz.Digraph(comment='Interactive Data Models', format='svg', 
                             graph_attr={'bgcolor': '#EEEEEE', 'rankdir': 'TB', 'splines': 'spline'},
@@ -81,12 +116,9 @@ def generate_data_model_diagram(models, excludes=[], show_attributes=True, add_l
 
     # Render the graph to a file and open it
     # dot.render(output_file, view=view_diagram)           
-    output = dot.pipe(format='png')
-    output = base64.b64encode(output).decode('utf-8')
-    return output
+    return dot
 
 def getDescription(cls, obj):
-    print(cls, str(obj))
     if cls == 'Scale':
         return f'{obj.scale_type} scale {obj.unit.name}'
     if cls == 'Conversion':
@@ -101,56 +133,76 @@ def getDescription(cls, obj):
         return str(obj)
     
 
-def visualize_model_instance(model, instance, excludes=[], add_labels=True, view_diagram=True):
+def render_model_instance(model, instance, excludes=[], add_labels=True, format='png'):
+    """
+    Rendered relationship graph bytes of an instance in format
+    """
+    return render_graph_data(instance_graph_data(model, instance), excludes, add_labels, format)
+
+
+def render_graph_data(data, excludes=[], add_labels=True, format='png'):
+    """
+    Rendered relationship graph bytes of instance_graph_data in format
+    """
+    return pipe(graph_data_digraph(data, excludes, add_labels), format)
+
+
+def instance_graph_data(model, instance):
+    """
+    Plain data of the relationship graph of an instance
+    {'name': description, 'relations': [{'key', 'target', 'many', 'count', 'descriptions'}]}
+    Touches every relationship, load them first, see miiflask.utils.graph_data
+    """
+    insp = inspect(model)
+    relations = []
+    for rel in insp.relationships:
+        target = rel.mapper.class_.__name__
+        obj = getattr(instance, rel.key)
+        if obj is None:
+            continue
+        if isinstance(obj, list):
+            # Only the first CMC is shown
+            shown = obj[:1] if target == 'KcdbCmc' else obj
+            relations.append({'key': rel.key, 'target': target, 'many': True, 'count': len(obj),
+                              'descriptions': [getDescription(target, sub) for sub in shown]})
+        else:
+            relations.append({'key': rel.key, 'target': target, 'many': False, 'count': 1,
+                              'descriptions': [getDescription(target, obj)]})
+    return {'name': getDescription(insp.class_.__name__, instance), 'relations': relations}
+
+
+def graph_data_digraph(data, excludes=[], add_labels=True):
     dot = graphviz.Digraph(comment='Interactive Data Models', format='svg', 
                             graph_attr={'bgcolor': '#EEEEEE', 'rankdir': 'TB', 'splines': 'spline'},
                             node_attr={'shape': 'none', 'fontsize': '11', 'fontname': 'Roboto'},
                             edge_attr={'fontsize': '10', 'fontname': 'Roboto'})
     
-    insp = inspect(model)
-    cls_name = insp.class_.__name__
-    
-    name = getDescription(cls_name, instance) 
+    name = data['name']
     
     # Create the node with added hyperlink to detailed documentation
     dot.node(name, label=name) 
 
     # Add relationships with tooltips and advanced styling
-    for rel in insp.relationships:
-        
-        obj = getattr(instance, rel.key)
-        if obj is None:
-            continue
-        if isinstance(obj, list):
-            if len(obj) == 0:
+    for rel in data['relations']:
+        if rel['many']:
+            if rel['count'] == 0:
                 continue
-            target_name = f'{rel.mapper.class_.__name__} \n'
-            if rel.mapper.class_.__name__ == 'KcdbCmc':
-                descr = getDescription(rel.mapper.class_.__name__, obj[0])
-                if(len(obj) > 1): 
+            target_name = f"{rel['target']} \n"
+            if rel['target'] == 'KcdbCmc':
+                descr = rel['descriptions'][0]
+                if rel['count'] > 1:
                     target_name += f'{descr} ... \n '
                 else: 
                     target_name += f'{descr} \n '
-                if target_name in excludes:
-                    continue
             else:
-                for sub in obj:
-                    descr = getDescription(rel.mapper.class_.__name__, sub)
+                for descr in rel['descriptions']:
                     target_name += f'{descr} \n '
-                    if target_name in excludes:
-                        continue
-                
-            tooltip = f"Relation between {name} and {target_name}"
-            dot.edge(name, target_name, label=f'has {rel.key}' if add_labels else None, tooltip=tooltip, color="#1E88E5", style="dashed")
         else:
-            descr = getDescription(rel.mapper.class_.__name__, obj)
-            target_name = f'{rel.mapper.class_.__name__} \n {descr}'
-            if target_name in excludes:
-                continue
+            target_name = f"{rel['target']} \n {rel['descriptions'][0]}"
+        if target_name in excludes:
+            continue
             
-            tooltip = f"Relation between {name} and {target_name}"
-            dot.edge(name, target_name, label=f'has {rel.key}' if add_labels else None, tooltip=tooltip, color="#1E88E5", style="dashed")
+        tooltip = f"Relation between {name} and {target_name}"
+        dot.edge(name, target_name, label=f"has {rel['key']}" if add_labels else None, tooltip=tooltip, color="#1E88E5", style="dashed")
     
-    output = dot.pipe(format='png')
-    output = base64.b64encode(output).decode('utf-8')
-    return output
+    return dot
@@ -0,0 +1,230 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Layout of the whole m-layer network, scales linked by conversions,
+casts and root scales, clustered by aspect
+
+Each scale belongs to the aspect most of its associations, conversions
+and casts use, prefixed scales to the cluster of their root scale.
+Clusters are laid out independently by a force directed layout, then
+packed on shelves, largest first. Positions are normalized to the unit
+square, computed once per data version (prebuilt as an artifact)
+
+NetworkTiles answers the viewer with levels of detail: below DETAIL_ZOOM
+the clusters and the number of edges between them, from DETAIL_ZOOM the
+scales and edges of a tile. Tile z/x/y covers
+[x / 2**z, (x + 1) / 2**z] x [y / 2**z, (y + 1) / 2**z]
+
+    layout = network_layout(session)
+    tiles = NetworkTiles(layout)
+    tiles.overview()
+    tiles.tile(3, 2, 5)
+"""
+from collections import Counter, defaultdict
+
+import numpy as np
+from sqlalchemy import select
+
+from miiflask.flask import model
+
+MAX_ZOOM = 6
+DETAIL_ZOOM = 2
+# Cluster of the scales without aspect
+UNCLUSTERED = None
+
+
+def _scale_aspects(session):
+    # scale: aspect of its cluster
+    votes = defaultdict(Counter)
+    scaleaspect = model.scaleaspect_table.c
+    for scale_id, aspect_id in session.execute(select(scaleaspect.scale_id,
+                                                      scaleaspect.aspect_id)):
+        votes[scale_id][aspect_id] += 1
+    for src, dst, aspect_id in session.execute(select(model.Conversion.src_scale_id,
+                                                      model.Conversion.dst_scale_id,
+                                                      model.Conversion.aspect_id)):
+        votes[src][aspect_id] += 1
+        votes[dst][aspect_id] += 1
+    for src, src_aspect, dst, dst_aspect in session.execute(select(model.Cast.src_scale_id,
+                                                                   model.Cast.src_aspect_id,
+                                                                   model.Cast.dst_scale_id,
+                                                                   model.Cast.dst_aspect_id)):
+        votes[src][src_aspect] += 1
+        votes[dst][dst_aspect] += 1
+    # Most votes, ties to the smallest aspect id
+    return {scale_id: min(counter.items(), key=lambda item: (-item[1], item[0]))[0]
+            for scale_id, counter in votes.items()}
+
+
+def _force_layout(n, edges, rng, iterations=60):
+    """
+    Fruchterman-Reingold positions of n nodes within the unit disk
+    """
+    if n == 1:
+        return np.zeros((1, 2))
+    pos = rng.uniform(-1.0, 1.0, (n, 2))
+    k = 1.0 / np.sqrt(n)
+    temperature = 0.1
+    src, dst = (np.array(side, dtype=int) for side in zip(*edges)) if edges else \
+        (np.zeros(0, dtype=int), np.zeros(0, dtype=int))
+    for _ in range(iterations):
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist = np.maximum(np.linalg.norm(delta, axis=-1), 1e-3)
+        # Repulsion between all pairs, attraction along the edges
+        disp = (delta * (k * k / dist ** 2)[..., None]).sum(axis=1)
+        if len(src):
+            d = pos[src] - pos[dst]
+            force = d * (np.linalg.norm(d, axis=-1) / k)[:, None]
+            np.add.at(disp, src, -force)
+            np.add.at(disp, dst, force)
+        length = np.maximum(np.linalg.norm(disp, axis=-1), 1e-9)
+        pos += disp / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature *= 0.95
+    pos -= pos.mean(axis=0)
+    return pos / max(np.linalg.norm(pos, axis=-1).max(), 1e-9)
+
+
+def _pack(radii, gap=0.5):
+    """
+    Centers of circles packed on shelves, largest first, in input order
+    """
+    order = sorted(range(len(radii)), key=lambda i: -radii[i])
+    width = np.sqrt(sum((2 * r + gap) ** 2 for r in radii)) * 1.2
+    centers = [None] * len(radii)
+    x = y = shelf = 0.0
+    for i in order:
+        size = 2 * radii[i] + gap
+        if x and x + size > width:
+            x, y, shelf = 0.0, y + shelf, 0.0
+        centers[i] = (x + size / 2, y + size / 2)
+        x += size
+        shelf = max(shelf, size)
+    return centers
+
+
+def network_layout(session, seed=0):
+    """
+    {'nodes': [{id, label, aspect, x, y}], 'edges': [[source, target, kind]],
+     'clusters': [{aspect, label, x, y, r, count}]}
+    """
+    rng = np.random.default_rng(seed)
+    aspects = dict(session.execute(select(model.Aspect.id, model.Aspect.name)).all())
+    scales = session.execute(select(model.Scale.id, model.Scale.ml_name,
+                                    model.Scale.root_scale_id)
+                             .order_by(model.Scale.id)).all()
+    edges = [(src, dst, 'conversion') for src, dst in session.execute(
+                 select(model.Conversion.src_scale_id, model.Conversion.dst_scale_id))]
+    edges += [(src, dst, 'cast') for src, dst in session.execute(
+                  select(model.Cast.src_scale_id, model.Cast.dst_scale_id))]
+    edges += [(id_, root, 'root_scale') for id_, _, root in scales
+              if root is not None and root != id_]
+    ids = {id_ for id_, _, _ in scales}
+    edges = sorted({edge for edge in edges if edge[0] in ids and edge[1] in ids})
+
+    cluster_of = _scale_aspects(session)
+    roots = {id_: root for id_, _, root in scales}
+    for id_, _, _ in scales:
+        # Prefixed scales follow their root scale
+        seen, current = set(), id_
+        while current not in cluster_of and roots.get(current) and current not in seen:
+            seen.add(current)
+            current = roots[current]
+        cluster_of[id_] = cluster_of.get(current, UNCLUSTERED)
+
+    members = defaultdict(list)
+    for id_, _, _ in scales:
+        members[cluster_of[id_]].append(id_)
+    names = sorted(members, key=lambda a: (a is None, a or ''))
+    radii = [np.sqrt(len(members[a])) for a in names]
+    centers = _pack(radii)
+
+    positions = {}
+    for aspect_id, radius, (cx, cy) in zip(names, radii, centers):
+        local = {id_: i for i, id_ in enumerate(members[aspect_id])}
+        inner = [(local[s], local[t]) for s, t, _ in edges if s in local and t in local]
+        pos = _force_layout(len(local), inner, rng)
+        for id_, i in local.items():
+            positions[id_] = (cx + pos[i, 0] * radius, cy + pos[i, 1] * radius)
+
+    # Unit square, same scale on both axes
+    xy = np.array(list(positions.values()) + [(cx - r, cy - r) for (cx, cy), r in zip(centers, radii)]
+                  + [(cx + r, cy + r) for (cx, cy), r in zip(centers, radii)])
+    origin = xy.min(axis=0)
+    extent = float((xy.max(axis=0) - origin).max()) or 1.0
+
+    def norm(x, y):
+        return round((x - origin[0]) / extent, 6), round((y - origin[1]) / extent, 6)
+
+    labels = {id_: name for id_, name, _ in scales}
+    nodes = [dict(zip(('x', 'y'), norm(*positions[id_])),
+                  id=id_, label=labels[id_], aspect=cluster_of[id_])
+             for id_, _, _ in scales]
+    clusters = [dict(zip(('x', 'y'), norm(cx, cy)),
+                     aspect=aspect_id, label=aspects.get(aspect_id, 'unclustered'),
+                     r=round(radius / extent, 6), count=len(members[aspect_id]))
+                for aspect_id, radius, (cx, cy) in zip(names, radii, centers)]
+    return {'nodes': nodes, 'edges': [list(edge) for edge in edges], 'clusters': clusters}
+
+
+class NetworkTiles:
+    """
+    Level of detail views of a network_layout
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        nodes = layout['nodes']
+        self._index = {node['id']: i for i, node in enumerate(nodes)}
+        self._xy = np.array([(node['x'], node['y']) for node in nodes]).reshape(-1, 2)
+        self._edges = np.array([(self._index[s], self._index[t]) for s, t, _ in layout['edges']],
+                               dtype=int).reshape(-1, 2)
+        cluster = {c['aspect']: i for i, c in enumerate(layout['clusters'])}
+        pairs = Counter()
+        for s, t, _ in layout['edges']:
+            a, b = cluster[nodes[self._index[s]]['aspect']], cluster[nodes[self._index[t]]['aspect']]
+            if a != b:
+                pairs[min(a, b), max(a, b)] += 1
+        self._cluster_edges = [[layout['clusters'][a]['aspect'], layout['clusters'][b]['aspect'],
+                                count] for (a, b), count in sorted(pairs.items())]
+
+    def overview(self):
+        """
+        Clusters and the number of edges between clusters
+        """
+        return {'max_zoom': MAX_ZOOM, 'detail_zoom': DETAIL_ZOOM,
+                'nodes': len(self.layout['nodes']), 'edges': len(self.layout['edges']),
+                'clusters': self.layout['clusters'], 'cluster_edges': self._cluster_edges}
+
+    @staticmethod
+    def bounds(z, x, y):
+        size = 1.0 / 2 ** z
+        return x * size, y * size, (x + 1) * size, (y + 1) * size
+
+    def tile(self, z, x, y):
+        """
+        Content of tile z/x/y, None outside of the tiling
+        """
+        if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return None
+        x0, y0, x1, y1 = self.bounds(z, x, y)
+        if z < DETAIL_ZOOM:
+            clusters = [c for c in self.layout['clusters']
+                        if c['x'] + c['r'] >= x0 and c['x'] - c['r'] < x1
+                        and c['y'] + c['r'] >= y0 and c['y'] - c['r'] < y1]
+            return {'z': z, 'x': x, 'y': y, 'bounds': [x0, y0, x1, y1], 'clusters': clusters}
+        # Nodes on the right and bottom border belong to the last tile
+        cells = np.minimum((self._xy * 2 ** z).astype(int), 2 ** z - 1)
+        inside = (cells[:, 0] == x) & (cells[:, 1] == y)
+        # Edges leaving the tile are sent with both tiles
+        selected = inside[self._edges[:, 0]] | inside[self._edges[:, 1]]
+        nodes = self.layout['nodes']
+        edges = self.layout['edges']
+        return {'z': z, 'x': x, 'y': y, 'bounds': [x0, y0, x1, y1],
+                'nodes': [nodes[i] for i in np.flatnonzero(inside)],
+                'edges': [edges[i] for i in np.flatnonzero(selected)]}
@@ -0,0 +1,198 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Parse KCDB parameter values into numeric intervals
+
+    "0.1 kV to 500 kV"  -> ra_si_V [(100.0, 500000.0)]
+    "50 Hz, 60 Hz"      -> ra_si_Hz [(50.0, 50.0), (60.0, 60.0)]
+    "to 20 kA"          -> ra_si_A [(-inf, 20000.0)]
+    "any"               -> None [(-inf, inf)]
+
+Unit symbols are resolved with the m-layer scales, a prefixed scale
+is normalized to its root scale with the prefix factor
+
+    "(23 ± 1) °C"       -> in_si_deg_C [(22.0, 24.0)]
+"""
+import html
+import math
+import re
+from collections import namedtuple
+
+from miiflask.flask import model
+
+ParsedValue = namedtuple("ParsedValue", ["scale_id", "intervals"])
+
+_NUMBER = re.compile(
+        r'(?<![\w.])(?P<number>[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)'
+        r'(?:\s*(?P<unit>[^\s\d,;()][^\s,;()]*))?')
+
+_KEYWORDS = frozenset(('to', 'and', 'or', 'at', 'from', 'up', '±'))
+
+_CLEAN = [
+    # Powers of ten, 10<sup>7</sup>
+    (re.compile(r'(?<![\d.])10<sup>\s*([-+]?\d+)\s*</sup>', re.I), r'1e\1'),
+    (re.compile(r'<sup>\s*([^<]*?)\s*</sup>', re.I), r'\1'),
+    # Remarks are dropped, grouping of numbers is kept, "(23 ± 1) °C"
+    (re.compile(r'\(([^)]*\d[^)]*)\)'), r'\1'),
+    (re.compile(r'\([^)]*\)'), ' '),
+    # Sampling step of a range, "400 nm to 700 nm at 10 nm intervals"
+    (re.compile(r'\s+at\s+\S+\s*\S*\s+intervals?\b.*$', re.I), ' '),
+]
+
+# Structure of the value once the quantities are replaced by #
+_INTERVAL = re.compile(r'^(?:from )?# to #$')
+_AT_MOST = re.compile(r'^(?:(?:up )?to|<|<=|≤) ?#$')
+_AT_LEAST = re.compile(r'^(?:>|>=|≥|from) ?#$')
+_TOLERANCE = re.compile(r'^# ?± ?#$')
+_POINTS = re.compile(r'^#(?:(?:,|, and|, or| and| or) #)*$')
+
+
+class UnitResolver:
+    """
+    Unit symbol -> (root scale id, factor to the root scale)
+
+    A value is a point of a scale, the interval scale of a unit (°C, °F)
+    is preferred to its ratio scale of differences
+    Only the symbols of ratio scales take a prefix
+    """
+    _SCALE_TYPES = ('interval', 'ratio', 'bounded_interval')
+
+    def __init__(self, session):
+        self._symbols = {}
+        self._prefixable = set()
+        self._prefixes = {}
+        scales = session.query(model.Scale).join(model.Scale.unit) \
+            .filter(model.Scale.scale_type.in_(self._SCALE_TYPES),
+                    model.Unit.symbol.isnot(None)) \
+            .all()
+
+        def rank(scale):
+            # SI units first, then the scale named after the unit
+            unit = scale.unit
+            return (self._SCALE_TYPES.index(scale.scale_type),
+                    not unit.ml_name.startswith('si_'),
+                    scale.ml_name != f'ra_{unit.ml_name}',
+                    scale.id)
+
+        for scale in sorted(scales, key=rank):
+            symbol = scale.unit.symbol
+            if symbol in self._symbols:
+                continue
+            if scale.root_scale_id and scale.prefix:
+                factor = scale.prefix.numerator / scale.prefix.denominator
+                self._symbols[symbol] = (scale.root_scale_id, factor)
+            else:
+                self._symbols[symbol] = (scale.id, 1.0)
+                if scale.scale_type == 'ratio':
+                    self._prefixable.add(symbol)
+        for prefix in session.query(model.Prefix) \
+                .filter(model.Prefix.ml_name.like('pr_si_%'),
+                        model.Prefix.ml_name.notlike('pr_si_kg_%')):
+            self._prefixes[prefix.symbol] = prefix.numerator / prefix.denominator
+
+    def resolve(self, symbol):
+        """
+        (scale_id, factor) or None
+        """
+        if symbol in self._symbols:
+            return self._symbols[symbol]
+        # Prefixed symbols without their own m-layer scale
+        for prefix in sorted(self._prefixes, key=len, reverse=True):
+            if symbol.startswith(prefix) and symbol[len(prefix):] in self._prefixable:
+                scale_id, _ = self._symbols[symbol[len(prefix):]]
+                return scale_id, self._prefixes[prefix]
+        return None
+
+
+def _clean(text):
+    text = html.unescape(text)
+    # Ordinal indicator and greek mu typed for degree and micro
+    text = text.replace('º', '°').replace('μ', 'µ')
+    for pattern, repl in _CLEAN:
+        text = pattern.sub(repl, text)
+    return ' '.join(text.split())
+
+
+def parse_value(text, resolver):
+    """
+    ParsedValue of a parameter value or None when not understood
+    Bounds are inclusive, open ends are infinite
+    """
+    if not text:
+        return None
+    text = _clean(text)
+    if text.lower() == 'any':
+        return ParsedValue(None, [(-math.inf, math.inf)])
+
+    quantities = []
+
+    def replace(match):
+        unit = match.group('unit')
+        if unit and unit.lower() in _KEYWORDS:
+            # Not a unit, leave it in the skeleton
+            quantities.append((float(match.group('number')), None))
+            return '# ' + unit
+        quantities.append((float(match.group('number')), unit))
+        return '#'
+
+    skeleton = ' '.join(_NUMBER.sub(replace, text).lower().split())
+    if not quantities:
+        return None
+
+    # A number without unit takes the unit of the next quantity, "10 to 20 kV"
+    units = [unit for _, unit in quantities]
+    following = None
+    for i in reversed(range(len(units))):
+        if units[i] is None:
+            units[i] = following
+        following = units[i]
+    scale_id = None
+    values = []
+    for (number, _), unit in zip(quantities, units):
+        factor = 1.0
+        if unit is not None:
+            resolved = resolver.resolve(unit)
+            if resolved is None:
+                return None
+            if scale_id is not None and resolved[0] != scale_id:
+                return None
+            scale_id, factor = resolved
+        # Drop the float noise of the prefix factor, 0.1 kV -> 100.0 V
+        values.append(float(f'{number * factor:.12g}'))
+
+    if _INTERVAL.match(skeleton) and len(values) == 2:
+        intervals = [(min(values), max(values))]
+    elif _AT_MOST.match(skeleton):
+        intervals = [(-math.inf, values[0])]
+    elif _AT_LEAST.match(skeleton):
+        intervals = [(values[0], math.inf)]
+    elif _TOLERANCE.match(skeleton) and len(values) == 2:
+        intervals = [(values[0] - abs(values[1]), values[0] + abs(values[1]))]
+    elif _POINTS.match(skeleton):
+        intervals = [(value, value) for value in values]
+    else:
+        return None
+    return ParsedValue(scale_id, intervals)
+
+
+def parse_parameter(parameter, resolver):
+    """
+    Set the scale and ranges of a KcdbParameter from its value
+    """
+    parsed = parse_value(parameter.value, resolver)
+    parameter.ranges = []
+    if parsed is None:
+        parameter.scale_id = None
+        return None
+    parameter.scale_id = parsed.scale_id
+    parameter.ranges = [model.KcdbParameterRange(scale_id=parsed.scale_id,
+                                                 lower=lower,
+                                                 upper=upper)
+                        for lower, upper in parsed.intervals]
+    return parsed
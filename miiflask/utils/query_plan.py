@@ -0,0 +1,129 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+EXPLAIN QUERY PLAN audit of the hot lookups
+
+QUERIES is a catalog of the statements issued by the views and mappers
+on every request or loaded record. Each one must be answered through
+an index, a SCAN of a table (without index) is reported as a regression
+
+python -m miiflask.utils.query_plan -d data/miiflask.db
+"""
+import argparse
+import os
+import re
+
+from sqlalchemy import create_engine, select, text
+
+from miiflask.flask import model
+
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING (?:COVERING )?INDEX)(?:\s|$)')
+
+_CMC_FOREIGN_KEYS = ('area_id', 'branch_id', 'service_id', 'subservice_id',
+                     'individualservice_id', 'quantity_id', 'instrument_id',
+                     'instrumentmethod_id')
+
+# name: statement, the literal values only shape the plan
+QUERIES = {
+    # TaxonomyMapper.roundtrip, KcdbMapper._getCmcMetadataLocal, CMC linking
+    'measurandtaxon_by_name':
+        select(model.MeasurandTaxon).where(model.MeasurandTaxon.name == 'Measure.Mass'),
+    # TaxonomyMapper._associateAspect
+    'aspect_by_name':
+        select(model.Aspect).where(model.Aspect.name == 'mass'),
+    # CMCView kcdbCode filter
+    'kcdbcmc_by_code':
+        select(model.KcdbCmc).where(model.KcdbCmc.kcdbCode == 'SIM-EM-CA-00000001-1'),
+    # /kcdbcmcs/<area>/ and KcdbMapper
+    'kcdbarea_by_label':
+        select(model.KcdbArea).where(model.KcdbArea.label == 'EM'),
+    'kcdbcmcs_area_page':
+        select(model.KcdbCmc.id, model.KcdbCmc.kcdbCode)
+        .where(model.KcdbCmc.area_id == 1, model.KcdbCmc.branch_id == 1)
+        .order_by(model.KcdbCmc.kcdbCode).limit(100),
+    # selectinload of KcdbCmc.parameters and KcdbCmc.measurands
+    'kcdbparameters_of_cmcs':
+        select(model.KcdbParameter)
+        .where(model.KcdbParameter.kcdbcmc_id.in_([1, 2, 3])),
+    'measurands_of_cmcs':
+        select(model.kcdb_measurand_map)
+        .where(model.kcdb_measurand_map.c.kcdbcmc_id.in_([1, 2, 3])),
+    'cmcs_of_measurand':
+        select(model.kcdb_measurand_map.c.kcdbcmc_id)
+        .where(model.kcdb_measurand_map.c.measurandtaxon_id == 'MeasureMass'),
+    # Aspect reverse indexes, miiflask.flask.reverse_index
+    'aspect_dependents':
+        select(model.aspect_dependent_table)
+        .where(model.aspect_dependent_table.c.aspect_id == 'AS5',
+               model.aspect_dependent_table.c.entity == 'measurand'),
+    'aspect_kcdbcmcs':
+        select(model.aspect_kcdbcmc_table)
+        .where(model.aspect_kcdbcmc_table.c.aspect_id == 'AS5'),
+    'aspect_dependents_of_measurand':
+        select(model.aspect_dependent_table)
+        .where(model.aspect_dependent_table.c.entity == 'measurand',
+               model.aspect_dependent_table.c.key == 'MeasureMass'),
+    'aspect_kcdbcmcs_of_measurand':
+        select(model.aspect_kcdbcmc_table)
+        .where(model.aspect_kcdbcmc_table.c.measurandtaxon_id == 'MeasureMass'),
+}
+# CMCs of one lookup value, CMCView filters and deletes of the lookup rows
+QUERIES.update({
+    f'kcdbcmcs_by_{column}':
+        select(model.KcdbCmc.id).where(getattr(model.KcdbCmc, column) == 1)
+    for column in _CMC_FOREIGN_KEYS
+})
+
+
+def explain(connection, statement):
+    """
+    Details of the EXPLAIN QUERY PLAN rows of a statement
+    """
+    sql = statement.compile(dialect=connection.dialect,
+                            compile_kwargs={"literal_binds": True})
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    return [row.detail for row in rows]
+
+
+def full_scans(plan):
+    """
+    Tables scanned without an index
+    """
+    return [match.group(1) for match in map(_FULL_SCAN.match, plan) if match]
+
+
+def audit(connection, queries=None):
+    """
+    {name: (plan, full scans)} of the catalog
+    """
+    return {name: (plan, full_scans(plan))
+            for name, plan in ((name, explain(connection, statement))
+                               for name, statement in (queries or QUERIES).items())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-d", "--database", default="data/miiflask.db")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///" + os.path.abspath(args.database))
+    failed = 0
+    with engine.connect() as connection:
+        for name, (plan, scans) in audit(connection).items():
+            status = f"FULL SCAN {', '.join(scans)}" if scans else "ok"
+            failed += bool(scans)
+            print(f"{name}: {status}")
+            for detail in plan:
+                print(f"    {detail}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
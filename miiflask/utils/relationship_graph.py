@@ -0,0 +1,142 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Adjacency list of the taxonomy, m-layer and KCDB relationships
+
+    measurand -> aspect, result aspect, parameters
+    parameter -> aspect
+    aspect -> scales
+    scale -> conversions, casts, root scale
+    conversion, cast -> destination scale (and aspect of a cast)
+    kcdbcmc -> measurands
+
+The edges are read with one query per relationship, once per data version,
+a neighborhood is a breadth first walk over both edge directions,
+no lazy loads or queries per request
+
+    graph = RelationshipGraph(session)
+    graph.neighborhood('measurand', 'MeasureMass', depth=3)
+"""
+from collections import defaultdict, deque
+
+from sqlalchemy import select
+
+from miiflask.flask import model
+
+ENTITIES = ('measurand', 'parameter', 'aspect', 'scale', 'conversion', 'cast', 'kcdbcmc')
+
+
+def node_key(entity, id_):
+    return f'{entity}:{id_}'
+
+
+def _conversion_id(src, dst, aspect):
+    # Same as str(Conversion)
+    return f'{src}.{dst}.{aspect}'
+
+
+def _cast_id(src, src_aspect, dst, dst_aspect):
+    # Same as str(Cast)
+    return f'{src}.{src_aspect}.{dst}.{dst_aspect}'
+
+
+class RelationshipGraph:
+    """
+    Labelled nodes and typed edges, node keys are entity:id
+    """
+
+    def __init__(self, session):
+        self.labels = {}
+        self._out = defaultdict(list)
+        self._in = defaultdict(list)
+        execute = session.execute
+
+        taxon, parameter = model.MeasurandTaxon, model.Parameter
+        for id_, name in execute(select(model.Aspect.id, model.Aspect.name)):
+            self._node('aspect', id_, name)
+        for id_, name, root in execute(select(model.Scale.id, model.Scale.ml_name,
+                                              model.Scale.root_scale_id)):
+            self._node('scale', id_, name)
+            self._edge('scale', id_, 'root_scale', 'scale', root)
+        for id_, name, aspect, result in execute(select(taxon.id, taxon.name, taxon.aspect_id,
+                                                        taxon.result_aspect_id)):
+            self._node('measurand', id_, name)
+            self._edge('measurand', id_, 'aspect', 'aspect', aspect)
+            self._edge('measurand', id_, 'result_aspect', 'aspect', result)
+        for id_, name, taxon_id, aspect in execute(select(parameter.id, parameter.name,
+                                                          parameter.measurandtaxon_id,
+                                                          parameter.aspect_id)):
+            self._node('parameter', id_, name)
+            self._edge('measurand', taxon_id, 'parameter', 'parameter', id_)
+            self._edge('parameter', id_, 'aspect', 'aspect', aspect)
+        scaleaspect = model.scaleaspect_table.c
+        for scale_id, aspect_id in execute(select(scaleaspect.scale_id, scaleaspect.aspect_id)):
+            self._edge('aspect', aspect_id, 'scale', 'scale', scale_id)
+        conversion = model.Conversion
+        for src, dst, aspect in execute(select(conversion.src_scale_id, conversion.dst_scale_id,
+                                               conversion.aspect_id)):
+            id_ = _conversion_id(src, dst, aspect)
+            self._node('conversion', id_, id_)
+            self._edge('scale', src, 'conversion', 'conversion', id_)
+            self._edge('conversion', id_, 'dst_scale', 'scale', dst)
+        cast = model.Cast
+        for src, src_aspect, dst, dst_aspect in execute(select(cast.src_scale_id,
+                                                               cast.src_aspect_id,
+                                                               cast.dst_scale_id,
+                                                               cast.dst_aspect_id)):
+            id_ = _cast_id(src, src_aspect, dst, dst_aspect)
+            self._node('cast', id_, id_)
+            self._edge('scale', src, 'cast', 'cast', id_)
+            self._edge('cast', id_, 'dst_scale', 'scale', dst)
+            self._edge('cast', id_, 'dst_aspect', 'aspect', dst_aspect)
+        for id_, code in execute(select(model.KcdbCmc.id, model.KcdbCmc.kcdbCode)):
+            self._node('kcdbcmc', id_, code)
+        measurand_map = model.kcdb_measurand_map.c
+        for cmc_id, taxon_id in execute(select(measurand_map.kcdbcmc_id,
+                                               measurand_map.measurandtaxon_id)):
+            self._edge('kcdbcmc', cmc_id, 'measurand', 'measurand', taxon_id)
+
+    def _node(self, entity, id_, label):
+        self.labels[node_key(entity, id_)] = label
+
+    def _edge(self, entity, id_, relation, target_entity, target_id):
+        if id_ is None or target_id is None:
+            return
+        source, target = node_key(entity, id_), node_key(target_entity, target_id)
+        self._out[source].append((relation, target))
+        self._in[target].append((relation, source))
+
+    def __contains__(self, key):
+        return key in self.labels
+
+    def neighborhood(self, entity, id_, depth=2, limit=2000):
+        """
+        {'nodes': [(key, depth)], 'edges': [(source, relation, target)], 'truncated': bool}
+        Nodes within depth edges of entity:id, at most limit nodes
+        """
+        root = node_key(entity, id_)
+        depths = {root: 0}
+        queue = deque([root])
+        truncated = False
+        while queue and not truncated:
+            key = queue.popleft()
+            if depths[key] >= depth:
+                continue
+            for _, neighbor in (*self._out[key], *self._in[key]):
+                if neighbor in depths:
+                    continue
+                if len(depths) >= limit:
+                    truncated = True
+                    break
+                depths[neighbor] = depths[key] + 1
+                queue.append(neighbor)
+        edges = [(source, relation, target)
+                 for source in depths
+                 for relation, target in self._out[source] if target in depths]
+        return {'nodes': list(depths.items()), 'edges': edges, 'truncated': truncated}
@@ -0,0 +1,199 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+Small catalog database of the app tests, ids as in the published database
+
+    tmp = tempfile.TemporaryDirectory()
+    app = create_app(catalog_config(tmp.name))
+
+or a CatalogTestCase subclass, self.app is a client of the app
+"""
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from miiflask.flask import model
+from miiflask.flask.app import create_app
+from miiflask.flask.config import SQLITE_PERFORMANCE, ProductionConfig
+from miiflask.flask.db import Base, apply_sqlite_pragmas, publish_database
+from miiflask.utils.parameter_parser import UnitResolver, parse_parameter
+
+
+def add_mlayer(session):
+    session.add_all([
+        model.Prefix(id='PR10', name='kilo', ml_name='pr_si_kilo', symbol='k',
+                     numerator=1000.0, denominator=1.0),
+        model.Prefix(id='PR16', name='micro', ml_name='pr_si_micro', symbol='µ',
+                     numerator=1.0, denominator=1000000.0),
+        model.Prefix(id='PR17', name='nano', ml_name='pr_si_nano', symbol='n',
+                     numerator=1.0, denominator=1000000000.0),
+        model.Unit(id='UN2', name='metre', ml_name='si_m', symbol='m'),
+        model.Unit(id='UN17', name='volt', ml_name='si_V', symbol='V'),
+        model.Unit(id='UN614', name='kilovolt', ml_name='si_kV', symbol='kV'),
+        model.Unit(id='UN11', name='hertz', ml_name='si_Hz', symbol='Hz'),
+        model.Unit(id='UN4', name='ampere', ml_name='si_A', symbol='A'),
+        model.Unit(id='UN5', name='kelvin', ml_name='si_K', symbol='K'),
+        model.Unit(id='UN24', name='celsius', ml_name='si_deg_C', symbol='°C'),
+        model.Unit(id='UN124', name='degree Fahrenheit', ml_name='ip_deg_F', symbol='°F'),
+        model.Transform(id='FN1', ml_name='ratio'),
+        model.Transform(id='FN3', ml_name='in_conversion'),
+    ])
+    aspects = {id_: model.Aspect(id=id_, name=name, ml_name='as_' + name.replace('-', '_'))
+               for id_, name in (('AS3', 'length'),
+                                 ('AS5', 'electric-current'),
+                                 ('AS12', 'frequency'),
+                                 ('AS22', 'electric-potential-difference'),
+                                 ('AS44', 'current-density'),
+                                 ('AS101', 'thermodynamic-temperature'),
+                                 ('AS102', 'thermodynamic-temperature-difference'))}
+    session.add_all(aspects.values())
+    for id_, ml_name, scale_type, unit, aspect in (
+            ('SC2', 'ra_si_m', 'ratio', 'UN2', 'AS3'),
+            ('SC17', 'ra_si_V', 'ratio', 'UN17', 'AS22'),
+            ('SC11', 'ra_si_Hz', 'ratio', 'UN11', 'AS12'),
+            ('SC4', 'ra_si_A', 'ratio', 'UN4', 'AS5'),
+            ('SC5', 'ra_si_K', 'ratio', 'UN5', 'AS101'),
+            ('SC24', 'ra_si_deg_C', 'ratio', 'UN24', 'AS102'),
+            ('SC62', 'ra_ip_deg_F', 'ratio', 'UN124', 'AS102'),
+            ('SC69', 'in_si_deg_C', 'interval', 'UN24', 'AS101'),
+            ('SC70', 'in_ip_deg_F', 'interval', 'UN124', 'AS101')):
+        session.add(model.Scale(id=id_, ml_name=ml_name, scale_type=scale_type, unit_id=unit,
+                                aspects=[aspects[aspect]]))
+    session.add(model.Scale(id='SC444', ml_name='ra_si_kV', scale_type='ratio',
+                            root_scale_id='SC17', prefix_id='PR10', unit_id='UN614',
+                            aspects=[aspects['AS22']]))
+    session.add(model.Conversion(src_scale_id='SC444', dst_scale_id='SC17', aspect_id='AS22',
+                                 transform_id='FN1', parameters="{'a':'1000'}"))
+    session.add(model.Conversion(src_scale_id='SC69', dst_scale_id='SC70', aspect_id='AS101',
+                                 transform_id='FN3', parameters="{'a': '9/5', 'b': '32'}"))
+
+
+def add_taxonomy(session):
+    session.add(model.Discipline(id=1, label='Electrical'))
+    session.add_all([
+        model.MeasurandTaxon(id='MeasureCurrentDC', name='Measure.Current.DC',
+                             definition='The process measures the DC Current sourced by a device.',
+                             deprecated=False, processtype='Measure', result='electric current',
+                             aspect_id='AS5', result_aspect_id='AS5', discipline_id=1),
+        model.MeasurandTaxon(id='SourceVoltageAC', name='Source.Voltage.AC',
+                             definition='The process sources an AC Voltage.',
+                             deprecated=False, processtype='Source', result='voltage',
+                             aspect_id='AS22', result_aspect_id='AS22', discipline_id=1),
+        model.MeasurandTaxon(id='MeasureTemperature', name='Measure.Temperature',
+                             deprecated=False, processtype='Measure', result='temperature',
+                             aspect_id='AS101', result_aspect_id='AS101'),
+        model.Parameter(id=1, name='Frequency', optional=False,
+                        measurandtaxon_id='SourceVoltageAC', aspect_id='AS12'),
+    ])
+
+
+def add_kcdb(session):
+    session.add_all([
+        model.KcdbArea(id=2, label='EM', value='Electricity and Magnetism'),
+        model.KcdbArea(id=6, label='T', value='Thermometry'),
+        model.KcdbBranch(id=10, label='EM/DC', value='DC voltage, current, and resistance'),
+        model.KcdbBranch(id=11, label='EM/AC', value='AC voltage, current, and power'),
+        model.KcdbBranch(id=30, label='T/T', value='Temperature'),
+        model.KcdbService(id=20, label='1', value='DC current'),
+        model.KcdbService(id=21, label='2', value='AC voltage'),
+        model.KcdbService(id=40, label='1', value='Thermometers'),
+        model.KcdbQuantity(id=1, value='DC current'),
+        model.KcdbQuantity(id=2, value='AC voltage'),
+        model.KcdbQuantity(id=3, value='Temperature'),
+        model.KcdbInstrument(id=1, value='Current shunt'),
+        model.KcdbInstrument(id=2, value='Voltage source'),
+        model.KcdbInstrument(id=3, value='Platinum resistance thermometer'),
+    ])
+    # kcdbCode, area, branch, service, quantity, instrument, measurands, parameters
+    cmcs = [
+        ('EM-CA-1', 2, 10, 20, 1, 1, ['MeasureCurrentDC'], [('Current', '1 A to 100 A')]),
+        ('EM-CA-2', 2, 10, 20, 1, 1, ['MeasureCurrentDC'], [('Current', '10 A to 40000 A')]),
+        ('EM-CA-3', 2, 11, 21, 2, 2, ['SourceVoltageAC'],
+         [('Voltage (AC)', '0.1 kV to 500 kV'), ('Frequency', '50 Hz to 60 Hz')]),
+        ('EM-CA-4', 2, 11, 21, 2, 2, ['SourceVoltageAC'],
+         [('Voltage (AC)', '1 V to 1000 V'), ('Frequency', '45 Hz to 400 Hz')]),
+        ('EM-CA-5', 2, 11, 21, 2, 2, [], [('Frequency', '50 Hz, 60 Hz')]),
+        ('EM-CA-6', 2, 11, 21, 2, 2, [], [('Voltage (AC)', 'to 1 V')]),
+        ('T-CA-1', 6, 30, 40, 3, 3, ['MeasureTemperature'], [('Temperature', '(23 ± 1) °C')]),
+    ]
+    resolver = UnitResolver(session)
+    for i, (code, area, branch, service, quantity, instrument, measurands, parameters) \
+            in enumerate(cmcs, 1):
+        cmc = model.KcdbCmc(id=i, kcdbCode=code, baseUnit='', uncertaintyBaseUnit='',
+                            comments='', area_id=area, branch_id=branch, service_id=service,
+                            quantity_id=quantity, instrument_id=instrument,
+                            measurands=[session.get(model.MeasurandTaxon, id_)
+                                        for id_ in measurands])
+        for name, value in parameters:
+            parameter = model.KcdbParameter(name=name, value=value)
+            parse_parameter(parameter, resolver)
+            cmc.parameters.append(parameter)
+        session.add(cmc)
+
+
+def build_catalog(path):
+    """
+    Write the catalog database to path as dbinit.py does, the data version is 1
+    """
+    engine = create_engine("sqlite:///" + path)
+    apply_sqlite_pragmas(engine, SQLITE_PERFORMANCE)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        add_mlayer(session)
+        add_taxonomy(session)
+        session.flush()
+        add_kcdb(session)
+        session.commit()
+    publish_database(engine)
+    return path
+
+
+def catalog_config(directory, base=ProductionConfig):
+    """
+    base config serving a catalog database built in directory
+    """
+    path = build_catalog(os.path.join(directory, "miiflask.db"))
+    uri = "sqlite:///" + path
+    if base.READ_ONLY:
+        uri = "sqlite:///file:" + path + "?mode=ro&immutable=1&uri=true"
+
+    class Config(base):
+        SQLALCHEMY_DATABASE_URI = uri
+        HYDRATE_FROM = path if base.HYDRATE_FROM else None
+        ARTIFACTS_PATH = os.path.join(directory, "artifacts")
+        GRAPHS_PATH = os.path.join(directory, "graphs")
+
+    return Config
+
+
+class CatalogTestCase(unittest.TestCase):
+    """
+    App of config serving a catalog database in a temporary directory
+    """
+    config = ProductionConfig
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.flask_app = create_app(catalog_config(cls.tmp.name, cls.config))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.app = self.flask_app.test_client()
+        self.app_context = self.flask_app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
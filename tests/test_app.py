@@ -9,22 +9,75 @@
 """
 
 """
+import os
+import tempfile
 import unittest
 
-from miiflask.flask.app import app
+from miiflask.flask.app import create_app
+from miiflask.flask.config import ReadOnlyConfig
+from tests.catalog import CatalogTestCase, catalog_config
 
 
-class TestAppCase(unittest.TestCase):
+class TestAppCase(CatalogTestCase):
 
-    def setUp(self):
-        self.app = app.test_client()
-        self.app_context = app.app_context()
-        self.app_context.push()
-    
     def test_home_route(self):
         response = self.app.get('/')
         self.assertEqual(response.status_code, 200)
-        print(response.json)
-    
-    def tearDown(self):
-        self.app_context.pop()
+
+    def test_pages(self):
+        for url in ['/taxonomy/', '/kcdbcmcs/', '/mlayer/scales/', '/mlayer/aspects/',
+                    '/measurand/MeasureCurrentDC/', '/aspect/AS5/', '/scale/SC17/',
+                    '/network', '/model/mii', '/admin/']:
+            self.assertEqual(self.app.get(url).status_code, 200, url)
+        for url in ['/measurand/unknown/', '/aspect/unknown/', '/scale/unknown/',
+                    '/api/unit/unknown/', '/kcdbcmc/0/export/json']:
+            self.assertEqual(self.app.get(url).status_code, 404, url)
+
+    def test_kcdbcmcs_area(self):
+        response = self.app.get('/kcdbcmcs/em/?per_page=5&sort=branch&order=desc')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.count(b'href="/kcdbcmc/'), 5)
+        # The filter form keeps the page size
+        self.assertIn(b'name="per_page" value="5"', response.data)
+        response = self.app.get('/kcdbcmcs/EM/?branch=10&service=20')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.count(b'href="/kcdbcmc/'), 2)
+        response = self.app.get('/kcdbcmcs/unknown/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_only_view(self):
+        from miiflask.flask.extensions import db
+        from miiflask.flask.model import KcdbCmc
+        from miiflask.flask.views import CMCView, read_only_view
+        view = read_only_view(CMCView(KcdbCmc, db.session, endpoint='kcdbcmc_read_only'))
+        self.assertFalse(view.can_create or view.can_edit or view.can_delete)
+        self.assertFalse(view.is_action_allowed('change_measurand'))
+        self.assertFalse(view.is_action_allowed('delete'))
+
+    def test_read_only_app(self):
+        with tempfile.TemporaryDirectory() as directory:
+            client = create_app(catalog_config(directory, ReadOnlyConfig)).test_client()
+            self.assertEqual(client.get('/api/units/').status_code, 200)
+            self.assertEqual(client.get('/initialize').status_code, 403)
+            self.assertEqual(client.get('/admin/aspect/new/').status_code, 302)
+        self.assertEqual(self.app.get('/admin/aspect/new/').status_code, 200)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs fork')
+    def test_fork(self):
+        from miiflask.flask.extensions import db
+        self.assertEqual(self.app.get('/api/units/').status_code, 200)
+        # The preloading master serves no request
+        db.session.remove()
+        self.assertGreater(db.engine.pool.checkedin(), 0)
+        pid = os.fork()
+        if pid == 0:
+            # Worker of gunicorn --preload, new connections and render threads
+            ok = db.engine.pool.checkedin() == 0 \
+                and self.app.get('/api/units/').status_code == 200
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+import brotli
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from miiflask.flask import model
+from miiflask.utils.artifacts import MANIFEST, ArtifactBuilder, artifact_path
+from tests.catalog import build_catalog
+
+
+class ArtifactBuilderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = build_catalog(os.path.join(self.tmp.name, "miiflask.db"))
+        self.engine = create_engine("sqlite:///" + path)
+        self.session = Session(self.engine)
+        self.parms = {"artifacts": os.path.join(self.tmp.name, "artifacts")}
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def version(self):
+        data_version = self.session.get(model.DataVersion, 1)
+        return data_version.generation, data_version.updated
+
+    def test_build(self):
+        target = ArtifactBuilder(self.session, self.parms).build()
+        version = self.version()
+        root = self.parms["artifacts"]
+        data = artifact_path(root, version, 'api/units.json').read_bytes()
+        self.assertEqual([u['id'] for u in json.loads(data)][:2], ['UN2', 'UN17'])
+        self.assertEqual(gzip.decompress(artifact_path(root, version, 'api/units.json', 'gzip')
+                                         .read_bytes()), data)
+        self.assertEqual(brotli.decompress(artifact_path(root, version, 'api/units.json', 'br')
+                                           .read_bytes()), data)
+        self.assertIsNotNone(artifact_path(root, version, 'measurand/MeasureCurrentDC.xml'))
+        self.assertIsNone(artifact_path(root, version, 'api/unknown.json'))
+        # A replaced database at the same generation
+        replaced = (version[0], version[1] + timedelta(seconds=1))
+        self.assertIsNone(artifact_path(root, replaced, 'api/units.json'))
+        manifest = json.loads((target / MANIFEST).read_text())
+        self.assertEqual(manifest['artifacts']['api/units.json'], len(data))
+        # Up to date, not built again
+        self.assertEqual(ArtifactBuilder(self.session, self.parms).build(), target)
+
+    def test_prune(self):
+        root = Path(self.parms["artifacts"])
+        for generation in (1, 2, 3):
+            self.session.get(model.DataVersion, 1).generation = generation
+            ArtifactBuilder(self.session, self.parms).build()
+        self.assertEqual(sorted(p.name for p in root.iterdir()), ['2', '3'])
+        # Generations after the current one were built from a replaced database
+        self.session.get(model.DataVersion, 1).generation = 1
+        ArtifactBuilder(self.session, self.parms).build()
+        self.assertEqual(sorted(p.name for p in root.iterdir()), ['1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
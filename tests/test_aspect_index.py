@@ -0,0 +1,65 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from miiflask.flask import model
+from miiflask.utils.aspect_index import AspectIndex, AspectMatching, normalize
+
+
+class AspectIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.aspects = [
+            model.Aspect(id="AS5", name="electric-current", ml_name="as_electric_current"),
+            model.Aspect(id="AS44", name="current-density", ml_name="as_current_density"),
+            model.Aspect(id="AS24", name="electric-resistance", ml_name="as_electric_resistance"),
+            model.Aspect(id="AS148", name="thermal-resistance", ml_name="as_thermal_resistance"),
+            model.Aspect(id="AS39", name="acceleration", ml_name="as_acceleration"),
+            model.Aspect(id="AS37", name="volume", ml_name="as_volume"),
+        ]
+        self.index = AspectIndex(self.aspects)
+
+    def test_normalize(self):
+        self.assertEqual(normalize("as_electric_current"), ("electric", "current"))
+        self.assertEqual(normalize("Electric Current "), ("electric", "current"))
+
+    def test_match(self):
+        match = self.index.match("electric-current")
+        self.assertEqual((match.aspect.id, match.score), ("AS5", 1.0))
+        self.assertEqual(self.index.match("electric current").aspect.id, "AS5")
+        # Head of the compound name
+        self.assertEqual(self.index.match("current").aspect.id, "AS5")
+        # Not a token of acceleration
+        self.assertIsNone(self.index.match("ratio").aspect)
+        self.assertIsNone(self.index.match("voltage").aspect)
+
+    def test_summary(self):
+        self.assertEqual(self.index.match("resistance").aspect.id, "AS24")
+        self.assertIn("resistance", self.index.ambiguous)
+        self.index.match("voltage")
+        self.assertIn("voltage", self.index.unmatched)
+        self.assertIn("1 ambiguous, 1 unmatched", self.index.summary())
+
+    def test_associate(self):
+        mapper = AspectMatching()
+        mapper._aspect_index = self.index
+        parameter = model.Parameter(name="Current", quantitykind="Electric Current")
+        mapper._associateAspect(parameter)
+        self.assertEqual(parameter.aspect.id, "AS5")
+        # Ratio quantity ignored unless named exactly
+        parameter = model.Parameter(name="Ratio", quantitykind="ratio")
+        mapper._associateAspect(parameter)
+        self.assertIsNone(parameter.aspect)
+
+
+if __name__ == '__main__':
+    unittest.main()
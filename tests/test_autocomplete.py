@@ -0,0 +1,35 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from tests.catalog import CatalogTestCase
+
+
+class AutocompleteTestCase(CatalogTestCase):
+
+    def test_api_autocomplete(self):
+        response = self.app.get('/api/autocomplete?q=Electric-Cur&entity=aspect')
+        self.assertEqual(response.status_code, 200)
+        labels = [r['label'] for r in response.json['results']]
+        self.assertEqual(labels, ['electric-current'])
+        response = self.app.get('/api/autocomplete?q=cur&entity=aspect&limit=50')
+        labels = [r['label'] for r in response.json['results']]
+        # Names starting with the prefix before words inside names
+        self.assertEqual(labels, ['current-density', 'electric-current'])
+        response = self.app.get('/api/autocomplete?q=kV&entity=scale')
+        self.assertEqual([r['label'] for r in response.json['results']], ['ra_si_kV'])
+        response = self.app.get('/api/autocomplete?q=cur&entity=unknown')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from miiflask.flask.model import KcdbCmc
+from miiflask.flask.views import cmc_facets, cmc_suggestions
+from tests.catalog import CatalogTestCase
+
+
+class CmcSuggestionsTestCase(CatalogTestCase):
+
+    def test_cmc_suggestions(self):
+        suggestions = cmc_suggestions()
+        self.assertIs(suggestions, cmc_suggestions())
+        # The quantity and instrument of a CMC name its measurand
+        self.assertEqual(suggestions.for_cmc(1)[0][0], 'MeasureCurrentDC')
+        self.assertEqual(suggestions.for_cmc(7)[0][0], 'MeasureTemperature')
+        scores = [score for _, score in suggestions.for_cmc(3)]
+        self.assertLessEqual(len(scores), suggestions.k)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        response = self.app.post('/admin/kcdbcmc/', data={'rowid': ['1']})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Suggested measurands', response.data)
+
+
+class CmcFacetsTestCase(CatalogTestCase):
+
+    def test_cmc_facets(self):
+        facets = cmc_facets()
+        self.assertEqual([(id_, count) for id_, _, count in facets.options('area')],
+                         [(2, 6), (6, 1)])
+        for id_, _, count in facets.options('branch', {'area': 2}):
+            self.assertEqual(count, facets.count({'area': 2, 'branch': id_}))
+            self.assertEqual(count, KcdbCmc.query.filter_by(area_id=2, branch_id=id_).count())
+        response = self.app.get('/admin/kcdbcmc/?flt0_0=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'(6)', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
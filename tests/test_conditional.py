@@ -0,0 +1,167 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from miiflask.flask import exports, views
+from miiflask.flask.app import create_app
+from miiflask.flask.model import Domain
+from miiflask.utils.graph_cache import PoolBusy
+from tests.catalog import CatalogTestCase, catalog_config
+
+
+class ConditionalTestCase(CatalogTestCase):
+
+    def test_conditional_get(self):
+        for url in ['/api/measurands/', '/taxonomy/export', '/kcdbcmcs/export/json']:
+            response = self.app.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers.get('ETag')
+            self.assertIsNotNone(etag)
+            response = self.app.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.data, b'')
+            response = self.app.get(url, headers={'If-None-Match': '"stale"'})
+            self.assertEqual(response.status_code, 200)
+            last_modified = response.headers.get('Last-Modified')
+            response = self.app.get(url, headers={'If-Modified-Since': last_modified})
+            self.assertEqual(response.status_code, 304)
+
+    def test_conditional_encoding(self):
+        url = '/api/units/'
+        for encoding in ['br', 'gzip', 'identity']:
+            response = self.app.get(url, headers={'Accept-Encoding': encoding})
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers['ETag']
+            last_modified = response.headers['Last-Modified']
+            # 304 carries the ETag of the representation the client has
+            response = self.app.get(url, headers={'Accept-Encoding': encoding,
+                                                  'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers['ETag'], etag)
+            response = self.app.get(url, headers={'Accept-Encoding': encoding,
+                                                  'If-Modified-Since': last_modified})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers['ETag'], etag)
+
+    def test_not_modified_before_view(self):
+        url = '/api/units/'
+        response = self.app.get(url, headers={'Accept-Encoding': 'br'})
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+        # Serialized uncompressed, the ETag names the representation for br clients
+        self.assertIsNone(response.content_encoding)
+        self.assertTrue(etag.endswith('-br"'))
+        serialize = exports.api_collection_json
+
+        def fail(*args):
+            raise AssertionError("view called")
+        exports.api_collection_json = fail
+        try:
+            for headers in ({'If-None-Match': etag}, {'If-Modified-Since': last_modified}):
+                response = self.app.get(url, headers={'Accept-Encoding': 'br', **headers})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers['ETag'], etag)
+        finally:
+            exports.api_collection_json = serialize
+
+    def test_conditional_error(self):
+
+        class Busy:
+            def submit(self, *args):
+                raise PoolBusy()
+
+            def result(self, *args, **kwargs):
+                raise PoolBusy()
+
+        state = views.view_state()
+        pool = state.instance_graphs
+        state.instance_graphs = Busy()
+        try:
+            response = self.app.get('/graph/scale/SC17.png')
+            self.assertEqual(response.status_code, 503)
+            self.assertIsNone(response.headers.get('ETag'))
+            self.assertIsNone(response.headers.get('Last-Modified'))
+        finally:
+            state.instance_graphs = pool
+
+    def test_unversioned_commit(self):
+        # Admin edits of a database built before the dataversion table
+        engine = create_engine("sqlite://")
+        Domain.__table__.create(engine)
+        with Session(engine) as session:
+            session.add(Domain(id=1, label="EM"))
+            session.commit()
+            self.assertEqual(session.get(Domain, 1).label, "EM")
+        engine.dispose()
+
+
+class ReplacedDatabaseTestCase(unittest.TestCase):
+    """
+    Files prebuilt from a database replaced by one at the same generation
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+        class Config(catalog_config(self.tmp.name)):
+            GRAPH_WAIT = 30.0
+
+        self.config = Config
+        with sqlite3.connect(os.path.join(self.tmp.name, "miiflask.db")) as connection:
+            connection.execute("UPDATE dataversion SET updated = '2030-01-01 00:00:00.000000'")
+        connection.close()
+        self.client = create_app(self.config).test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, root, updated, name, data):
+        directory = os.path.join(root, "1")
+        os.makedirs(os.path.dirname(os.path.join(directory, name)), exist_ok=True)
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump({"generation": 1, "updated": updated}, f)
+
+    def test_artifacts(self):
+        root = self.config.ARTIFACTS_PATH
+        self.write(root, "2026-01-01T00:00:00", "api/units.json", b'"stale"')
+        response = self.client.get('/api/units/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json, list)
+        # Built from this database
+        self.write(root, "2030-01-01T00:00:00", "api/units.json", b'"prebuilt"')
+        self.assertEqual(self.client.get('/api/units/').json, "prebuilt")
+
+    def test_graphs(self):
+        root = self.config.GRAPHS_PATH
+        self.write(root, "2026-01-01T00:00:00", "scale/SC17.png", b'stale')
+        render = views.render_graph_data
+        views.render_graph_data = lambda data, format: b'rendered'
+        try:
+            self.assertEqual(self.client.get('/graph/scale/SC17.png').data, b'rendered')
+            # Rendered from this database
+            self.write(root, "2030-01-01T00:00:00", "scale/SC11.png", b'prerendered')
+            self.assertEqual(self.client.get('/graph/scale/SC11.png').data, b'prerendered')
+        finally:
+            views.render_graph_data = render
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from miiflask.flask.app import create_app
+from tests.catalog import CatalogTestCase, catalog_config
+
+
+class ExportsTestCase(CatalogTestCase):
+
+    def test_api_batch(self):
+        aspects = self.app.get('/api/aspects/').json[:3]
+        ids = [a['id'] for a in aspects]
+        response = self.app.post('/api/batch', json={'aspects': ids + ['unknown']})
+        self.assertEqual(response.status_code, 200)
+        for a in aspects:
+            self.assertEqual(response.json['aspects'][a['id']], a)
+        self.assertEqual(response.json['missing']['aspects'], ['unknown'])
+        response = self.app.post('/api/batch', json={'unknown': ids})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cmcs_json(self):
+        response = self.app.get('/kcdbcmcs/export/json')
+        cmcs = json.loads(response.data)
+        self.assertEqual([c['kcdbCode'] for c in cmcs][:2], ['EM-CA-1', 'EM-CA-2'])
+        self.assertEqual(cmcs[0]['measurands'], [{'name': 'Measure.Current.DC'}])
+
+
+class OlderDatabaseTestCase(unittest.TestCase):
+    """
+    Database built before KcdbParameter.scale_id
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        config = catalog_config(self.tmp.name)
+        with sqlite3.connect(os.path.join(self.tmp.name, "miiflask.db")) as connection:
+            connection.executescript("""
+                CREATE TABLE older (id INTEGER NOT NULL PRIMARY KEY, name TEXT, value TEXT,
+                                    kcdbcmc_id INTEGER REFERENCES kcdbcmc (id));
+                INSERT INTO older SELECT id, name, value, kcdbcmc_id FROM kcdbparameter;
+                DROP TABLE kcdbparameter;
+                ALTER TABLE older RENAME TO kcdbparameter;
+                """)
+        connection.close()
+        self.client = create_app(config).test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_kcdbparameter_scale(self):
+        response = self.client.get('/kcdbcmcs/export/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import gzip
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError
+
+from miiflask.flask import views
+from miiflask.flask.config import ProductionConfig
+from miiflask.flask.model import Aspect, Scale, Unit
+from miiflask.utils.graph_cache import DiagramCache, PoolBusy, RenderPool
+from miiflask.utils.model_visualizer import data_model_key
+from tests.catalog import CatalogTestCase
+
+
+class DiagramCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rendered = []
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, models, excludes, show_attributes, add_labels, format):
+        self.rendered.append((tuple(m.__name__ for m in models), tuple(excludes)))
+        return repr(self.rendered[-1]).encode()
+
+    def test_key(self):
+        key = data_model_key([Scale, Aspect], ['Cast'])
+        self.assertEqual(key, data_model_key([Scale, Aspect], ['Cast']))
+        self.assertNotEqual(key, data_model_key([Scale, Aspect], ['Conversion']))
+        self.assertNotEqual(key, data_model_key([Scale, Aspect, Unit], ['Cast']))
+        self.assertNotEqual(key, data_model_key([Scale, Aspect], ['Cast'], show_attributes=False))
+        self.assertNotEqual(key, data_model_key([Scale, Aspect], ['Cast'], format='svg'))
+
+    def test_memory_and_disk(self):
+        cache = DiagramCache(self.tmp.name, render=self.render)
+        data = cache.get([Scale, Aspect], ['Cast'])
+        self.assertEqual(cache.get([Scale, Aspect], ['Cast']), data)
+        self.assertEqual(len(self.rendered), 1)
+        cache.get([Scale, Aspect], ['Conversion'])
+        self.assertEqual(len(self.rendered), 2)
+
+        # A new worker reads the rendered files
+        other = DiagramCache(self.tmp.name, render=self.render)
+        self.assertEqual(other.get([Scale, Aspect], ['Cast']), data)
+        self.assertEqual(len(self.rendered), 2)
+
+    def test_memory_only(self):
+        cache = DiagramCache(render=self.render)
+        cache.get([Scale], [])
+        cache.get([Scale], [])
+        self.assertEqual(len(self.rendered), 1)
+
+
+class RenderPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def render(self, name):
+        self.calls.append(name)
+        self.release.wait(5)
+        if name == 'fail':
+            raise ValueError(name)
+        return name.encode()
+
+    def test_coalesce_and_cache(self):
+        pool = RenderPool(self.render, workers=2)
+        first = pool.submit(('scale', 1), 'a')
+        second = pool.submit(('scale', 1), 'a')
+        self.assertIs(first, second)
+        with self.assertRaises(TimeoutError):
+            pool.result(('scale', 1), 'a', timeout=0.01)
+        self.release.set()
+        self.assertEqual(pool.result(('scale', 1), 'a', timeout=5), b'a')
+        self.assertEqual(pool.result(('scale', 1), 'a', timeout=5), b'a')
+        self.assertEqual(self.calls, ['a'])
+        # A new data version renders again
+        self.assertEqual(pool.result(('scale', 2), 'a', timeout=5), b'a')
+        self.assertEqual(self.calls, ['a', 'a'])
+
+    def test_bounded(self):
+        pool = RenderPool(self.render, workers=1, pending=2, size=1)
+        pool.submit('a', 'a')
+        pool.submit('b', 'b')
+        with self.assertRaises(PoolBusy):
+            pool.submit('c', 'c')
+        self.release.set()
+        pool.result('a', 'a', timeout=5)
+        pool.result('b', 'b', timeout=5)
+        pool.result('c', 'c', timeout=5)
+        # Only the last result is kept
+        pool.result('a', 'a', timeout=5)
+        self.assertEqual(self.calls, ['a', 'b', 'c', 'a'])
+
+    def test_failure_not_cached(self):
+        self.release.set()
+        pool = RenderPool(self.render)
+        with self.assertRaises(ValueError):
+            pool.result('fail', 'fail', timeout=5)
+        with self.assertRaises(ValueError):
+            pool.result('fail', 'fail', timeout=5)
+        self.assertEqual(self.calls, ['fail', 'fail'])
+
+
+class WaitingConfig(ProductionConfig):
+    # Requests wait for the render instead of retrying
+    GRAPH_WAIT = 30.0
+
+
+class GraphViewsTestCase(CatalogTestCase):
+    config = WaitingConfig
+
+    def test_instance_graph(self):
+        render, calls = views.render_graph_data, []
+
+        def fake(data, format):
+            calls.append((data['name'], format))
+            return gzip.compress(b'<svg/>') if format == 'svgz' else b'png'
+        views.render_graph_data = fake
+        try:
+            response = self.app.get('/scale/SC17/')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'/graph/scale/SC17.svg', response.data)
+            response = self.app.get('/graph/scale/SC17.svg', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'image/svg+xml')
+            self.assertEqual(response.content_encoding, 'gzip')
+            self.assertEqual(gzip.decompress(response.data), b'<svg/>')
+            etag = response.headers['ETag']
+            response = self.app.get('/graph/scale/SC17.svg', headers={'Accept-Encoding': 'gzip',
+                                                                      'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            response = self.app.get('/graph/scale/SC17.svg?retry=1')
+            self.assertIsNone(response.content_encoding)
+            self.assertEqual(response.data, b'<svg/>')
+            response = self.app.get('/graph/scale/SC17.png')
+            self.assertEqual(response.mimetype, 'image/png')
+            self.assertEqual(response.data, b'png')
+            self.assertEqual(calls, [('ratio scale volt', 'svgz'), ('ratio scale volt', 'png')])
+            self.assertEqual(self.app.get('/graph/scale/unknown.svg').status_code, 404)
+            self.assertEqual(self.app.get('/graph/unit/SC17.svg').status_code, 404)
+            self.assertEqual(self.app.get('/graph/scale/SC17.gif').status_code, 404)
+        finally:
+            views.render_graph_data = render
+
+    def test_diagram(self):
+        state = views.view_state()
+        cache = state.diagram_cache
+        state.diagram_cache = DiagramCache(render=lambda *args: gzip.compress(b'<svg/>'))
+        try:
+            response = self.app.get('/model/mlayer/scale')
+            self.assertIn(b'/model/mlayer_scale.svg', response.data)
+            response = self.app.get('/model/mlayer_scale.svg', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content_encoding, 'gzip')
+            etag = response.headers['ETag']
+            response = self.app.get('/model/mlayer_scale.svg',
+                                    headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers['ETag'], etag)
+            # The gzip representation does not validate the identity one
+            response = self.app.get('/model/mlayer_scale.svg', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.app.get('/model/unknown.svg').status_code, 404)
+        finally:
+            state.diagram_cache = cache
+
+
+class GraphMissTestCase(CatalogTestCase):
+
+    def test_not_rendered(self):
+        release = threading.Event()
+
+        def render(data, format):
+            release.wait(5)
+            return b'png'
+        original = views.render_graph_data
+        views.render_graph_data = render
+        try:
+            # Answered at once while rendering, the page retries
+            response = self.app.get('/graph/scale/SC17.png')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '1')
+            self.assertIsNone(response.headers.get('ETag'))
+            release.set()
+            for _ in range(50):
+                response = self.app.get('/graph/scale/SC17.png')
+                if response.status_code != 503:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, b'png')
+        finally:
+            release.set()
+            views.render_graph_data = original
+
+
+if __name__ == '__main__':
+    unittest.main()
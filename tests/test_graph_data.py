@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from miiflask.flask import model
+from miiflask.flask.db import Base
+from miiflask.utils.graph_data import load_graph_data
+from miiflask.utils.model_visualizer import graph_data_digraph, instance_graph_data
+
+
+class GraphDataTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            session.add(model.Aspect(id='AS1', name='length', ml_name='length'))
+            session.add(model.Transform(id='TR1', ml_name='identity'))
+            for i in range(20):
+                session.add(model.Unit(id=f'U{i}', name=f'unit{i}', ml_name=f'unit{i}'))
+                session.add(model.Scale(id=f'SC{i}', ml_name=f'scale{i}', scale_type='ratio',
+                                        unit_id=f'U{i}'))
+                session.add(model.Conversion(src_scale_id='SC0', dst_scale_id=f'SC{i}',
+                                             aspect_id='AS1', transform_id='TR1',
+                                             parameters=''))
+            session.execute(model.scaleaspect_table.insert(),
+                            [{'scale_id': f'SC{i}', 'aspect_id': 'AS1'} for i in range(20)])
+            session.commit()
+        self.statements = 0
+        event.listen(self.engine, "before_cursor_execute", self.count)
+
+    def count(self, *args):
+        self.statements += 1
+
+    def test_same_as_lazy(self):
+        for model_, id_ in ((model.Scale, 'SC0'), (model.Aspect, 'AS1')):
+            with Session(self.engine) as session:
+                lazy = instance_graph_data(model_, session.get(model_, id_))
+            with Session(self.engine) as session:
+                self.assertEqual(load_graph_data(session, model_, id_), lazy)
+
+    def test_statements(self):
+        with Session(self.engine) as session:
+            self.statements = 0
+            instance_graph_data(model.Scale, session.get(model.Scale, 'SC0'))
+            lazy = self.statements
+        with Session(self.engine) as session:
+            self.statements = 0
+            data = load_graph_data(session, model.Scale, 'SC0')
+            eager = self.statements
+        self.assertGreater(lazy, 20)
+        self.assertLessEqual(eager, 4)
+        conversions = next(r for r in data['relations'] if r['key'] == 'conversions')
+        self.assertEqual(conversions['count'], 20)
+        self.assertIn('to ratio scale unit19', conversions['descriptions'])
+
+    def test_missing(self):
+        with Session(self.engine) as session:
+            self.assertIsNone(load_graph_data(session, model.Scale, 'unknown'))
+
+    def test_digraph(self):
+        with Session(self.engine) as session:
+            data = load_graph_data(session, model.Aspect, 'AS1')
+        source = graph_data_digraph(data).source
+        self.assertIn('has scales', source)
+        self.assertIn('ratio scale unit3', source)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import json
+import multiprocessing
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from miiflask.flask import model
+from miiflask.flask.db import Base
+from miiflask.utils import graph_store
+from miiflask.utils.artifacts import MANIFEST
+from miiflask.utils.graph_store import GraphStoreBuilder, graph_path
+
+
+def fake_render(data, format):
+    return data['name'].encode()
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork',
+                     'workers inherit the patched renderer')
+class GraphStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{self.tmp.name}/test.db")
+        Base.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        self.session.add_all([model.Aspect(id=id_, name=id_.lower(), ml_name=id_.lower())
+                              for id_ in ('AS1', 'AS2')])
+        self.session.add(model.MeasurandTaxon(id='M1', name='Measure.One', deprecated=False,
+                                              result='one', aspect_id='AS1'))
+        self.session.commit()
+        self.render = graph_store.render_graph_data
+        graph_store.render_graph_data = fake_render
+        self.parms = {"graphs": f"{self.tmp.name}/graphs", "graph_workers": 2}
+
+    def tearDown(self):
+        graph_store.render_graph_data = self.render
+        self.session.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_build(self):
+        target = GraphStoreBuilder(self.session, self.parms).build()
+        data_version = self.session.get(model.DataVersion, 1)
+        version = (data_version.generation, data_version.updated)
+        self.assertEqual(target.name, str(version[0]))
+        root = self.parms["graphs"]
+        path = graph_path(root, version, 'aspect', 'AS2')
+        self.assertEqual(path.read_bytes(), b'as2')
+        self.assertEqual(graph_path(root, version, 'measurand', 'M1').read_bytes(),
+                         b'Measure.One')
+        self.assertIsNone(graph_path(root, version, 'aspect', 'AS3'))
+        # A replaced database at the same generation
+        replaced = (version[0], version[1] + timedelta(seconds=1))
+        self.assertIsNone(graph_path(root, replaced, 'aspect', 'AS2'))
+        manifest = json.loads((target / MANIFEST).read_text())
+        self.assertEqual(len(manifest['graphs']), 3)
+        self.assertFalse(any(p.name.startswith('.staging') for p in Path(root).iterdir()))
+
+        # Up to date, not rendered again
+        path.write_bytes(b'kept')
+        self.assertEqual(GraphStoreBuilder(self.session, self.parms).build(), target)
+        self.assertEqual(path.read_bytes(), b'kept')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event, select, text
+
+from miiflask.flask.app import create_app
+from miiflask.flask.config import InMemoryConfig
+from miiflask.flask.db import MemorySnapshot
+from miiflask.flask.extensions import db
+from miiflask.flask import model, views
+from tests.catalog import catalog_config
+
+
+def publish(path, value):
+    # Replace the file as a new database is published, not in place
+    tmp = path + ".new"
+    with sqlite3.connect(tmp) as connection:
+        connection.execute("CREATE TABLE t (x)")
+        connection.execute("INSERT INTO t VALUES (?)", (value,))
+    connection.close()
+    os.replace(tmp, path)
+
+
+class MemorySnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        publish(self.path, 1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_connect(self):
+        snapshot = MemorySnapshot(self.path)
+        memory = snapshot.connect()
+        self.assertEqual(memory.execute("PRAGMA database_list").fetchone()[2], "")
+        self.assertEqual(memory.execute("SELECT x FROM t").fetchone()[0], 1)
+        # The copy is private, the file is not changed
+        memory.execute("UPDATE t SET x = 2")
+        with sqlite3.connect(self.path) as connection:
+            self.assertEqual(connection.execute("SELECT x FROM t").fetchone()[0], 1)
+        connection.close()
+        memory.close()
+
+    def test_changed(self):
+        snapshot = MemorySnapshot(self.path, interval=0)
+        snapshot.connect().close()
+        self.assertFalse(snapshot.changed())
+        publish(self.path, 2)
+        self.assertTrue(snapshot.changed())
+        # Copies of the file read before
+        self.assertEqual(snapshot.connect().execute("SELECT x FROM t").fetchone()[0], 1)
+        snapshot.reload()
+        self.assertEqual(snapshot.connect().execute("SELECT x FROM t").fetchone()[0], 2)
+        self.assertFalse(snapshot.changed())
+        os.remove(self.path)
+        self.assertFalse(snapshot.changed())
+
+    def test_interval(self):
+        snapshot = MemorySnapshot(self.path, interval=3600)
+        snapshot.connect().close()
+        publish(self.path, 2)
+        self.assertFalse(snapshot.changed())
+
+
+class InMemoryAppTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "miiflask.db")
+
+        class Config(catalog_config(self.tmp.name, InMemoryConfig)):
+            HYDRATE_INTERVAL = 0
+            GRAPH_WORKERS = 4
+            GRAPH_WAIT = 30.0
+
+        self.flask_app = create_app(Config)
+        self.client = self.flask_app.test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generation(self):
+        with self.flask_app.app_context():
+            generation = db.session.execute(text("SELECT generation FROM dataversion")).scalar()
+            db.session.remove()
+        return generation
+
+    def publish(self):
+        # A newer database published by replacing the file
+        tmp = self.path + ".new"
+        with sqlite3.connect(self.path) as src, sqlite3.connect(tmp) as dst:
+            src.backup(dst)
+            dst.execute("UPDATE dataversion SET generation = generation + 1")
+        src.close()
+        dst.close()
+        os.replace(tmp, self.path)
+
+    def test_rehydrate(self):
+        response = self.client.get('/api/units/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/initialize').status_code, 403)
+        generation = self.generation()
+        etag = response.headers.get('ETag')
+        self.publish()
+        self.assertEqual(self.generation(), generation)
+        response = self.client.get('/api/units/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.generation(), generation + 1)
+
+    def test_concurrent_renders(self):
+        # Render threads query the database while requests are served
+        with self.flask_app.app_context():
+            ids = db.session.scalars(select(model.Aspect.id).order_by(model.Aspect.id)).all()
+            db.session.remove()
+            engine = db.engine
+        # A copy is never used by two threads at once
+        lock = threading.Lock()
+        used, shared = set(), []
+
+        def checkout(dbapi_connection, record, proxy):
+            with lock:
+                if id(dbapi_connection) in used:
+                    shared.append(dbapi_connection)
+                used.add(id(dbapi_connection))
+
+        def checkin(dbapi_connection, record):
+            with lock:
+                used.discard(id(dbapi_connection))
+
+        event.listen(engine, "checkout", checkout)
+        event.listen(engine, "checkin", checkin)
+        render = views.render_graph_data
+        views.render_graph_data = lambda data, format: data['name'].encode()
+
+        def get(url):
+            return self.flask_app.test_client().get(url).status_code
+
+        urls = [url for id_ in ids for url in (f'/graph/aspect/{id_}.png', f'/api/aspect/{id_}/')]
+        try:
+            with ThreadPoolExecutor(8) as executor:
+                statuses = list(executor.map(get, urls))
+        finally:
+            views.render_graph_data = render
+        self.assertEqual(statuses, [200] * len(urls))
+        self.assertEqual(shared, [])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs fork')
+    def test_fork(self):
+        self.assertEqual(self.client.get('/api/units/').status_code, 200)
+        generation = self.generation()
+        self.publish()
+        pid = os.fork()
+        if pid == 0:
+            # Worker of gunicorn --preload, its own copy of the file
+            ok = self.generation() == generation + 1
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(self.generation(), generation)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import math
+import unittest
+
+import numpy as np
+
+from miiflask.utils.interval_index import IntervalIndex
+from tests.catalog import CatalogTestCase
+
+
+class IntervalIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        lowers = rng.uniform(0, 1000, 2000)
+        uppers = lowers + rng.exponential(50, 2000)
+        self.rows = [('SC17', float(lo), float(up), i % 500)
+                     for i, (lo, up) in enumerate(zip(lowers, uppers))]
+        self.rows += [('SC11', 40.0, 70.0, 1), ('SC11', 50.0, 50.0, 2),
+                      ('SC11', -math.inf, 100.0, 3), ('SC11', 60.0, math.inf, 4),
+                      (None, -math.inf, math.inf, 5)]
+        self.index = IntervalIndex(self.rows)
+
+    def brute_force(self, scale_id, lower, upper):
+        return sorted({cmc for s, lo, up, cmc in self.rows
+                       if s == scale_id and lo <= lower and up >= upper})
+
+    def test_points(self):
+        for value in (0.0, 1.5, 250.0, 500.0, 999.0, 2000.0):
+            self.assertEqual(self.index.covering_range('SC17', value).tolist(),
+                             self.brute_force('SC17', value, value))
+
+    def test_ranges(self):
+        for lower, upper in ((100.0, 120.0), (500.0, 600.0), (0.0, 1000.0)):
+            self.assertEqual(self.index.covering_range('SC17', lower, upper).tolist(),
+                             self.brute_force('SC17', lower, upper))
+
+    def test_open_ends(self):
+        self.assertEqual(self.index.covering_range('SC11', 50.0).tolist(), [1, 2, 3])
+        self.assertEqual(self.index.covering_range('SC11', 1e9).tolist(), [4])
+        self.assertEqual(self.index.covering_range('SC11', -math.inf, 10.0).tolist(), [3])
+
+    def test_conditions(self):
+        expected = sorted(set(self.brute_force('SC17', 500.0, 500.0)) & {1, 2, 3})
+        self.assertEqual(self.index.covering([('SC17', 500.0), ('SC11', 50.0)]).tolist(),
+                         expected)
+        self.assertEqual(self.index.covering([('SC17', 500.0), ('SC1', 1.0)]).tolist(), [])
+        self.assertEqual(self.index.covering([]).tolist(), [])
+
+
+class CapabilityViewTestCase(CatalogTestCase):
+
+    def test_api_cmcs_capability(self):
+        response = self.app.get('/api/cmcs/capability?value=230 V&value=50 Hz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['lower'] for c in response.json['conditions']], [230.0, 50.0])
+        self.assertEqual([c['kcdbCode'] for c in response.json['cmcs']], ['EM-CA-3', 'EM-CA-4'])
+        response = self.app.get('/api/cmcs/capability?value=1 kV to 10 kV&limit=1')
+        self.assertEqual(response.json['count'], 1)
+        response = self.app.get('/api/cmcs/capability?value=to 20 A')
+        self.assertIsNone(response.json['conditions'][0]['lower'])
+        self.assertEqual(response.json['count'], 0)
+        response = self.app.get('/api/cmcs/capability?value=unknown')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from tests.catalog import CatalogTestCase
+
+
+class NetworkTilesTestCase(CatalogTestCase):
+
+    def test_api_network(self):
+        response = self.app.get('/api/network/')
+        self.assertEqual(response.status_code, 200)
+        overview = response.json
+        self.assertEqual(overview['nodes'], 10)
+        self.assertEqual(sum(c['count'] for c in overview['clusters']), overview['nodes'])
+        detail = overview['detail_zoom']
+        self.assertIn('clusters', self.app.get('/api/network/0/0/0.json').json)
+        n = 2 ** detail
+        nodes, edges = set(), set()
+        for x in range(n):
+            for y in range(n):
+                tile = self.app.get(f'/api/network/{detail}/{x}/{y}.json').json
+                for node in tile['nodes']:
+                    self.assertTrue(tile['bounds'][0] <= node['x'] <= tile['bounds'][2])
+                nodes.update(node['id'] for node in tile['nodes'])
+                edges.update(map(tuple, tile['edges']))
+        self.assertEqual(len(nodes), overview['nodes'])
+        self.assertEqual(len(edges), overview['edges'])
+        self.assertEqual(self.app.get('/api/network/0/1/0.json').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import math
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from miiflask.flask.db import Base
+from miiflask.utils.parameter_parser import UnitResolver, parse_value
+from tests.catalog import add_mlayer
+
+
+class ParameterParserTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            add_mlayer(session)
+            session.flush()
+            cls.resolver = UnitResolver(session)
+        engine.dispose()
+
+    def assertParsed(self, text, scale_id, intervals):
+        parsed = parse_value(text, self.resolver)
+        self.assertIsNotNone(parsed, text)
+        self.assertEqual(parsed.scale_id, scale_id)
+        self.assertEqual(parsed.intervals, intervals)
+
+    def test_intervals(self):
+        self.assertParsed("0.1 kV to 500 kV", 'SC17', [(100.0, 500000.0)])
+        self.assertParsed("10 to 20 kV", 'SC17', [(10000.0, 20000.0)])
+        self.assertParsed("400 nm to 700 nm at 10 nm intervals", 'SC2', [(4e-07, 7e-07)])
+        self.assertParsed("1 V to 10 V (peak to peak)", 'SC17', [(1.0, 10.0)])
+        self.assertParsed("(23 ± 1) °C", 'SC69', [(22.0, 24.0)])
+
+    def test_open_intervals(self):
+        self.assertParsed("to 20 kA", 'SC4', [(-math.inf, 20000.0)])
+        self.assertParsed("&lt;= 5 V", 'SC17', [(-math.inf, 5.0)])
+        self.assertParsed("&gt; 1 µA", 'SC4', [(1e-06, math.inf)])
+        self.assertParsed("any", None, [(-math.inf, math.inf)])
+
+    def test_points(self):
+        self.assertParsed("50 Hz, 60 Hz", 'SC11', [(50.0, 50.0), (60.0, 60.0)])
+        self.assertParsed("25 ºC and 23 °C", 'SC69', [(25.0, 25.0), (23.0, 23.0)])
+
+    def test_resolve(self):
+        resolve = self.resolver.resolve
+        self.assertEqual(resolve('kV'), ('SC17', 1000.0))
+        self.assertEqual(resolve('nm'), ('SC2', 1e-09))
+        # Temperatures on the interval scales, not the ratio scales of differences
+        self.assertEqual(resolve('°C'), ('SC69', 1.0))
+        self.assertEqual(resolve('°F'), ('SC70', 1.0))
+        self.assertEqual(resolve('K'), ('SC5', 1.0))
+        # Only ratio scales take a prefix
+        self.assertIsNone(resolve('m°C'))
+        self.assertIsNone(resolve('kkV'))
+        self.assertIsNone(resolve('%'))
+
+    def test_not_understood(self):
+        for text in ["ISO 7668", "steel", "8:d or 8:t", "10% to 40%", "1 V to 2 Hz", None]:
+            self.assertIsNone(parse_value(text, self.resolver), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
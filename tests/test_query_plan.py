@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from sqlalchemy import create_engine
+
+from miiflask.flask.db import Base
+from miiflask.utils.query_plan import audit, full_scans
+
+
+class QueryPlanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+
+    def test_full_scans(self):
+        self.assertEqual(full_scans(['SCAN kcdbcmc']), ['kcdbcmc'])
+        self.assertEqual(full_scans(['SCAN kcdbcmc USING INDEX ix_kcdbcmc_kcdbCode',
+                                     'SCAN kcdbcmc USING COVERING INDEX ix_kcdbcmc_area_id',
+                                     'SEARCH kcdbarea USING INTEGER PRIMARY KEY (rowid=?)']),
+                         [])
+
+    def test_hot_queries_use_indexes(self):
+        with self.engine.connect() as connection:
+            for name, (plan, scans) in audit(connection).items():
+                self.assertEqual(scans, [], f"{name}: {plan}")
+
+
+if __name__ == '__main__':
+    unittest.main()
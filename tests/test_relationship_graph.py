@@ -0,0 +1,38 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from tests.catalog import CatalogTestCase
+
+
+class RelationshipGraphTestCase(CatalogTestCase):
+
+    def test_api_graph(self):
+        response = self.app.get('/api/graph/aspect/AS22?depth=3')
+        self.assertEqual(response.status_code, 200)
+        graph = response.json
+        nodes = {n['key']: n for n in graph['nodes']}
+        self.assertEqual(nodes['aspect:AS22']['depth'], 0)
+        self.assertLessEqual(max(n['depth'] for n in graph['nodes']), 3)
+        self.assertEqual({'aspect', 'measurand', 'parameter', 'scale', 'conversion', 'kcdbcmc'},
+                         {n['entity'] for n in graph['nodes']})
+        for edge in graph['edges']:
+            self.assertIn(edge['source'], nodes)
+            self.assertIn(edge['target'], nodes)
+        response = self.app.get('/api/graph/aspect/AS22?depth=0')
+        self.assertEqual([n['key'] for n in response.json['nodes']], ['aspect:AS22'])
+        response = self.app.get('/api/graph/aspect/unknown')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
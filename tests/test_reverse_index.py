@@ -0,0 +1,108 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from miiflask.flask import model
+from miiflask.flask.db import Base
+from miiflask.flask.reverse_index import aspect_dependents, rebuild_reverse_index
+from tests.catalog import CatalogTestCase
+
+
+class ReverseIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        for id_ in ('AS1', 'AS2', 'AS3'):
+            self.session.add(model.Aspect(id=id_, name=id_.lower(), ml_name=id_.lower()))
+        self.session.add_all([
+            model.MeasurandTaxon(id='M1', name='Measure.One', deprecated=False,
+                                 result='one', aspect_id='AS1', result_aspect_id='AS2'),
+            model.MeasurandTaxon(id='M2', name='Measure.Two', deprecated=False,
+                                 result='two', aspect_id='AS2'),
+            model.Parameter(id=1, name='p1', optional=False, measurandtaxon_id='M2',
+                            aspect_id='AS3'),
+            model.KcdbCmc(id=10, kcdbCode='C10', baseUnit='', uncertaintyBaseUnit='',
+                          comments=''),
+            model.KcdbCmc(id=11, kcdbCode='C11', baseUnit='', uncertaintyBaseUnit='',
+                          comments=''),
+        ])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def rows(self):
+        return (sorted(self.session.execute(select(model.aspect_dependent_table)).all()),
+                sorted(self.session.execute(select(model.aspect_kcdbcmc_table)).all()))
+
+    def assertRebuildEqual(self):
+        maintained = self.rows()
+        rebuild_reverse_index(self.session.connection())
+        self.assertEqual(maintained, self.rows())
+
+    def test_dependents(self):
+        dependents = aspect_dependents(self.session, 'AS2')
+        self.assertEqual([(m['id'], m['relation']) for m in dependents['measurands']],
+                         [('M1', 'result_aspect'), ('M2', 'aspect')])
+        self.assertEqual([p['id'] for p in aspect_dependents(self.session, 'AS3')['parameters']],
+                         [1])
+        self.assertRebuildEqual()
+
+    def test_admin_edits(self):
+        m1, m2 = self.session.get(model.MeasurandTaxon, 'M1'), self.session.get(model.MeasurandTaxon, 'M2')
+        cmc, other = self.session.get(model.KcdbCmc, 10), self.session.get(model.KcdbCmc, 11)
+        cmc.measurands.extend([m1, m2])
+        other.measurands.append(m2)
+        self.session.commit()
+        self.assertEqual([c['id'] for c in aspect_dependents(self.session, 'AS3')['kcdbcmcs']],
+                         [10, 11])
+        self.assertRebuildEqual()
+
+        m2.aspect_id = 'AS1'
+        self.session.get(model.Parameter, 1).aspect_id = 'AS1'
+        cmc.measurands.remove(m1)
+        self.session.commit()
+        self.assertEqual(aspect_dependents(self.session, 'AS3')['kcdbcmcs'], [])
+        self.assertEqual({(c['id'], c['relation'])
+                          for c in aspect_dependents(self.session, 'AS1')['kcdbcmcs']},
+                         {(10, 'aspect'), (10, 'parameter'), (11, 'aspect'), (11, 'parameter')})
+        self.assertRebuildEqual()
+
+        self.session.delete(self.session.get(model.Parameter, 1))
+        self.session.delete(m1)
+        self.session.commit()
+        self.assertEqual(aspect_dependents(self.session, 'AS2')['measurands'], [])
+        self.assertRebuildEqual()
+
+
+class AspectDependentsViewTestCase(CatalogTestCase):
+
+    def test_api_aspect_dependents(self):
+        response = self.app.get('/api/aspect/AS5/dependents')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['aspect'], 'AS5')
+        self.assertEqual([m['id'] for m in response.json['measurands']],
+                         ['MeasureCurrentDC', 'MeasureCurrentDC'])
+        self.assertEqual(sorted({c['id'] for c in response.json['kcdbcmcs']}), [1, 2])
+        response = self.app.get('/api/aspect/AS12/dependents')
+        self.assertEqual([p['id'] for p in response.json['parameters']], [1])
+        response = self.app.get('/api/aspect/unknown/dependents')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from miiflask.flask.app import create_app
+from tests.catalog import CatalogTestCase, catalog_config
+
+
+class SearchTestCase(CatalogTestCase):
+
+    def test_api_search(self):
+        response = self.app.get('/api/search?q=kelvin')
+        self.assertEqual(response.status_code, 200)
+        results = response.json['results']
+        self.assertEqual(results[0]['title'], 'kelvin')
+        self.assertEqual(results[0]['url'], '/api/unit/UN5/')
+        response = self.app.get('/api/search?q=current')
+        results = response.json['results']
+        self.assertEqual({r['entity'] for r in results}, {'measurand', 'aspect', 'kcdbcmc'})
+        scores = [r['score'] for r in results]
+        self.assertEqual(scores, sorted(scores))
+        response = self.app.get('/api/search?q=current&entity=aspect')
+        self.assertEqual(sorted(r['id'] for r in response.json['results']), ['AS44', 'AS5'])
+        response = self.app.get('/api/search?q=%22')
+        self.assertEqual(response.json['results'], [])
+
+
+class OlderDatabaseTestCase(unittest.TestCase):
+    """
+    Database built before the search index
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        config = catalog_config(self.tmp.name)
+        with sqlite3.connect(os.path.join(self.tmp.name, "miiflask.db")) as connection:
+            triggers = connection.execute("SELECT name FROM sqlite_master "
+                                          "WHERE type = 'trigger' AND name LIKE 'search_fts%'")
+            for (name,) in triggers.fetchall():
+                connection.execute(f"DROP TRIGGER {name}")
+            connection.execute("DROP TABLE search_fts")
+        connection.close()
+        self.client = create_app(config).test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search(self):
+        response = self.client.get('/api/search?q=kelvin')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['results'][0]['title'], 'kelvin')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from miiflask.flask.db import bind_engine
+from miiflask.flask import model
+from miiflask.mappers.mlayer_mapper import MlayerMapper
+from miiflask.mappers.taxonomy_mapper_v2 import TaxonomyMapper
+from miiflask.mappers.kcdb_mapper import KcdbMapper
+from miiflask.utils.schema_compiler import compile_schema
+
+
+class CompiledSchemaTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite://")
+        bind_engine(cls.engine)
+        parms = {
+                "mlayer": "resources/m-layer/accessed_on/2025-11-04",
+                "api_mlayer": "https://api.mlayer.org",
+                "measurands": "resources/measurand-taxonomy/commit/e23dc84/MeasurandTaxonomyCatalog.xml",
+                "kcdb": "resources/kcdb",
+                "kcdb_cmc_data": "kcdb_cmc_canada.json",
+                "kcdb_cmc_api_countries": ["CA"],
+                "use_api": False,
+                "use_cmc_api": False,
+                "update_resources": False,
+            }
+        with Session(cls.engine) as session:
+            mapper = MlayerMapper(session, parms)
+            mapper.getCollections()
+            mapper.getScaleAspectAssociations()
+            miimapper = TaxonomyMapper(session, parms)
+            miimapper.extractTaxonomy_v2()
+            miimapper.loadTaxonomy()
+            kcdbmapper = KcdbMapper(session, parms)
+            kcdbmapper.loadServices()
+            session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def assertCompiled(self, cases):
+        for model_, schema_ in cases:
+            schema = schema_(many=True)
+            fast = compile_schema(schema_(many=True))
+            with Session(self.engine) as session:
+                objs = session.query(model_).options(*fast.load_options(model_)).all()
+                self.assertEqual(schema.dump(objs), fast.dump(objs))
+                for kwargs in [dict(indent=2),
+                               dict(indent=4),
+                               dict(sort_keys=True, separators=(",", ":")),
+                               dict()]:
+                    self.assertEqual(schema.dumps(objs, **kwargs),
+                                     fast.dumps(objs, **kwargs))
+
+    def test_compiled_schemas(self):
+        self.assertCompiled([(model.Aspect, model.AspectSchema),
+                             (model.Scale, model.ScaleSchema),
+                             (model.Unit, model.UnitSchema),
+                             (model.Prefix, model.PrefixSchema),
+                             (model.Conversion, model.ConversionSchema)])
+
+    def test_compiled_nested_schemas(self):
+        # Nested only=/exclude= fields
+        with Session(self.engine) as session:
+            self.assertTrue(session.query(model.MeasurandTaxon).count())
+            self.assertTrue(session.query(model.KcdbCmc).count())
+        self.assertCompiled([(model.MeasurandTaxon, model.MeasurandTaxonSchema),
+                             (model.KcdbCmc, model.KcdbCmcSchema)])
+
+
+if __name__ == '__main__':
+    unittest.main()
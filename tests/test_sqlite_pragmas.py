@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2026 Ryan Mackenzie White <ryan.white@nrc-cnrc.gc.ca>
+#
+# Distributed under terms of the Copyright © 2022 National Research Council Canada. license.
+
+"""
+
+"""
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from miiflask.flask.config import SQLITE_PERFORMANCE, SQLITE_READ_ONLY, ProductionConfig
+from miiflask.flask.db import apply_sqlite_pragmas, publish_database
+
+
+class SqlitePragmasTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def pragma(self, engine, name):
+        with engine.connect() as connection:
+            return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_performance(self):
+        engine = create_engine("sqlite:///" + self.path)
+        apply_sqlite_pragmas(engine, SQLITE_PERFORMANCE)
+        self.assertEqual(self.pragma(engine, "journal_mode"), "wal")
+        # NORMAL
+        self.assertEqual(self.pragma(engine, "synchronous"), 1)
+        self.assertEqual(self.pragma(engine, "cache_size"), -65536)
+        # Admin deletes of referenced rows are not changed
+        self.assertEqual(self.pragma(engine, "foreign_keys"), 0)
+        # MEMORY
+        self.assertEqual(self.pragma(engine, "temp_store"), 2)
+        engine.dispose()
+
+    def test_defaults(self):
+        engine = create_engine("sqlite:///" + self.path)
+        apply_sqlite_pragmas(engine, None)
+        self.assertEqual(self.pragma(engine, "journal_mode"), "delete")
+        self.assertEqual(self.pragma(engine, "foreign_keys"), 0)
+        engine.dispose()
+
+    def test_production(self):
+        # The app keeps the journal mode of the published database
+        engine = create_engine("sqlite:///" + self.path)
+        apply_sqlite_pragmas(engine, ProductionConfig.SQLITE_PRAGMAS)
+        self.assertEqual(self.pragma(engine, "journal_mode"), "delete")
+        self.assertEqual(self.pragma(engine, "cache_size"), -65536)
+        self.assertEqual(self.pragma(engine, "foreign_keys"), 0)
+        engine.dispose()
+
+    def test_publish_read_only(self):
+        engine = create_engine("sqlite:///" + self.path)
+        apply_sqlite_pragmas(engine, SQLITE_PERFORMANCE)
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE t (x)"))
+            connection.execute(text("INSERT INTO t VALUES (1)"))
+        publish_database(engine)
+        self.assertEqual(os.listdir(self.tmp.name), ["test.db"])
+
+        engine = create_engine(f"sqlite:///file:{self.path}?mode=ro&immutable=1&uri=true")
+        apply_sqlite_pragmas(engine, SQLITE_READ_ONLY)
+        with engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT x FROM t")).scalar(), 1)
+            with self.assertRaises(OperationalError):
+                connection.execute(text("INSERT INTO t VALUES (2)"))
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,2 +1,4 @@
-# import flask app but need to call it "application" for WSGI to work
-from miiflask.flask.app import app as application
+# flask app factory but need to call the app "application" for WSGI to work
+from miiflask.flask.app import create_app
+
+application = create_app()